@@ -2,7 +2,7 @@ import React, { useEffect, useState, useMemo, useCallback } from 'react';
 import { useSearchParams } from 'react-router-dom';
 import ReactDOM from 'react-dom';
 import apiService from '../services/apiService';
-import type { RacerFromAPI, SoapboxClassOption } from '../types';
+import type { RaceRunFromAPI, SoapboxClassOption, StandingFromAPI } from '../types';
 import {
   SOAPBOX_CLASS_DISPLAY_MAP,
   type SoapboxClassValue,
@@ -25,20 +25,45 @@ const formatSecondsToTime = (totalSeconds: number | null | undefined): string =>
 // Spezieller Wert für den Filter "Einzelstarter"
 const SOLO_RACER_FILTER_VALUE = 'SOLO_RACERS_FILTER';
 
+// Platz, Bestzeit und Wertungsläufe kommen aus der Standings-Tabelle des Backends,
+// die einzelnen Läufe (inkl. Probelauf) lädt erst das Detail-Modal
+type HeatRunType = Exclude<RaceRunTypeValue, 'PR'>;
+
+const HEAT_COLUMNS: { runType: HeatRunType; time: 'heat_1_time_seconds' | 'heat_2_time_seconds'; disqualified: 'heat_1_disqualified' | 'heat_2_disqualified' }[] = [
+  { runType: 'H1', time: 'heat_1_time_seconds', disqualified: 'heat_1_disqualified' },
+  { runType: 'H2', time: 'heat_2_time_seconds', disqualified: 'heat_2_disqualified' },
+];
+
 interface RacerDetailModalProps {
-  racer: RacerFromAPI | null;
+  racer: StandingFromAPI | null;
   isOpen: boolean;
   onClose: () => void;
 }
 
 const RacerDetailModal: React.FC<RacerDetailModalProps> = ({ racer, isOpen, onClose }) => {
   const modalRoot = document.getElementById('modal-root');
+  const [races, setRaces] = useState<RaceRunFromAPI[] | null>(null);
+  const [racesError, setRacesError] = useState<string | null>(null);
+
+  useEffect(() => {
+    if (!isOpen || !racer) return;
+    let cancelled = false;
+    setRaces(null);
+    setRacesError(null);
+    apiService.getRacerDetails(racer.racer)
+      .then(details => { if (!cancelled) setRaces(details.races); })
+      .catch(err => {
+        console.error("Failed to fetch race runs:", err);
+        if (!cancelled) setRacesError("Rennläufe konnten nicht geladen werden.");
+      });
+    return () => { cancelled = true; };
+  }, [racer, isOpen]);
 
   const modalContent = (
     <div className="modal-overlay modal-enter" onClick={onClose}>
       <div className="modal-content" onClick={(e) => e.stopPropagation()}>
         <div className="modal-header">
-          <h2>{racer?.full_name} <span style={{fontSize: '1rem', color: 'var(--text-light-color)'}}>(#{racer?.start_number || 'N/A'})</span></h2>
+          <h2>{racer?.racer_name} <span style={{fontSize: '1rem', color: 'var(--text-light-color)'}}>(#{racer?.racer_start_number || 'N/A'})</span></h2>
           <button className="modal-close-button" onClick={onClose} aria-label="Schließen">×</button>
         </div>
         <div className="modal-body">
@@ -46,10 +71,10 @@ const RacerDetailModal: React.FC<RacerDetailModalProps> = ({ racer, isOpen, onCl
           <p><strong>Seifenkiste:</strong> {racer?.soapbox_name || '-'}</p>
           <p><strong>Klasse:</strong> {racer?.soapbox_class_display}</p>
           <p><strong>Beste Zeit:</strong> <span style={{fontWeight: 'bold'}}>{formatSecondsToTime(parseTimeToSeconds(racer?.best_time_seconds || null))}s</span></p>
-          {racer?.rank && <p><strong>Platz (Gesamt):</strong> {racer.rank}</p>}
+          {racer?.rank && <p><strong>Platz ({racer.soapbox_class_display}):</strong> {racer.rank}</p>}
 
           <h3>Alle Läufe:</h3>
-          {racer?.races && racer.races.length > 0 ? (
+          {racesError ? <p>{racesError}</p> : races === null ? <p>Lade Rennläufe...</p> : races.length > 0 ? (
             <div className="table-wrapper">
               <table className="results-table compact-table">
                 <thead>
@@ -62,7 +87,7 @@ const RacerDetailModal: React.FC<RacerDetailModalProps> = ({ racer, isOpen, onCl
                 <tbody>
                   {DISPLAYED_RUN_TYPES_ORDER
                     .map(runKey => {
-                      const run = racer.races.find(r => r.run_type === runKey);
+                      const run = races.find(r => r.run_type === runKey);
                       if (!run) {
                         return null;
                       }
@@ -88,7 +113,7 @@ const RacerDetailModal: React.FC<RacerDetailModalProps> = ({ racer, isOpen, onCl
   return ReactDOM.createPortal(modalContent, modalRoot);
 };
 
-type SortableRacerKey = keyof Pick<RacerFromAPI, 'full_name' | 'team_name' | 'soapbox_name' | 'soapbox_class_display' | 'best_time_seconds' | 'rank'> | `time_${RaceRunTypeValue}`;
+type SortableRacerKey = keyof Pick<StandingFromAPI, 'racer_name' | 'team_name' | 'soapbox_name' | 'soapbox_class_display' | 'best_time_seconds' | 'heat_1_time_seconds' | 'heat_2_time_seconds' | 'rank'>;
 
 interface TeamOption {
     value: number | '' | typeof SOLO_RACER_FILTER_VALUE; // Team ID, leer für "Alle", oder spezieller String
@@ -103,8 +128,8 @@ interface SoapboxOption {
 const ResultsPage: React.FC = () => {
   const [searchParams, setSearchParams] = useSearchParams();
   
-  const [allRacers, setAllRacers] = useState<RacerFromAPI[]>([]);
-  const [filteredAndSortedRacers, setFilteredAndSortedRacers] = useState<RacerFromAPI[]>([]);
+  const [allRacers, setAllRacers] = useState<StandingFromAPI[]>([]);
+  const [filteredAndSortedRacers, setFilteredAndSortedRacers] = useState<StandingFromAPI[]>([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
 
@@ -126,7 +151,7 @@ const ResultsPage: React.FC = () => {
     key: 'best_time_seconds',
     direction: 'ascending',
   });
-  const [selectedRacer, setSelectedRacer] = useState<RacerFromAPI | null>(null);
+  const [selectedRacer, setSelectedRacer] = useState<StandingFromAPI | null>(null);
 
   const soapboxClassOptions: SoapboxClassOption[] = useMemo(() => {
     return Object.entries(SOAPBOX_CLASS_DISPLAY_MAP).map(([value, label]) => ({
@@ -182,8 +207,7 @@ const ResultsPage: React.FC = () => {
       setLoading(true);
       setError(null);
       try {
-        const data = await apiService.getRacers(); 
-        setAllRacers(data);
+        setAllRacers(await apiService.getStandings());
       } catch (err) {
         console.error("Failed to fetch racers data:", err);
         setError("Teilnehmerdaten konnten nicht geladen werden.");
@@ -220,41 +244,17 @@ const ResultsPage: React.FC = () => {
         processedRacers = processedRacers.filter(r => r.soapbox === selectedSoapbox);
     }
 
-    const rankedRacers = processedRacers
-        .filter(r => parseTimeToSeconds(r.best_time_seconds) !== null)
-        .sort((a, b) => (parseTimeToSeconds(a.best_time_seconds) ?? Infinity) - (parseTimeToSeconds(b.best_time_seconds) ?? Infinity))
-        .map((r, index) => ({ ...r, rank: index + 1 }));
-
-    const unrankedRacers = processedRacers.filter(r => parseTimeToSeconds(r.best_time_seconds) === null).map(r => ({ ...r, rank: undefined }));
-    
-    processedRacers = [...rankedRacers, ...unrankedRacers];
-
     processedRacers.sort((a, b) => {
       let valA: string | number | null | undefined;
       let valB: string | number | null | undefined;
 
-      if (sortConfig.key.startsWith('time_')) {
-        const runType = sortConfig.key.substring(5) as RaceRunTypeValue;
-        const getRunTime = (racer: RacerFromAPI) => {
-          const run = racer.races.find(race => race.run_type === runType && !race.disqualified);
-          return run ? parseTimeToSeconds(run.time_in_seconds) : null;
-        };
-        valA = getRunTime(a);
-        valB = getRunTime(b);
+      const key = sortConfig.key;
+      if (key === 'best_time_seconds' || key === 'heat_1_time_seconds' || key === 'heat_2_time_seconds') {
+        valA = parseTimeToSeconds(a[key]);
+        valB = parseTimeToSeconds(b[key]);
       } else {
-        const key = sortConfig.key as keyof RacerFromAPI; 
-        const valueA = a[key];
-        const valueB = b[key];
-        valA = Array.isArray(valueA) ? undefined : valueA;
-        valB = Array.isArray(valueB) ? undefined : valueB;
-
-        if (sortConfig.key === 'best_time_seconds') {
-            valA = parseTimeToSeconds(a.best_time_seconds);
-            valB = parseTimeToSeconds(b.best_time_seconds);
-        } else if (sortConfig.key === 'rank') { 
-            valA = a.rank;
-            valB = b.rank;
-        }
+        valA = a[key];
+        valB = b[key];
       }
       
       const isAsc = sortConfig.direction === 'ascending';
@@ -287,11 +287,9 @@ const ResultsPage: React.FC = () => {
     return '';
   }, [sortConfig]);
 
-  const getRaceTimeForTable = useCallback((racer: RacerFromAPI, runType: RaceRunTypeValue, runIdentifier: number = 1) => {
-    const raceRun = racer.races.find(r => r.run_type === runType && r.run_identifier === runIdentifier);
-    if (!raceRun) return 'N/A';
-    if (raceRun.disqualified) return <span style={{color: 'var(--danger-color)', fontWeight: 'bold'}}>DQ</span>;
-    return formatSecondsToTime(parseTimeToSeconds(raceRun.time_in_seconds));
+  const getHeatTimeForTable = useCallback((racer: StandingFromAPI, heat: typeof HEAT_COLUMNS[number]) => {
+    if (racer[heat.disqualified]) return <span style={{color: 'var(--danger-color)', fontWeight: 'bold'}}>DQ</span>;
+    return formatSecondsToTime(parseTimeToSeconds(racer[heat.time]));
   }, []);
 
   const handleTeamChange = (e: React.ChangeEvent<HTMLSelectElement>) => {
@@ -364,8 +362,8 @@ const ResultsPage: React.FC = () => {
                 <th onClick={() => requestSort('rank')} className="sortable-header">
                   Platz <span className="sort-indicator">{getSortIndicator('rank')}</span>
                 </th>
-                <th onClick={() => requestSort('full_name')} className="sortable-header">
-                  Name <span className="sort-indicator">{getSortIndicator('full_name')}</span>
+                <th onClick={() => requestSort('racer_name')} className="sortable-header">
+                  Name <span className="sort-indicator">{getSortIndicator('racer_name')}</span>
                 </th>
                 <th onClick={() => requestSort('team_name')} className="sortable-header">
                   Team <span className="sort-indicator">{getSortIndicator('team_name')}</span>
@@ -376,10 +374,10 @@ const ResultsPage: React.FC = () => {
                 <th onClick={() => requestSort('soapbox_class_display')} className="sortable-header">
                   Klasse <span className="sort-indicator">{getSortIndicator('soapbox_class_display')}</span>
                 </th>
-                {DISPLAYED_RUN_TYPES_ORDER.map((runTypeKey) => (
-                  <th key={runTypeKey} onClick={() => requestSort(`time_${runTypeKey}`)} className="sortable-header">
-                    {RACE_RUN_TYPE_DISPLAY_MAP[runTypeKey]}
-                    <span className="sort-indicator">{getSortIndicator(`time_${runTypeKey}`)}</span>
+                {HEAT_COLUMNS.map((heat) => (
+                  <th key={heat.runType} onClick={() => requestSort(heat.time)} className="sortable-header">
+                    {RACE_RUN_TYPE_DISPLAY_MAP[heat.runType]}
+                    <span className="sort-indicator">{getSortIndicator(heat.time)}</span>
                   </th>
                 ))}
                 <th onClick={() => requestSort('best_time_seconds')} className="sortable-header">
@@ -389,14 +387,14 @@ const ResultsPage: React.FC = () => {
             </thead>
             <tbody>
               {filteredAndSortedRacers.map((racer) => (
-                <tr key={racer.id} onClick={() => setSelectedRacer(racer)} className="clickable-row">
+                <tr key={racer.racer} onClick={() => setSelectedRacer(racer)} className="clickable-row">
                   <td style={{textAlign: 'center'}}>{racer.rank || '-'}</td>
-                  <td>{racer.full_name}</td>
+                  <td>{racer.racer_name}</td>
                   <td>{racer.team_name || 'Einzelstarter'}</td>
                   <td>{racer.soapbox_name || '-'}</td>
                   <td>{racer.soapbox_class_display}</td>
-                  {DISPLAYED_RUN_TYPES_ORDER.map(runKey => (
-                    <td key={`${racer.id}-${runKey}`}>{getRaceTimeForTable(racer, runKey, 1)}</td>
+                  {HEAT_COLUMNS.map(heat => (
+                    <td key={`${racer.racer}-${heat.runType}`}>{getHeatTimeForTable(racer, heat)}</td>
                   ))}
                   <td style={{fontWeight: 'bold'}}>{formatSecondsToTime(parseTimeToSeconds(racer.best_time_seconds))}</td>
                 </tr>
@@ -10,6 +10,8 @@ import type {
   RaceRunFormData,
   SoapboxFromAPI,
   SoapboxFormData,
+  SoapboxClassValue,
+  StandingFromAPI,
 } from '../types';
 
 const API_BASE_URL = import.meta.env.VITE_API_BASE_URL || 'http://127.0.0.1:8000/api';
@@ -120,6 +122,8 @@ const deleteSoapbox = async (id: number | string) => apiClient.delete(`/soapboxe
 
 // Racers
 const getRacers = async (params?: Record<string, string | number>) => apiClient.get<RacerFromAPI[]>('/racers/', { params }).then(res => res.data);
+// Öffentliche Ergebnisseiten lesen über die async Endpunkte unter /public/
+const getPublicRacers = async (params?: Record<string, string | number>) => apiClient.get<RacerFromAPI[]>('/public/racers/', { params }).then(res => res.data);
 const getRacerDetails = async (id: number | string) => apiClient.get<RacerFromAPI>(`/racers/${id}/`).then(res => res.data);
 const createRacer = async (racerData: RacerFormData) => {
     const payload = { 
@@ -147,11 +151,16 @@ const createRaceRun = async (data: RaceRunFormData) => apiClient.post<RaceRunFro
 const updateRaceRun = async (id: number, data: Partial<RaceRunFormData>) => apiClient.put<RaceRunFromAPI>(`/raceruns/${id}/`, data).then(res => res.data);
 const deleteRaceRun = async (id: number) => apiClient.delete(`/raceruns/${id}/`).then(res => res.data);
 
+// Standings
+const getStandings = async (soapboxClass?: SoapboxClassValue) =>
+  apiClient.get<StandingFromAPI[]>('/public/standings/', { params: soapboxClass ? { class: soapboxClass } : undefined }).then(res => res.data);
+
 
 export default {
   login, logout, getAccessToken,
   getTeams, getTeamById, createTeam, updateTeam, deleteTeam,
   getSoapboxes, createSoapbox, updateSoapbox, deleteSoapbox,
-  getRacers, getRacerDetails, createRacer, updateRacer, deleteRacer,
+  getRacers, getPublicRacers, getRacerDetails, createRacer, updateRacer, deleteRacer,
   getRaceRuns, createRaceRun, updateRaceRun, deleteRaceRun,
+  getStandings,
 };
\ No newline at end of file
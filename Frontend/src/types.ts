@@ -52,6 +52,7 @@ export interface RaceRunFromAPI {
   disqualified: boolean;
   notes?: string | null;
   recorded_at?: string;
+  updated_at?: string;
 }
 
 export interface RacerFromAPI {
@@ -73,6 +74,25 @@ export interface RacerFromAPI {
   rank?: number;
 }
 
+export interface StandingFromAPI {
+  racer: number;
+  racer_name: string;
+  racer_start_number: string | null;
+  team: number | null;
+  team_name: string | null;
+  soapbox: number | null;
+  soapbox_name: string | null;
+  soapbox_class: SoapboxClassValue;
+  soapbox_class_display: string;
+  rank: number | null;
+  best_time_seconds: string | null;
+  heat_1_time_seconds: string | null;
+  heat_1_disqualified: boolean;
+  heat_2_time_seconds: string | null;
+  heat_2_disqualified: boolean;
+  updated_at: string;
+}
+
 export type SoapboxClassValue = 'LRJ' | 'LRS' | 'HRJ' | 'HRS' | 'XKL' | 'VTR' | 'UNK';
 
 export const SOAPBOX_CLASS_VALUES = {
@@ -0,0 +1,60 @@
+import threading
+import time
+from typing import Callable, Iterable, Optional, Set
+
+# Wartezeit nach der ersten Änderung, bevor gesendet wird
+FLUSH_INTERVAL = 0.05
+# Ab so vielen geänderten Einträgen wird ohne Wartezeit gesendet
+MAX_BATCH_SIZE = 100
+
+
+class BroadcastCoalescer:
+    """
+    Sammelt geänderte Eintrags-IDs und ruft `flush(item_ids)` gebündelt in einem eigenen Thread auf:
+    spätestens `interval` Sekunden nach der ersten Änderung oder sofort, sobald `max_batch_size`
+    IDs zusammengekommen sind. `item_ids` ist None, wenn zwischendurch alles als geändert markiert wurde.
+    So wird aus einem Schwall von Einzeländerungen ein Frame pro Client, und der aufrufende
+    (Tk-)Thread formatiert und sendet nichts selbst.
+    """
+
+    def __init__(self, flush: Callable[[Optional[Set[str]]], None], interval: float = FLUSH_INTERVAL,
+                 max_batch_size: int = MAX_BATCH_SIZE):
+        self.flush = flush
+        self.interval = interval
+        self.max_batch_size = max_batch_size
+        self._condition = threading.Condition()
+        self._dirty: Set[str] = set()
+        self._all_dirty = False
+        self._deadline: Optional[float] = None
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def mark(self, item_ids: Optional[Iterable[str]] = None):
+        """Markiert `item_ids` (oder ohne Argument alle Einträge) als geändert. Threadsicher, blockiert nicht."""
+        with self._condition:
+            if item_ids is None:
+                self._all_dirty = True
+            else:
+                self._dirty.update(item_ids)
+            if self._deadline is None:
+                self._deadline = time.monotonic() + self.interval
+            self._condition.notify()
+
+    def _batch_ready(self) -> bool:
+        if self._deadline is None:
+            return False
+        return len(self._dirty) >= self.max_batch_size or time.monotonic() >= self._deadline
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._batch_ready():
+                    timeout = None if self._deadline is None else max(self._deadline - time.monotonic(), 0)
+                    self._condition.wait(timeout)
+                item_ids = None if self._all_dirty else self._dirty
+                self._dirty = set()
+                self._all_dirty = False
+                self._deadline = None
+            try:
+                self.flush(item_ids)
+            except Exception as e:
+                print(f"Fehler beim gebündelten Senden an die Clients: {e}")
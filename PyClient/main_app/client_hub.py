@@ -0,0 +1,197 @@
+import asyncio
+import threading
+from typing import Any, Callable, Dict, Optional
+
+from common.protocol import FrameDecoder, FrameError, encode_frame
+
+READ_CHUNK_SIZE = 64 * 1024
+# Noch nicht gesendete Bytes je Client; wer mehr auflaufen lässt, gilt als zu langsam und wird getrennt
+MAX_BUFFERED_BYTES = 4 * 1024 * 1024
+# Clients schicken nur kleine Nachrichten (Scans), größere Frames gelten als defekte Verbindung
+MAX_INCOMING_FRAME_SIZE = 1024 * 1024
+# So lange darf ein Client brauchen, um einen Schreibpuffer abzunehmen
+SEND_TIMEOUT = 10.0
+
+
+class ClientConnection:
+    """Zustand eines verbundenen Scanners oder Moderators; wird nur in der Event-Loop benutzt."""
+
+    def __init__(self, client_id: Any, writer: asyncio.StreamWriter, max_buffered_bytes: int):
+        self.client_id = client_id
+        self.writer = writer
+        self.max_buffered_bytes = max_buffered_bytes
+        self.backlog = asyncio.Event()
+        self.closed = False
+
+    def buffered_bytes(self) -> int:
+        transport = self.writer.transport
+        return 0 if transport.is_closing() else transport.get_write_buffer_size()
+
+    def enqueue(self, data: bytes) -> bool:
+        """
+        Schreibt `data` sofort in den Transport (der Kernel nimmt ab, was geht, der Rest bleibt im Puffer).
+        False, wenn der Puffer des Clients damit überlaufen würde.
+        """
+        if self.buffered_bytes() + len(data) > self.max_buffered_bytes:
+            return False
+        self.writer.write(data)
+        if self.buffered_bytes():
+            self.backlog.set()
+        return True
+
+
+class ClientHub:
+    """
+    Bedient alle Scanner- und Moderator-Verbindungen in einer einzigen asyncio-Event-Loop
+    (ein Thread für alle Clients statt zwei Threads pro Station).
+
+    Jeder Client hat einen begrenzten Schreibpuffer. Bleibt etwas im Puffer liegen, wartet ein Task pro
+    Client per drain() darauf, dass der Client es abnimmt (Backpressure). Läuft der Puffer über oder
+    nimmt der Client länger als `send_timeout` nichts ab, wird die Verbindung getrennt; der Client
+    verbindet sich neu und bekommt dabei wieder den vollständigen Datenstand.
+
+    `send`, `broadcast` und `close` sind threadsicher. `on_message(client_id, message)` und
+    `on_connect(client_id)` laufen in der Event-Loop und sollten die Arbeit nur weiterreichen.
+    """
+
+    def __init__(self, host: str, port: int, on_message: Callable[[Any, Dict[str, Any]], None],
+                 on_connect: Optional[Callable[[Any], None]] = None,
+                 max_buffered_bytes: int = MAX_BUFFERED_BYTES, send_timeout: float = SEND_TIMEOUT):
+        self.host = host
+        self.port = port
+        self.on_message = on_message
+        self.on_connect = on_connect
+        self.max_buffered_bytes = max_buffered_bytes
+        self.send_timeout = send_timeout
+        self.clients: Dict[Any, ClientConnection] = {}
+        self.ready = threading.Event()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    @property
+    def client_count(self) -> int:
+        return len(self.clients)
+
+    def serve_forever(self):
+        """Blockiert den aufrufenden Thread. Kann der Port nicht gebunden werden, fliegt ein OSError."""
+        asyncio.run(self._serve())
+
+    async def _serve(self):
+        self._loop = asyncio.get_running_loop()
+        self._server = await asyncio.start_server(self._handle_client, self.host, self.port, reuse_address=True)
+        print(f"Server lauscht auf {self.host}:{self.port}")
+        self.ready.set()
+        async with self._server:
+            try:
+                await self._server.serve_forever()
+            except asyncio.CancelledError:
+                pass
+
+    # --- Threadsichere Schnittstelle ---
+
+    def send(self, client_id: Any, message: Dict[str, Any]):
+        self._call_in_loop(self._enqueue, client_id, encode_frame(message))
+
+    def broadcast(self, message: Dict[str, Any]):
+        # Einmal kodieren, alle Clients teilen sich dieselben Bytes
+        self._call_in_loop(self._enqueue_all, encode_frame(message))
+
+    def close(self):
+        self._call_in_loop(self._close_all)
+
+    def _call_in_loop(self, func: Callable, *args):
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        try:
+            loop.call_soon_threadsafe(func, *args)
+        except RuntimeError:
+            pass  # Loop wurde gerade beendet
+
+    # --- Ab hier nur in der Event-Loop ---
+
+    def _enqueue(self, client_id: Any, data: bytes):
+        client = self.clients.get(client_id)
+        if client is not None:
+            self._enqueue_to(client, data)
+
+    def _enqueue_all(self, data: bytes):
+        for client in list(self.clients.values()):
+            self._enqueue_to(client, data)
+
+    def _enqueue_to(self, client: ClientConnection, data: bytes):
+        if client.closed:
+            return
+        if not client.enqueue(data):
+            self._drop(client, f"Schreibpuffer voll ({client.buffered_bytes()} Bytes ausstehend)")
+
+    def _drop(self, client: ClientConnection, reason: str):
+        print(f"Trenne langsamen Client {client.client_id}: {reason}.")
+        client.closed = True
+        client.writer.transport.abort()
+
+    def _close_all(self):
+        for client in list(self.clients.values()):
+            client.closed = True
+            client.writer.close()
+        if self._server is not None:
+            self._server.close()
+
+    def _run_callback(self, callback: Callable, *args):
+        try:
+            callback(*args)
+        except Exception as e:
+            print(f"Fehler im Client-Callback {getattr(callback, '__name__', callback)}: {e}")
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        client_id = writer.get_extra_info('peername')
+        client = ClientConnection(client_id, writer, self.max_buffered_bytes)
+        self.clients[client_id] = client
+        print(f"Verbunden mit {client_id}")
+        send_task = asyncio.create_task(self._watch_backlog(client))
+        if self.on_connect:
+            self._run_callback(self.on_connect, client_id)
+
+        try:
+            await self._receive_loop(client, reader)
+        except (ConnectionResetError, ConnectionAbortedError, BrokenPipeError):
+            if not client.closed:
+                print(f"Verbindung mit {client_id} unerwartet geschlossen.")
+        except Exception as e:
+            print(f"Fehler bei der Kommunikation mit {client_id}: {e}")
+        finally:
+            client.closed = True
+            send_task.cancel()
+            if self.clients.get(client_id) is client:
+                del self.clients[client_id]
+            writer.close()
+            print(f"Handler für {client_id} beendet.")
+
+    async def _receive_loop(self, client: ClientConnection, reader: asyncio.StreamReader):
+        decoder = FrameDecoder(max_frame_size=MAX_INCOMING_FRAME_SIZE)
+        while not client.closed:
+            chunk = await reader.read(READ_CHUNK_SIZE)
+            if not chunk:
+                if not client.closed:
+                    print(f"Verbindung mit {client.client_id} geschlossen (Client hat geschlossen).")
+                return
+            try:
+                messages = decoder.feed(chunk)
+            except FrameError as e:
+                print(f"Ungültiger Frame von {client.client_id}, Verbindung wird getrennt: {e}")
+                return
+            for message in messages:
+                self._run_callback(self.on_message, client.client_id, message)
+
+    async def _watch_backlog(self, client: ClientConnection):
+        writer = client.writer
+        while not client.closed:
+            await client.backlog.wait()
+            client.backlog.clear()
+            try:
+                await asyncio.wait_for(writer.drain(), self.send_timeout)
+            except asyncio.TimeoutError:
+                self._drop(client, f"keine Abnahme innerhalb von {self.send_timeout:.0f} s")
+                return
+            except (ConnectionResetError, ConnectionAbortedError, BrokenPipeError):
+                return
@@ -0,0 +1,71 @@
+# --- START OF FILE main_app/common/protocol.py ---
+
+import json
+import struct
+from typing import Any, Dict, List
+
+# Frame = Header (Protokollversion, Länge der Nutzdaten) + kompaktes JSON-Objekt in UTF-8
+PROTOCOL_VERSION = 2
+HEADER = struct.Struct("!BI")
+# Schutz vor kaputten oder fremden Verbindungen, ein vollständiger Datenstand ist deutlich kleiner
+MAX_FRAME_SIZE = 16 * 1024 * 1024
+
+# Nachrichtentypen (Feld "type")
+MSG_SCAN = "scan"  # Scanner -> MainApp: timestamp (ISO), start_nummer, scan_id
+MSG_RESYNC = "resync"  # Client -> MainApp: fordert nach einer Lücke erneut MSG_ALL_DATA an
+MSG_ALL_DATA = "all_data"  # MainApp -> Clients: seq, items (vollständiger Stand der Läufe)
+MSG_DELTA = "delta"  # MainApp -> Clients: seq, upserts (Einträge), deletes (app_item_ids)
+MSG_RACER_DATA = "racer_data"  # MainApp -> Clients: racers
+
+
+class FrameError(Exception):
+    pass
+
+
+def encode_frame(message: Dict[str, Any]) -> bytes:
+    payload = json.dumps(message, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    if len(payload) > MAX_FRAME_SIZE:
+        raise FrameError(f"Frame too large ({len(payload)} bytes).")
+    return HEADER.pack(PROTOCOL_VERSION, len(payload)) + payload
+
+
+class FrameDecoder:
+    """
+    Zerlegt einen Bytestrom in Nachrichten. Jedes Byte wird genau einmal angefasst: Der Header sagt,
+    wie lang die Nutzdaten sind, es wird also nie nach Trennzeichen gesucht.
+    """
+
+    def __init__(self, max_frame_size: int = MAX_FRAME_SIZE):
+        self.max_frame_size = max_frame_size
+        self.buffer = bytearray()
+
+    def feed(self, data: bytes) -> List[Dict[str, Any]]:
+        """Hängt `data` an und liefert alle damit vollständigen Nachrichten. Wirft FrameError bei ungültigen Frames."""
+        buffer = self.buffer
+        buffer += data
+        messages = []
+        offset = 0
+        with memoryview(buffer) as view:
+            while len(buffer) - offset >= HEADER.size:
+                version, length = HEADER.unpack_from(buffer, offset)
+                if version != PROTOCOL_VERSION:
+                    raise FrameError(f"Unsupported protocol version {version} (expected {PROTOCOL_VERSION}).")
+                if length > self.max_frame_size:
+                    raise FrameError(f"Frame too large ({length} bytes).")
+                start = offset + HEADER.size
+                end = start + length
+                if end > len(buffer):
+                    break
+                # Direkt aus dem Puffer dekodieren, ohne die Nutzdaten vorher als bytes zu kopieren
+                try:
+                    message = json.loads(str(view[start:end], "utf-8"))
+                except ValueError as e:
+                    raise FrameError(f"Invalid frame payload: {e}") from None
+                if not isinstance(message, dict) or "type" not in message:
+                    raise FrameError("Frame does not contain a message object.")
+                messages.append(message)
+                offset = end
+        # Verarbeitete Frames einmal pro Aufruf entfernen
+        if offset:
+            del buffer[:offset]
+        return messages
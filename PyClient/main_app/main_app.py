@@ -1,152 +1,58 @@
+import bisect
 import tkinter as tk
 from tkinter import ttk, messagebox
 import customtkinter as ctk
 import uuid
 import datetime
 import copy
+import functools
 import requests
 import time
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Set, Iterable, Tuple
 import threading
 import queue
-import socket
 import json
 import os
 import serial
 import serial.tools.list_ports
 from dataclasses import asdict
 
+from broadcast_coalescer import BroadcastCoalescer
+from client_hub import ClientHub
+from common.protocol import MSG_SCAN, MSG_RESYNC, MSG_ALL_DATA, MSG_DELTA, MSG_RACER_DATA
+
 HOST = '0.0.0.0'
 PORT = 65432
 SETTINGS_FILE = "app_settings.json"
 VERSIONS_FILE = "main_app/versions.json"
 
 
-# In main_app.py ersetzen
-
-def handle_client(conn: socket.socket, addr: Any, app_instance: 'MainApp'):
-    print(f"Verbunden mit {addr}")
-
-    client_send_queue: queue.Queue[Optional[str]] = queue.Queue()
-    app_instance.add_client_queue(addr, client_send_queue)
-
-    # KEIN TIMEOUT HIER SETZEN!
-    # conn.settimeout(1)
-
-    send_thread = threading.Thread(target=send_to_client_from_queue, args=(conn, client_send_queue, addr), daemon=True)
-    send_thread.start()
-
-    buffer = ""
-    try:
-        with conn:
-            while True:
-                data = conn.recv(1024)
-                if not data:
-                    print(f"Verbindung mit {addr} geschlossen (Client hat geschlossen).")
-                    break
-
-                buffer += data.decode('utf-8')
-
-                # Verarbeite alle vollständigen Nachrichten im Puffer
-                while "$END$" in buffer:
-                    message, buffer = buffer.split("$END$", 1)
-                    if message:
-                        # Die message_receive Funktion verarbeitet eine Scan-Nachricht
-                        message_receive(message)
-
-    except ConnectionResetError:
-        print(f"Verbindung mit {addr} unerwartet geschlossen.")
-    except Exception as e:
-        print(f"Fehler bei der Kommunikation mit {addr}: {e}")
-    finally:
-        print(f"Handler für {addr} beendet.")
-        app_instance.remove_client_queue(addr)
-        try:
-            client_send_queue.put(None)
-        except Exception as e:
-            print(f"Error putting sentinel to client queue for {addr}: {e}")
-
-
-def send_to_client_from_queue(conn: socket.socket, q: queue.Queue[Optional[str]], addr: Any):
-    peer_name = addr
-    try:
-        peer_name = conn.getpeername()
-    except OSError:
-        pass
-
-    while True:
-        try:
-            message_to_client = q.get()
-            if message_to_client is None:
-                break
-
-            message_with_ender = message_to_client + "$END$"
-            conn.sendall(message_with_ender.encode('utf-8'))
-
-            q.task_done()
-        except (ConnectionResetError, ConnectionAbortedError, OSError) as e:
-            print(f"Send thread: Socket-Fehler beim Senden an {peer_name}: {e}")
-            break
-        except Exception as e:
-            print(f"Error in send_to_client_from_queue for {peer_name}: {e}")
-            break
-
-
 def connect(app_instance: 'MainApp'):
-    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-        s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        try:
-            s.bind((HOST, PORT))
-        except OSError as e:
-            print(f"FATAL ERROR: Could not bind to port {PORT}. Is another instance running? Error: {e}")
-            if MainApp._instance:
-                MainApp._instance.after(100, lambda: messagebox.showerror("Server Fehler",
-                                                                          f"Konnte Server auf Port {PORT} nicht starten. Läuft bereits eine andere Instanz?"))
-            return
-
-        s.listen()
-        print(f"Server lauscht auf {HOST}:{PORT}")
-        while True:
-            try:
-                conn, addr = s.accept()
-                conn.settimeout(60)
-                client_handler_thread = threading.Thread(
-                    target=handle_client, args=(conn, addr, app_instance), daemon=True
-                )
-                client_handler_thread.start()
-            except Exception as e:
-                print(f"Fehler beim Akzeptieren einer Verbindung: {e}")
-
+    # Ein Thread mit einer Event-Loop für alle Scanner- und Moderator-Verbindungen
+    try:
+        app_instance.client_hub.serve_forever()
+    except OSError as e:
+        print(f"FATAL ERROR: Could not bind to port {PORT}. Is another instance running? Error: {e}")
+        if MainApp._instance:
+            MainApp._instance.after(100, lambda: messagebox.showerror("Server Fehler",
+                                                                      f"Konnte Server auf Port {PORT} nicht starten. Läuft bereits eine andere Instanz?"))
 
-def message_receive(data: str):
-    data_list = data.split("$#")
-    p: Dict[str, Any] = {}
 
-    if len(data_list) < 4:
-        print(f"Error: Received data not in expected format: {data}")
+def message_receive(message: Dict[str, Any]):
+    if message.get("type") != MSG_SCAN or not message.get("start_nummer"):
+        print(f"Error: Received message not in expected format: {message}")
         return
 
-    timestamp_str_from_scanner = data_list[0]
-
+    p: Dict[str, Any] = {}
+    timestamp_from_scanner = message.get("timestamp")
     try:
-        time_part_str, date_part_str_with_paren = timestamp_str_from_scanner.split(" (")
-        date_part_str = date_part_str_with_paren[:-1]
-        day, month = map(int, date_part_str.split('.'))
-        hour, minute, second = map(int, time_part_str.split(':'))
-        current_year = datetime.datetime.now().year
-        scanner_dt_object = datetime.datetime(current_year, month, day, hour, minute, second)
-        p["timestamp_messung"] = scanner_dt_object.isoformat()
-    except (ValueError, IndexError) as e:
-        print(f"Error parsing scanner timestamp: '{timestamp_str_from_scanner}'. Error: {e}. Using current time.")
+        p["timestamp_messung"] = datetime.datetime.fromisoformat(timestamp_from_scanner).isoformat()
+    except (TypeError, ValueError) as e:
+        print(f"Error parsing scanner timestamp: '{timestamp_from_scanner}'. Error: {e}. Using current time.")
         p["timestamp_messung"] = datetime.datetime.now().isoformat()
 
-    try:
-        p["start_nummer"] = data_list[1]
-    except ValueError:
-        print(f"Error: Invalid start_nummer from client: {data_list[1]}")
-        return
-
-    p["scan_id"] = data_list[2]
+    p["start_nummer"] = str(message["start_nummer"])
+    p["scan_id"] = message.get("scan_id")
     p["zugeordneter_scan_id"] = p["scan_id"]
 
     if MainApp._instance and "Runde" in MainApp._instance.settings_data:
@@ -182,10 +88,24 @@ except ImportError as e:
     class Racer:
         pass
 
+# Für die Startnummern-Zuordnung reichen diese Felder, die verschachtelten Läufe werden nicht gebraucht
+RACER_LOOKUP_FIELDS = "start_number,full_name,soapbox_class_display"
+
 ctk.set_appearance_mode("System")
 ctk.set_default_color_theme("blue")
 
 
+@functools.lru_cache(maxsize=4096)
+def format_timestamp_for_client(timestamp: Optional[str]) -> str:
+    # Gecacht, weil bei jedem Vergleich mit dem Stand der Clients alle Einträge formatiert werden
+    if not timestamp:
+        return ""
+    try:
+        return datetime.datetime.fromisoformat(timestamp.replace(" ", "T")).strftime("%H:%M:%S (%d.%m.%Y)")
+    except ValueError:
+        return str(timestamp)
+
+
 class CustomTwoButtonDialog(ctk.CTkToplevel):
     def __init__(self, parent, title: str, message: str, button_1_text: str, button_2_text: str):
         super().__init__(parent)
@@ -448,9 +368,16 @@ class MainApp(ctk.CTk):
         self.setting_widgets: Dict[str, ctk.CTkBaseClass] = {}
         self.versions: List[Dict[str, Any]] = []
         self.load_versions()
-        self.clients: Dict[Any, queue.Queue[Optional[str]]] = {}
-        self.client_management_lock = threading.Lock()
+        self.client_hub = ClientHub(HOST, PORT, on_message=self.on_client_message, on_connect=self.on_client_connected)
+        # Stand der Läufe, wie ihn die Clients kennen (app_item_id -> formatierter Eintrag), und die
+        # Sequenznummer des letzten Deltas; Vergabe und Versand laufen unter client_sync_lock
+        self.client_items: Dict[str, Dict[str, Any]] = {}
+        self.client_sequence = 0
+        self.client_sync_lock = threading.Lock()
+        self.broadcast_coalescer = BroadcastCoalescer(self._flush_client_updates)
         self.headers: Optional[Dict[str, str]] = None
+        self.website_response_cache: Dict[str, tuple[str, Any]] = {}
+        self.website_changes_token: Optional[str] = None
 
         self.sort_column = "timestamp_combined"
         self.sort_reverse = True
@@ -494,6 +421,10 @@ class MainApp(ctk.CTk):
         self.data_tab = self.tab_view.add("Datenansicht")
         self.settings_tab = self.tab_view.add("Einstellungen")
         self.tree: Optional[ttk.Treeview] = None
+        # Angezeigte Zeilen (app_item_id -> (values, tags, Sortierschlüssel)) und deren Reihenfolge als
+        # aufsteigend sortierte Liste (Sortierschlüssel, app_item_id) für bisect
+        self.tree_rows: Dict[str, Tuple[tuple, tuple, Any]] = {}
+        self.tree_order: List[Tuple[Any, str]] = []
         self.setup_data_view(self.data_tab)
         self.setup_settings_view(self.settings_tab)
 
@@ -566,7 +497,7 @@ class MainApp(ctk.CTk):
         if not self.headers: return
         self.pull_race_runs_from_website()
         if not self.racers_by_start_number:
-            current_racers = self.get_data_website(f"{self.settings_data['API Endpoint Website']}racers/")
+            current_racers = self.get_data_website(f"{self.settings_data['API Endpoint Website']}racers/?fields={RACER_LOOKUP_FIELDS}")
             if current_racers:
                 self._update_racer_data_store(current_racers, from_website_pull=False)
 
@@ -589,7 +520,19 @@ class MainApp(ctk.CTk):
     def get_data_website(self, url):
         for i in range(5):
             try:
-                return requests.get(url, headers=self.headers).json()
+                request_headers = dict(self.headers or {})
+                cached = self.website_response_cache.get(url)
+                if cached:
+                    request_headers["If-None-Match"] = cached[0]
+                response = requests.get(url, headers=request_headers)
+                if response.status_code == 304 and cached:
+                    # Unverändert seit dem letzten Abruf: Server hat weder serialisiert noch Daten gesendet
+                    return copy.deepcopy(cached[1])
+                data = response.json()
+                etag = response.headers.get("ETag")
+                if response.ok and etag:
+                    self.website_response_cache[url] = (etag, data)
+                return copy.deepcopy(data) if etag else data
             except Exception as e:
                 print(f"Error: {e}. Website connect wird gestartet")
                 self.website_connect()
@@ -599,22 +542,24 @@ class MainApp(ctk.CTk):
         self.force_push_button.configure(state="disabled")
         return None
 
+    def _build_race_run_payload(self, data: Dict, run_identifier=1) -> Dict[str, Any]:
+        return {
+            "racer_start_number": str(data.get("start_nummer")),
+            "time_in_seconds": data.get("renn_zeit"),
+            "run_identifier": run_identifier,
+            "run_type": data.get("round_number"),
+            "recorded_at": data.get('timestamp_messung'),
+            "disqualified": data.get('disqualified', False),
+            "notes": data.get('notes')
+        }
+
     def push_data_website(self, data: Dict, run_identifier=1) -> tuple[bool, Optional[str]]:
         print("Pushing data:", data)
         try:
             base_url = f"{self.settings_data['API Endpoint Website']}raceruns/"
             response = None
 
-            # GEÄNDERT: Payload-Erstellung ist konsistenter
-            payload = {
-                "racer_start_number": str(data.get("start_nummer")),
-                "time_in_seconds": data.get("renn_zeit"),
-                "run_identifier": run_identifier,
-                "run_type": data.get("round_number"),
-                "recorded_at": data.get('timestamp_messung'),
-                "disqualified": data.get('disqualified', False),
-                "notes": data.get('notes')
-            }
+            payload = self._build_race_run_payload(data, run_identifier)
 
             item_id = data.get('app_item_id')  # ID aus der App, nicht zwangsläufig Server-ID
 
@@ -646,6 +591,54 @@ class MainApp(ctk.CTk):
             print(f"Ein unerwarteter Fehler ist aufgetreten: {e}")
             return False, data.get("app_item_id")
 
+    def push_batch_website(self, data_list: List[Dict], run_identifier=1) -> List[tuple[bool, Optional[str]]]:
+        """
+        Pusht alle Änderungen mit einem einzigen Request an /raceruns/bulk/.
+        Liefert wie push_data_website ein (Erfolg, app_item_id)-Tupel pro Eintrag.
+        Fällt auf Einzel-Requests zurück, wenn der Server den Bulk-Endpunkt nicht kennt.
+        """
+        if not data_list:
+            return []
+
+        upserts, deletes = [], []
+        for data in data_list:
+            payload = self._build_race_run_payload(data, run_identifier)
+            item_id = data.get("app_item_id")
+            payload["ref"] = item_id
+            # Vom Server geladene Einträge tragen die Server-ID als app_item_id
+            if item_id and str(item_id).isdigit():
+                payload["id"] = int(item_id)
+            (deletes if data.get("_action") == "delete" else upserts).append(payload)
+
+        try:
+            bulk_url = f"{self.settings_data['API Endpoint Website']}raceruns/bulk/"
+            response = requests.post(bulk_url, json={"upserts": upserts, "deletes": deletes}, headers=self.headers)
+            if response.status_code in (404, 405):
+                print("Bulk-Endpunkt nicht verfügbar, pushe einzeln.")
+                return [self.push_data_website(data, run_identifier) for data in data_list]
+            response.raise_for_status()
+            result = response.json()
+        except requests.HTTPError as http_err:
+            print(f"HTTP-Fehler beim Bulk-Push: {http_err}")
+            try:
+                print(f"API-Antwort: {http_err.response.json()}")
+            except ValueError:
+                print(f"API-Antwort (Text): {http_err.response.text}")
+            return [(False, data.get("app_item_id")) for data in data_list]
+        except requests.RequestException as req_err:
+            print(f"Netzwerk- oder Verbindungsfehler beim Bulk-Push: {req_err}")
+            return [(False, data.get("app_item_id")) for data in data_list]
+
+        successful_refs = set()
+        for item_result in result.get("results", []):
+            if item_result.get("status") == "invalid":
+                print(f"Bulk-Push Fehler für {item_result.get('ref')}: {item_result.get('errors')}")
+            else:
+                successful_refs.add(item_result.get("ref"))
+        print(f"Bulk-Push: {result.get('created', 0)} erstellt, {result.get('updated', 0)} aktualisiert, "
+              f"{result.get('deleted', 0)} gelöscht, {result.get('failed', 0)} fehlerhaft.")
+        return [(data.get("app_item_id") in successful_refs, data.get("app_item_id")) for data in data_list]
+
     # ... (Methoden: _update_racer_data_store, arduino_connection, on_closing, etc. bleiben gleich) ...
     def _update_racer_data_store(self, new_racers_list: List[Dict[str, Any]], from_website_pull: bool = True):
         self.racers_by_start_number.clear()
@@ -738,115 +731,90 @@ class MainApp(ctk.CTk):
     def on_closing(self):
         print("MainApp wird geschlossen...")
         self._apply_and_save_settings()
-        with self.client_management_lock:
-            for client_q in list(self.clients.values()):
-                try:
-                    client_q.put(None)
-                except Exception as e:
-                    print(f"Error sending sentinel to client queue on closing: {e}")
+        self.client_hub.close()
         time.sleep(0.2)
         self.destroy()
 
-    def add_client_queue(self, addr: Any, client_q: queue.Queue[Optional[str]]):
-        with self.client_management_lock: self.clients[addr] = client_q
-        print(f"Client queue for {addr} added. Sending initial data sets.")
-        self.send_all_data_to_client(client_q)
-        self.send_racer_data_to_client(client_q)
-
-    def remove_client_queue(self, addr: Any):
-        with self.client_management_lock:
-            if addr in self.clients:
-                del self.clients[addr]
-                print(f"Client queue for {addr} removed.")
-
-    # ... (Methoden: _format_item_for_client, _get_all_data_for_clients_payload, etc. bleiben gleich) ...
-    def _format_item_for_client(self, item: RaceRun) -> Optional[str]:
-        racer = self.racers_by_start_number.get(item.start_nummer)
-        racer_name_str = racer.full_name if racer else "-"
-        racer_class_str = racer.soapbox_class_display if racer else "N/A"
-
-        round_number_str = str(item.round_number)
-        renn_zeit_raw = item.renn_zeit
-        renn_zeit_str = f"{renn_zeit_raw:.3f}" if isinstance(renn_zeit_raw, (float, int)) else ""
+    def on_client_connected(self, client_id: Any):
+        # Läuft in der Event-Loop des Hubs; den Datenstand im Tk-Thread zusammenstellen
+        print(f"Client {client_id} connected. Sending initial data sets.")
+        self.after(0, self.send_initial_data_to_client, client_id)
 
-        ts_to_send_raw = item.timestamp_messung
-        timestamp_display_str = ""
-        if ts_to_send_raw:
-            try:
-                dt_obj = datetime.datetime.fromisoformat(ts_to_send_raw.replace(" ", "T"))
-                timestamp_display_str = dt_obj.strftime("%H:%M:%S (%d.%m.%Y)")
-            except ValueError:
-                timestamp_display_str = str(ts_to_send_raw)
+    def send_initial_data_to_client(self, client_id: Any):
+        # Stand der Clients erst nachziehen, falls seit dem letzten Broadcast etwas geändert wurde
+        self.broadcast_data_update()
+        self.send_all_data_to_client(client_id)
+        self.send_racer_data_to_client(client_id)
 
-        return f"{item.app_item_id}$#{item.start_nummer}$#{racer_name_str}$#{racer_class_str}$#{round_number_str}$#{renn_zeit_str}$#{timestamp_display_str}"
+    def on_client_message(self, client_id: Any, message: Dict[str, Any]):
+        if message.get("type") == MSG_RESYNC:
+            print(f"Client {client_id} requested a full resync.")
+            self.after(0, self.send_all_data_to_client, client_id)
+        else:
+            message_receive(message)
+
+    def _format_item_for_client(self, app_item_id: str, start_nummer: str, round_number: Any,
+                                renn_zeit: Optional[float], timestamp_messung: Optional[str]) -> Dict[str, Any]:
+        racer = self.racers_by_start_number.get(start_nummer)
+        return {
+            "app_item_id": app_item_id,
+            "start_nummer": start_nummer,
+            "racer_name": racer.full_name if racer else "-",
+            "soapbox_class": racer.soapbox_class_display if racer else "N/A",
+            "round_number": str(round_number),
+            "renn_zeit": f"{renn_zeit:.3f}" if isinstance(renn_zeit, (float, int)) else "",
+            "mess_zeit": format_timestamp_for_client(timestamp_messung),
+        }
 
-    def _get_all_data_for_clients_payload(self) -> str:
-        all_items_formatted_strings = []
-        with self.data_lock:
-            for item in self.data_items.values():
-                if item.status == STATUS_DELETED: continue
-                formatted_item = self._format_item_for_client(item)
-                if formatted_item: all_items_formatted_strings.append(formatted_item)
-        if not all_items_formatted_strings: return "ALL_DATA_EMPTY"
-        return "ALL_DATA:" + "|".join(all_items_formatted_strings)
-
-    def send_all_data_to_client(self, client_q: queue.Queue[Optional[str]]):
-        payload = self._get_all_data_for_clients_payload()
-        try:
-            client_q.put(payload)
-        except Exception as e:
-            print(f"Error putting all_data (race runs) payload to client queue: {e}")
+    def send_all_data_to_client(self, client_id: Any):
+        # Unter dem Lock senden, damit der Stand im Hub vor allen späteren Deltas einsortiert wird
+        with self.client_sync_lock:
+            self.client_hub.send(client_id, {"type": MSG_ALL_DATA, "seq": self.client_sequence,
+                                             "items": list(self.client_items.values())})
 
-    def _get_racer_data_payload(self) -> str:
-        if not self.racers_by_start_number: return "RACER_DATA_EMPTY"
-        payload_parts = [f"{sn}:{racer.full_name}:{racer.soapbox_class_display}" for sn, racer in
-                         self.racers_by_start_number.items()]
-        return "RACER_DATA_UPDATE:" + "|".join(payload_parts)
+    def _get_racer_data_payload(self) -> Dict[str, Any]:
+        racers = [{"start_number": sn, "full_name": racer.full_name, "soapbox_class_display": racer.soapbox_class_display}
+                  for sn, racer in self.racers_by_start_number.items()]
+        return {"type": MSG_RACER_DATA, "racers": racers}
 
-    def send_racer_data_to_client(self, client_q: queue.Queue[Optional[str]]):
-        payload = self._get_racer_data_payload()
-        try:
-            client_q.put(payload)
-        except Exception as e:
-            print(f"Error putting racer_data payload to client queue: {e}")
+    def send_racer_data_to_client(self, client_id: Any):
+        self.client_hub.send(client_id, self._get_racer_data_payload())
 
     def broadcast_racer_data(self):
-        payload = self._get_racer_data_payload()
-        if payload is None: return
-        with self.client_management_lock:
-            for addr, client_q in self.clients.items():
-                try:
-                    client_q.put(payload)
-                except Exception as e:
-                    print(f"Error putting racer_data message to client queue for {addr}: {e}")
-        print(f"Racer data broadcasted to {len(self.clients)} clients.")
-
-    def broadcast_data_update(self, item_id_updated: Optional[str] = None, is_delete: bool = False):
-        payload: Optional[str] = None
-        if item_id_updated and is_delete:
-            payload = f"DELETE_DATA:{item_id_updated}"
-        elif item_id_updated:
-            with self.data_lock:
-                item = self.data_items.get(item_id_updated)
-                if item and item.status != STATUS_DELETED:
-                    formatted_item = self._format_item_for_client(item)
-                    if formatted_item:
-                        payload = f"UPDATE_DATA:{formatted_item}"
-                    else:
-                        return
-                else:
-                    payload = f"DELETE_DATA:{item_id_updated}"
-        else:
-            payload = self._get_all_data_for_clients_payload()
+        self.client_hub.broadcast(self._get_racer_data_payload())
+        print(f"Racer data broadcasted to {self.client_hub.client_count} clients.")
+        # Geänderte Namen/Klassen in den Läufen nachziehen
+        self.broadcast_data_update()
 
-        if payload is None: return
+    def broadcast_data_update(self, item_id_updated: Optional[str] = None):
+        """Meldet einen geänderten Eintrag (ohne ID: alle) an die Clients; gesendet wird gebündelt."""
+        self.broadcast_coalescer.mark(None if item_id_updated is None else [item_id_updated])
 
-        with self.client_management_lock:
-            for addr, client_q in self.clients.items():
-                try:
-                    client_q.put(payload)
-                except Exception as e:
-                    print(f"Error putting race run message to client queue for {addr}: {e}")
+    def _flush_client_updates(self, item_ids: Optional[Set[str]]):
+        """
+        Vergleicht den aktuellen Stand der Einträge `item_ids` (None: alle) mit dem, was die Clients kennen,
+        und verschickt nur die Unterschiede als ein Delta mit fortlaufender Sequenznummer.
+        Läuft im Thread des BroadcastCoalescer; unter data_lock werden nur die benötigten Felder kopiert.
+        """
+        with self.data_lock:
+            ids = list(self.data_items) if item_ids is None else item_ids
+            rows = [(item.app_item_id, item.start_nummer, item.round_number, item.renn_zeit, item.timestamp_messung)
+                    for item in map(self.data_items.get, ids) if item and item.status != STATUS_DELETED]
+        current = {row[0]: self._format_item_for_client(*row) for row in rows}
+
+        with self.client_sync_lock:
+            known_ids = list(self.client_items) if item_ids is None else item_ids
+            upserts = [entry for item_id, entry in current.items() if self.client_items.get(item_id) != entry]
+            deletes = [item_id for item_id in known_ids if item_id in self.client_items and item_id not in current]
+            if not upserts and not deletes:
+                return
+            for entry in upserts:
+                self.client_items[entry["app_item_id"]] = entry
+            for item_id in deletes:
+                del self.client_items[item_id]
+            self.client_sequence += 1
+            self.client_hub.broadcast({"type": MSG_DELTA, "seq": self.client_sequence,
+                                       "upserts": upserts, "deletes": deletes})
 
     def setup_data_view(self, parent_frame: ctk.CTkFrame):
         # unverändert
@@ -1059,7 +1027,7 @@ class MainApp(ctk.CTk):
             )
             self.data_items[new_item_id] = new_run
 
-        self.after(0, self.refresh_treeview_display_fully)
+        self.after(0, self.refresh_tree_items, [new_item_id])
         self.broadcast_data_update(new_item_id)
         self._trigger_auto_sync()  # NEU
         return new_item_id
@@ -1084,7 +1052,7 @@ class MainApp(ctk.CTk):
                                                                                          STATUS_COMPLETE]):
                 item.status = STATUS_COMPLETE
 
-        self.after(0, self.refresh_treeview_display_fully)
+        self.after(0, self.refresh_tree_items, [item_id])
         self.broadcast_data_update(item_id)
         self._trigger_auto_sync()  # NEU
 
@@ -1322,8 +1290,8 @@ class MainApp(ctk.CTk):
                                                      "original_status": item_to_delete.status}
                 item_to_delete.status = STATUS_DELETED
 
-        self.refresh_treeview_display_fully()
-        self.broadcast_data_update(item_id, is_delete=True)
+        self.refresh_tree_items([item_id])
+        self.broadcast_data_update(item_id)
         self._trigger_auto_sync()  # NEU
 
     # GEÄNDERT: Ruft Auto-Sync auf
@@ -1341,7 +1309,7 @@ class MainApp(ctk.CTk):
             item.status = restore_info.get("original_status", STATUS_MODIFIED)
             item.data_before_delete = None
 
-        self.refresh_treeview_display_fully()
+        self.refresh_tree_items([item_id])
         self.broadcast_data_update(item_id)
         self._trigger_auto_sync()  # NEU
 
@@ -1410,6 +1378,18 @@ class MainApp(ctk.CTk):
                 seen[key] = item.app_item_id
         return True
 
+    @staticmethod
+    def _is_on_website(item: RaceRun) -> bool:
+        # Vom Server geladene Einträge tragen die Server-ID als app_item_id
+        return item._synced_to_website or str(item.app_item_id).isdigit()
+
+    def _drop_local_deletions(self, item_ids: List[str]):
+        """Entfernt gelöschte Einträge, die nie auf der Website waren, nur lokal. Erwartet data_lock."""
+        for item_id in item_ids:
+            self.data_items.pop(item_id, None)
+        if item_ids:
+            self.after(0, self.refresh_tree_items, item_ids)
+
     def _collect_data_for_website_push(self) -> tuple[List[Dict[str, Any]], List[str], List[str]]:
         if not self._check_for_double_data():
             return [], [], []
@@ -1417,6 +1397,7 @@ class MainApp(ctk.CTk):
         data_for_website = []
         items_to_mark_synced_after_push = []
         items_to_delete_permanently_after_push = []
+        local_only_deletions = []
 
         with self.data_lock:
             for item in self.data_items.values():
@@ -1424,10 +1405,13 @@ class MainApp(ctk.CTk):
                 payload["app_item_id"] = item.app_item_id
 
                 if item.status == STATUS_DELETED:
-                    if item.data_before_delete or item._synced_to_website:
+                    # Ein Delete über (Startnummer, Lauf) für einen nie gepushten Eintrag könnte einen fremden Lauf treffen
+                    if self._is_on_website(item):
                         payload["_action"] = "delete"
                         data_for_website.append(payload)
                         items_to_delete_permanently_after_push.append(item.app_item_id)
+                    else:
+                        local_only_deletions.append(item.app_item_id)
                 elif not item._synced_to_website:
                     payload["_action"] = "upsert"
                     data_for_website.append(payload)
@@ -1436,6 +1420,7 @@ class MainApp(ctk.CTk):
                     payload["_action"] = "changed"
                     data_for_website.append(payload)
                     items_to_mark_synced_after_push.append(item.app_item_id)
+            self._drop_local_deletions(local_only_deletions)
 
         return data_for_website, items_to_mark_synced_after_push, items_to_delete_permanently_after_push
 
@@ -1453,8 +1438,8 @@ class MainApp(ctk.CTk):
 
         def _push_task():
             successful_upsert_ids, successful_delete_ids, had_errors = [], [], False
-            for p_data in data_to_send:
-                success, item_id = self.push_data_website(p_data)
+            push_results = self.push_batch_website(data_to_send)
+            for p_data, (success, item_id) in zip(data_to_send, push_results):
                 if success:
                     if p_data.get("_action") == "delete":
                         if item_id: successful_delete_ids.append(item_id)
@@ -1558,7 +1543,7 @@ class MainApp(ctk.CTk):
 
         server_item_count = len(website_data_to_backup)
         with self.data_lock:
-            local_item_count = sum(1 for details in self.data_items.values() if details.get("status") != STATUS_DELETED)
+            local_item_count = sum(1 for item in self.data_items.values() if item.status != STATUS_DELETED)
 
         # Schritt 2: Zeige Bestätigungsdialog
         user_confirmed = queue.Queue()
@@ -1586,42 +1571,38 @@ class MainApp(ctk.CTk):
             self.after(0, self._reenable_push_buttons)
             return
 
-        # Schritt 4: Alle Einträge auf der Website löschen
-        self.after(0, lambda: self.force_push_button.configure(text="Lösche alle..."))
-        server_item_ids = {str(item.get('id')) for item in website_data_to_backup if item.get('id')}
-
-        print(f"--- Zwangspush: Lösche {len(server_item_ids)} Einträge auf der Website. ---")
-        delete_errors = 0
-        for item_id_to_delete in server_item_ids:
-            delete_url = f"{api_endpoint}raceruns/{item_id_to_delete}/"
-            try:
-                response = requests.delete(delete_url, headers=self.headers)
-                if response.status_code not in [204, 404]:
-                    response.raise_for_status()
-            except Exception as e:
-                print(f"Fehler beim Löschen von Item {item_id_to_delete} auf der Website: {e}")
-                delete_errors += 1
-
-        # Schritt 5: Alle lokalen, nicht gelöschten Einträge als NEUE Einträge pushen
-        self.after(0, lambda: self.force_push_button.configure(text="Pushe alle..."))
+        # Schritt 4: Website-Bestand in einer Transaktion durch alle lokalen, nicht gelöschten Einträge ersetzen
+        self.after(0, lambda: self.force_push_button.configure(text="Ersetze alle..."))
         with self.data_lock:
-            items_to_push = [copy.deepcopy(details.get("data", {})) for details in self.data_items.values() if
-                             details.get("status") != STATUS_DELETED]
-            items_to_delete = [key for key, value in self.data_items.items() if
-                               value.get("status") == STATUS_DELETED]
-            for item in items_to_push:
-                item['_action'] = 'upsert'
-            for item in items_to_delete:
-                self.data_items.pop(item)
-
-        print(f"--- Zwangspush: Pushe {len(items_to_push)} lokale Einträge zur Website. ---")
-        push_errors = 0
-        for item_data in items_to_push:
-            success, _ = self.push_data_website(item_data)
-            if not success:
-                push_errors += 1
-
-        # Schritt 6: Finalisierung und Merge-Dialog im Main-Thread aufrufen
+            items_to_push = []
+            for item in self.data_items.values():
+                if item.status != STATUS_DELETED:
+                    payload = self._build_race_run_payload(item.to_data_dict())
+                    payload["ref"] = item.app_item_id
+                    items_to_push.append(payload)
+            items_to_delete = [key for key, item in self.data_items.items() if item.status == STATUS_DELETED]
+            for item_id in items_to_delete:
+                self.data_items.pop(item_id)
+
+        print(f"--- Zwangspush: Ersetze {len(website_data_to_backup)} Website-Einträge durch {len(items_to_push)} lokale. ---")
+        push_errors, delete_errors = 0, 0
+        try:
+            response = requests.post(f"{api_endpoint}raceruns/replace/", json={"runs": items_to_push},
+                                     headers=self.headers)
+            if response.status_code != 400:
+                response.raise_for_status()
+            result = response.json()
+            for item_result in result.get("results", []):
+                if item_result.get("status") == "invalid":
+                    print(f"Zwangspush Fehler für {item_result.get('ref')}: {item_result.get('errors')}")
+            if response.status_code == 400:
+                # Der Server ersetzt nur vollständig gültige Datensätze, es wurde also nichts geändert.
+                push_errors = len(items_to_push)
+        except (requests.RequestException, ValueError) as e:
+            print(f"Fehler beim Zwangspush: {e}")
+            push_errors = len(items_to_push)
+
+        # Schritt 5: Finalisierung und Merge-Dialog im Main-Thread aufrufen
         self.after(0, self._finalize_force_push, len(items_to_push), push_errors, delete_errors)
 
     def _ask_for_force_push_confirmation(self, server_count, local_count, result_queue):
@@ -1683,18 +1664,17 @@ class MainApp(ctk.CTk):
             return
 
         had_errors = False
-        for data in data_to_send:
-            success, item_id = self.push_data_website(data)
+        push_results = self.push_batch_website(data_to_send)
+        for data, (success, item_id) in zip(data_to_send, push_results):
             if success:
                 self.after(0, self._finalize_single_push_success, item_id, data.get("_action", ""))
             else:
                 print(f"!!! Auto-Sync FEHLER beim Pushen von Item {item_id}. Synchronisierung wird pausiert. !!!")
                 had_errors = True
                 self.auto_sync_paused_due_to_error = True
-                break
 
         if not had_errors:
-            self.pull_race_runs_from_website()
+            self.pull_race_run_changes_from_website()
         self.auto_sync_in_progress = False
         self.after(0, self._update_sync_status_label)
         print("--- Auto-Sync beendet ---")
@@ -1707,6 +1687,9 @@ class MainApp(ctk.CTk):
 
             payload = item.to_data_dict()
             payload["app_item_id"] = item.app_item_id
+            if item.status == STATUS_DELETED and not self._is_on_website(item):
+                self._drop_local_deletions([item_id])
+                return
             if item.status == STATUS_DELETED:
                 payload["_action"] = "delete"
             elif not item._synced_to_website:
@@ -1744,8 +1727,8 @@ class MainApp(ctk.CTk):
                     item.status = STATUS_SYNCED
                     item._synced_to_website = True
 
-        self.refresh_treeview_display_fully()
-        self.broadcast_data_update(item_id, is_delete=(action == "delete"))
+        self.refresh_tree_items([item_id])
+        self.broadcast_data_update(item_id)
 
     def open_pull_selection_dialog(self):
         dialog = ctk.CTkToplevel(self)
@@ -1784,7 +1767,7 @@ class MainApp(ctk.CTk):
         print(f"--- Pull von Racer-Daten von ({api_endpoint}) ---")
 
         def _do_racer_pull():
-            racers_payload = self.get_data_website(api_endpoint + "racers/")
+            racers_payload = self.get_data_website(f"{api_endpoint}racers/?fields={RACER_LOOKUP_FIELDS}")
             if racers_payload is None:
                 self.after(0, lambda: messagebox.showerror("Pull Fehler", "Konnte keine Racer-Daten abrufen.",
                                                            parent=self))
@@ -1869,49 +1852,145 @@ class MainApp(ctk.CTk):
         # Diese Methode ist jetzt quasi ein Alias für _initiate_merge_with_website_data
         self._initiate_merge_with_website_data(website_data_list)
 
-    def _process_pulled_website_data(self, website_data_list: List[Dict[str, Any]]):
+    def _race_run_from_website(self, web_item_payload: Dict[str, Any]) -> Optional[RaceRun]:
+        item_id_from_web = web_item_payload.get("id")
+        if not item_id_from_web: return None
+
+        try:
+            renn_zeit_val = float(web_item_payload.get("time_in_seconds")) if web_item_payload.get(
+                "time_in_seconds") is not None else None
+        except (ValueError, TypeError):
+            renn_zeit_val = None
+
+        recorded_at_str = web_item_payload.get("recorded_at")
+        timestamp = datetime.datetime.now().isoformat()
+        if recorded_at_str:
+            try:
+                timestamp = datetime.datetime.fromisoformat(
+                    str(recorded_at_str).replace("Z", "+00:00")).isoformat()
+            except (ValueError, TypeError):
+                pass
+
+        return RaceRun(
+            app_item_id=str(item_id_from_web),
+            start_nummer=str(web_item_payload.get("racer_start_number")),
+            round_number=web_item_payload.get("run_type"),
+            renn_zeit=renn_zeit_val,
+            timestamp_messung=timestamp,
+            disqualified=web_item_payload.get("disqualified", False),
+            notes=web_item_payload.get("notes"),
+            status=STATUS_SYNCED,
+            _synced_to_website=True
+        )
+
+    def pull_race_run_changes_from_website(self):
+        """
+        Holt nur die seit dem letzten Abruf geänderten und gelöschten Läufe (/raceruns/changes/).
+        Ohne Token liefert der Server den kompletten Bestand; kennt er den Endpunkt nicht, wird voll gepullt.
+        """
+        url = f"{self.settings_data['API Endpoint Website']}raceruns/changes/"
+
+        def _do_changes_pull():
+            params = {"since": self.website_changes_token} if self.website_changes_token else None
+            try:
+                response = requests.get(url, params=params, headers=self.headers)
+                if response.status_code in (404, 405):
+                    self.pull_race_runs_from_website()
+                    return
+                response.raise_for_status()
+                changes = response.json()
+            except (requests.RequestException, ValueError) as e:
+                print(f"Fehler beim Abruf der Änderungen von der Website: {e}")
+                return
+
+            if changes.get("full"):
+                self.after(0, self._process_pulled_website_data, changes.get("results", []), True)
+            else:
+                self.after(0, self._apply_website_changes, changes)
+            self.website_changes_token = changes.get("token")
+
+        threading.Thread(target=_do_changes_pull, daemon=True).start()
+
+    def _apply_website_changes(self, changes: Dict[str, Any]):
+        updated = [run for run in map(self._race_run_from_website, changes.get("results", [])) if run]
+        deleted_ids = [str(item_id) for item_id in changes.get("deleted", [])]
+        if not updated and not deleted_ids:
+            return
+
+        conflicts = []
+        with self.data_lock:
+            for item_id in deleted_ids:
+                item = self.data_items.get(item_id)
+                if item is None:
+                    continue
+                if self._has_unpushed_edit(item):
+                    conflicts.append(item)
+                else:
+                    del self.data_items[item_id]
+
+            # Lokal angelegte und bereits gepushte Einträge werden durch ihre Server-Version (Server-ID) ersetzt
+            local_copies = {(item.start_nummer, item.round_number): item_id
+                            for item_id, item in self.data_items.items()
+                            if item._synced_to_website and not str(item_id).isdigit()}
+            for new_run in updated:
+                existing = self.data_items.get(new_run.app_item_id)
+                if existing and not existing._synced_to_website:
+                    continue  # Lokale, noch nicht gepushte Änderung nicht überschreiben
+                local_copy_id = local_copies.pop((new_run.start_nummer, new_run.round_number), None)
+                if local_copy_id:
+                    self.data_items.pop(local_copy_id, None)
+                self.data_items[new_run.app_item_id] = new_run
+
+        self.refresh_treeview_display_fully()
+        self.broadcast_data_update()
+        self._report_website_deletion_conflicts(conflicts)
+
+    @staticmethod
+    def _has_unpushed_edit(item: RaceRun) -> bool:
+        # Lokal gelöschte Einträge sind kein Konflikt, wenn die Website sie ebenfalls gelöscht hat
+        return not item._synced_to_website and item.status != STATUS_DELETED
+
+    def _report_website_deletion_conflicts(self, conflicts: List[RaceRun]):
+        """
+        Lokal geänderte, noch nicht gepushte Einträge, die auf der Website gelöscht wurden, bleiben erhalten.
+        Der nächste Push legt sie dort neu an; ob sie noch gebraucht werden, entscheidet der Benutzer.
+        """
+        if not conflicts:
+            return
+        entries = "\n".join(f"SN:{item.start_nummer} RD:{item.round_number}" for item in conflicts)
+        messagebox.showwarning(
+            "Konflikt beim Website-Abgleich",
+            f"{len(conflicts)} lokal geänderte Einträge wurden auf der Website gelöscht:\n{entries}\n\n"
+            "Sie bleiben lokal erhalten und werden beim nächsten Push erneut übertragen. "
+            "Nicht mehr benötigte Einträge bitte lokal löschen.",
+            parent=self)
+
+    def _process_pulled_website_data(self, website_data_list: List[Dict[str, Any]], keep_unpushed: bool = False):
         if not isinstance(website_data_list, list):
             messagebox.showinfo("Pull Renndaten", "Keine oder ungültige Renndaten von der Website empfangen.",
                                 parent=self)
             return
 
+        conflicts = []
         with self.data_lock:
+            # Beim automatischen Abgleich dürfen noch nicht gepushte lokale Änderungen nicht verloren gehen
+            unpushed = {item_id: item for item_id, item in self.data_items.items()
+                        if self._has_unpushed_edit(item)} if keep_unpushed else {}
             self.data_items.clear()
+            website_ids = set()
             for web_item_payload in website_data_list:
-                item_id_from_web = web_item_payload.get("id")
-                if not item_id_from_web: continue
-                item_id_str = str(item_id_from_web)
-
-                try:
-                    renn_zeit_val = float(web_item_payload.get("time_in_seconds")) if web_item_payload.get(
-                        "time_in_seconds") is not None else None
-                except (ValueError, TypeError):
-                    renn_zeit_val = None
-
-                recorded_at_str = web_item_payload.get("recorded_at")
-                timestamp = datetime.datetime.now().isoformat()
-                if recorded_at_str:
-                    try:
-                        timestamp = datetime.datetime.fromisoformat(
-                            str(recorded_at_str).replace("Z", "+00:00")).isoformat()
-                    except (ValueError, TypeError):
-                        pass
-
-                new_run = RaceRun(
-                    app_item_id=item_id_str,
-                    start_nummer=str(web_item_payload.get("racer_start_number")),
-                    round_number=web_item_payload.get("run_type"),
-                    renn_zeit=renn_zeit_val,
-                    timestamp_messung=timestamp,
-                    disqualified=web_item_payload.get("disqualified", False),
-                    notes=web_item_payload.get("notes"),
-                    status=STATUS_SYNCED,
-                    _synced_to_website=True
-                )
-                self.data_items[item_id_str] = new_run
+                new_run = self._race_run_from_website(web_item_payload)
+                if new_run:
+                    website_ids.add(new_run.app_item_id)
+                    if new_run.app_item_id not in unpushed:
+                        self.data_items[new_run.app_item_id] = new_run
+            conflicts = [item for item_id, item in unpushed.items()
+                         if str(item_id).isdigit() and item_id not in website_ids]
+            self.data_items.update(unpushed)
 
         self.refresh_treeview_display_fully()
         self.broadcast_data_update()
+        self._report_website_deletion_conflicts(conflicts)
 
     def _sort_by_column(self, col):
         if self.sort_column == col:
@@ -1921,7 +2000,82 @@ class MainApp(ctk.CTk):
             self.sort_reverse = True
         self.refresh_treeview_display_fully()
 
+    def _tree_sort_key(self, item: RaceRun):
+        if self.sort_column == "timestamp_combined":
+            try:
+                dt = datetime.datetime.fromisoformat(item.timestamp_messung.replace("Z", "+00:00"))
+                return dt.replace(tzinfo=None)  # FIX: Macht den Zeitstempel "naive"
+            except (TypeError, ValueError, AttributeError):
+                return datetime.datetime.min
+        elif self.sort_column == "start_number":
+            try:
+                return int(item.start_nummer)
+            except (ValueError, TypeError):
+                return 0
+        elif self.sort_column == "racer_name":
+            racer = self.racers_by_start_number.get(item.start_nummer)
+            return racer.full_name if racer else "zzzz"
+        elif self.sort_column == "soapbox_class":
+            racer = self.racers_by_start_number.get(item.start_nummer)
+            return racer.soapbox_class_display if racer else "zzzz"
+        elif self.sort_column == "time_required":
+            return item.renn_zeit if item.renn_zeit is not None else 99999.0
+        return datetime.datetime.min
+
+    def _tree_row(self, item: RaceRun, search_term: str) -> Optional[Tuple[tuple, tuple, Any]]:
+        """(values, tags, Sortierschlüssel) einer Zeile oder None, wenn der Eintrag nicht zur Suche passt."""
+        values = self._create_tree_item_values(item)
+        if search_term and search_term not in ' '.join(map(str, values)).lower():
+            return None
+        # Das "pushable"-Tag gehört zum Push-Symbol in der ersten Spalte
+        tags = (item.status, "pushable") if values[0] == "📤" else (item.status,)
+        return values, tags, self._tree_sort_key(item)
+
+    def _tree_index(self, position: int) -> int:
+        # tree_order ist aufsteigend, bei absteigender Sortierung wird von hinten gezählt
+        return len(self.tree_order) - 1 - position if self.sort_reverse else position
+
+    def refresh_tree_items(self, item_ids: Iterable[str]):
+        """
+        Gleicht nur die Zeilen `item_ids` mit den Daten ab: neue einfügen, geänderte per item()
+        aktualisieren, bei geändertem Sortierschlüssel per move() an die per bisect gefundene Stelle
+        verschieben, gelöschte entfernen. Alle anderen Zeilen bleiben unangetastet.
+        """
+        if not self.tree or not self.winfo_exists(): return
+        search_term = self.search_var.get().lower()
+        with self.data_lock:
+            rows = {item_id: self._tree_row(self.data_items[item_id], search_term)
+                    if item_id in self.data_items else None for item_id in item_ids}
+
+        for item_id, row in rows.items():
+            cached = self.tree_rows.get(item_id)
+            if cached is not None:
+                old_values, old_tags, old_key = cached
+                if row is None or row[2] != old_key:
+                    self.tree_order.pop(bisect.bisect_left(self.tree_order, (old_key, item_id)))
+            if row is None:
+                if cached is not None:
+                    del self.tree_rows[item_id]
+                    self.tree.delete(item_id)
+                continue
+
+            values, tags, sort_key = row
+            if cached is None or sort_key != old_key:
+                position = bisect.bisect_left(self.tree_order, (sort_key, item_id))
+                self.tree_order.insert(position, (sort_key, item_id))
+                if cached is None:
+                    self.tree.insert("", self._tree_index(position), iid=item_id, values=values, tags=tags)
+                else:
+                    self.tree.move(item_id, "", self._tree_index(position))
+            if cached is not None and (values, tags) != (old_values, old_tags):
+                self.tree.item(item_id, values=values, tags=tags)
+            self.tree_rows[item_id] = row
+
     def refresh_treeview_display_fully(self):
+        """
+        Gleicht alle Zeilen mit den Daten, der Suche und der Sortierung ab. Unveränderte Zeilen werden
+        nicht angefasst, verschoben werden nur Zeilen, die nicht an ihrer Stelle stehen.
+        """
         if not self.tree or not self.winfo_exists(): return
 
         for col_id in self.tree_columns:
@@ -1930,60 +2084,40 @@ class MainApp(ctk.CTk):
                 text += " ▲" if not self.sort_reverse else " ▼"
             self.tree.heading(col_id, text=text)
 
-        selected_iids = self.tree.selection()
-        for i in self.tree.get_children(""): self.tree.delete(i)
-
+        search_term = self.search_var.get().lower()
         with self.data_lock:
-            search_term = self.search_var.get().lower()
-
-            # GEÄNDERT: Filter- und Sortierlogik arbeitet mit RaceRun-Objekten
-            filtered_items: List[RaceRun]
-            if search_term:
-                filtered_items = []
-                for item in self.data_items.values():
-                    values_tuple = self._create_tree_item_values(item)
-                    values_str = ' '.join(map(str, values_tuple)).lower()
-                    if search_term in values_str:
-                        filtered_items.append(item)
+            rows = {item_id: row for item_id, item in self.data_items.items()
+                    if (row := self._tree_row(item, search_term)) is not None}
+
+        for item_id in [item_id for item_id in self.tree_rows if item_id not in rows]:
+            del self.tree_rows[item_id]
+            self.tree.delete(item_id)
+        for item_id, row in rows.items():
+            cached = self.tree_rows.get(item_id)
+            if cached is None:
+                self.tree.insert("", "end", iid=item_id, values=row[0], tags=row[1])
+            elif cached[:2] != row[:2]:
+                self.tree.item(item_id, values=row[0], tags=row[1])
+            self.tree_rows[item_id] = row
+
+        self.tree_order = sorted((row[2], item_id) for item_id, row in rows.items())
+        target_order = [item_id for _, item_id in self.tree_order]
+        if self.sort_reverse:
+            target_order.reverse()
+        current_order = self.tree.get_children("")
+        if list(current_order) == target_order:
+            return
+        # Der Baum besteht jeweils aus den bereits platzierten Zeilen und dahinter den übrigen in alter
+        # Reihenfolge; ein Zeiger auf die erste übrige Zeile ersetzt das Nachführen einer Liste
+        placed, position = set(), 0
+        for index, item_id in enumerate(target_order):
+            while current_order[position] in placed:
+                position += 1
+            if current_order[position] == item_id:
+                position += 1
             else:
-                filtered_items = list(self.data_items.values())
-
-            # GEÄNDERT: Behebt den `TypeError` durch Normalisierung der Zeitstempel
-            def get_sort_key(item: RaceRun):
-                if self.sort_column == "timestamp_combined":
-                    try:
-                        dt = datetime.datetime.fromisoformat(item.timestamp_messung.replace("Z", "+00:00"))
-                        return dt.replace(tzinfo=None)  # FIX: Macht den Zeitstempel "naive"
-                    except (TypeError, ValueError):
-                        return datetime.datetime.min
-                elif self.sort_column == "start_number":
-                    try:
-                        return int(item.start_nummer)
-                    except (ValueError, TypeError):
-                        return 0
-                elif self.sort_column == "racer_name":
-                    racer = self.racers_by_start_number.get(item.start_nummer)
-                    return racer.full_name if racer else "zzzz"
-                elif self.sort_column == "soapbox_class":
-                    racer = self.racers_by_start_number.get(item.start_nummer)
-                    return racer.soapbox_class_display if racer else "zzzz"
-                elif self.sort_column == "time_required":
-                    return item.renn_zeit if item.renn_zeit is not None else 99999.0
-                return datetime.datetime.min
-
-            sorted_items = sorted(filtered_items, key=get_sort_key, reverse=self.sort_reverse)
-
-            for item in sorted_items:
-                values = self._create_tree_item_values(item)
-                # NEU: Fügt das "pushable"-Tag hinzu, wenn das Symbol angezeigt wird
-                tags = [item.status]
-                if values[0] == "📤":  # Prüft, ob das Push-Symbol in der ersten Spalte ist
-                    tags.append("pushable")
-                self.tree.insert("", "end", iid=item.app_item_id, values=values, tags=tuple(tags))
-
-        if selected_iids:
-            valid_selection = [sid for sid in selected_iids if self.tree.exists(sid)]
-            if valid_selection: self.tree.selection_set(valid_selection)
+                self.tree.move(item_id, "", index)
+            placed.add(item_id)
 
     def show_previous_versions(self):
         if not self.versions:
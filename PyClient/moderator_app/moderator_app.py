@@ -9,34 +9,48 @@ from typing import Dict, Any, Optional
 import socket
 import queue
 import time
+import os
+import sys
+
+# Das Nachrichtenprotokoll teilen sich alle Apps über main_app/common
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "main_app"))
+from common.protocol import (
+    FrameDecoder, FrameError, encode_frame, MSG_RESYNC, MSG_ALL_DATA, MSG_DELTA,
+)
 
 HOST = '127.0.0.1'
 PORT = 65432
 received_message_queue = queue.Queue()
+message_to_server_queue = queue.Queue()
 
 
 # --- NEUER, STABILER NETZWERK-CODE ---
+def send_message_to_server_func(message: Dict[str, Any]):
+    message_to_server_queue.put(message)
+
+
 def receive_message_from_server_func(s: socket.socket):
-    buffer = ""
+    decoder = FrameDecoder()
     s.settimeout(1.0)
     while getattr(threading.current_thread(), "do_run", True):
         try:
-            data_chunk = s.recv(8192)
+            data_chunk = s.recv(65536)
             if not data_chunk:
                 print("Verbindung vom Server geschlossen.")
                 received_message_queue.put(("CONNECTION_LOST", None))
                 return
-            buffer += data_chunk.decode('utf-8')
-            while "$END$" in buffer:
-                message, buffer = buffer.split("$END$", 1)
-                if message:
-                    received_message_queue.put(("MESSAGE", message))
+            for message in decoder.feed(data_chunk):
+                received_message_queue.put(("MESSAGE", message))
         except socket.timeout:
             continue
         except (socket.error, ConnectionResetError) as e:
             print(f"Socket-Fehler im Empfänger: {e}")
             received_message_queue.put(("CONNECTION_LOST", None))
             return
+        except FrameError as e:
+            print(f"Ungültige Nachricht vom Server: {e}")
+            received_message_queue.put(("CONNECTION_LOST", None))
+            return
         except Exception as e:
             print(f"Unerwarteter Fehler im Empfänger: {e}")
             received_message_queue.put(("CONNECTION_LOST", None))
@@ -56,8 +70,16 @@ def client_communication_thread_func(app_instance):
             receiver_thread.do_run = True
             receiver_thread.start()
 
-            # Moderator-App sendet nichts, wartet nur auf das Ende des Receivers
-            receiver_thread.join()
+            # Moderator-App sendet nur Resync-Anfragen
+            while receiver_thread.is_alive():
+                try:
+                    message_to_send = message_to_server_queue.get(timeout=0.2)
+                    s.sendall(encode_frame(message_to_send))
+                except queue.Empty:
+                    continue
+                except socket.error as e:
+                    print(f"Socket-Fehler beim Senden: {e}")
+                    break
 
             receiver_thread.do_run = False
             s.close()
@@ -80,14 +102,11 @@ def process_server_messages_func(app_instance):
             app_instance.after(0, app_instance.update_connection_status, True)
 
             if msg_type == "MESSAGE":
-                if payload.startswith("ALL_DATA:"):
-                    app_instance.after(0, app_instance.process_all_data_from_server, payload[len("ALL_DATA:"):])
-                elif payload == "ALL_DATA_EMPTY":
-                    app_instance.after(0, app_instance.process_all_data_from_server, "")
-                elif payload.startswith("UPDATE_DATA:"):
-                    app_instance.after(0, app_instance.process_update_data_from_server, payload[len("UPDATE_DATA:"):])
-                elif payload.startswith("DELETE_DATA:"):
-                    app_instance.after(0, app_instance.process_delete_data_from_server, payload[len("DELETE_DATA:"):])
+                message_type = payload.get("type")
+                if message_type == MSG_ALL_DATA:
+                    app_instance.after(0, app_instance.process_all_data_from_server, payload)
+                elif message_type == MSG_DELTA:
+                    app_instance.after(0, app_instance.process_delta_from_server, payload)
         except Exception as e:
             print(f"Fehler in process_server_messages_func: {e}")
 
@@ -104,6 +123,8 @@ class ModeratorApp(ctk.CTk):
 
         self.all_race_data_dict: Dict[str, Dict[str, Any]] = {}
         self._all_race_data_lock = threading.Lock()
+        # Sequenznummer des zuletzt übernommenen Stands; None bis zum nächsten vollständigen Stand
+        self.race_data_sequence: Optional[int] = None
 
         self.main_container = ctk.CTkFrame(self, fg_color="transparent")
         self.main_container.pack(fill="both", expand=True, padx=10, pady=10)
@@ -121,6 +142,8 @@ class ModeratorApp(ctk.CTk):
         threading.Thread(target=process_server_messages_func, args=(self,), daemon=True).start()
 
     def update_connection_status(self, is_connected: bool):
+        if not is_connected:
+            self.race_data_sequence = None  # Nach dem Reconnect kommt ein vollständiger Stand
         if is_connected:
             self.status_label.configure(text="Verbunden", text_color="green")
         else:
@@ -193,38 +216,38 @@ class ModeratorApp(ctk.CTk):
             self.tree.selection_set(highlight_item_id)
             self.tree.see(highlight_item_id)
 
-    def process_all_data_from_server(self, data_payload: str):
-        new_data_dict = {}
-        if data_payload:
-            for item_str in data_payload.split('|'):
-                if not item_str: continue
-                parts = item_str.split('$#')
-                if len(parts) >= 7:
-                    item_id, start_nr, name, s_class, round_nr, run_time, ts = parts[:7]
-                    new_data_dict[item_id] = {"start_nummer": start_nr, "racer_name": name, "soapbox_class": s_class,
-                                              "round_number_main": round_nr, "renn_zeit": run_time,
-                                              "mess_zeit_combined": ts}
+    @staticmethod
+    def _race_data_from_item(item: Dict[str, Any]) -> Dict[str, Any]:
+        return {"start_nummer": item.get("start_nummer", "-"), "racer_name": item.get("racer_name", "-"),
+                "soapbox_class": item.get("soapbox_class", "-"), "round_number_main": item.get("round_number", "-"),
+                "renn_zeit": item.get("renn_zeit", ""), "mess_zeit_combined": item.get("mess_zeit", "")}
+
+    def process_all_data_from_server(self, message: Dict[str, Any]):
+        items = message.get("items", [])
+        new_data_dict = {item["app_item_id"]: self._race_data_from_item(item) for item in items if item.get("app_item_id")}
         with self._all_race_data_lock:
             self.all_race_data_dict = new_data_dict
+        self.race_data_sequence = message.get("seq")
         self._sort_and_refresh_data_treeview()
 
-    def process_update_data_from_server(self, item_payload: str):
-        if not item_payload: return
-        parts = item_payload.split('$#')
-        if len(parts) >= 7:
-            item_id, start_nr, name, s_class, round_nr, run_time, ts = parts[:7]
-            updated_data = {"start_nummer": start_nr, "racer_name": name, "soapbox_class": s_class,
-                            "round_number_main": round_nr, "renn_zeit": run_time, "mess_zeit_combined": ts}
-            with self._all_race_data_lock:
-                self.all_race_data_dict[item_id] = updated_data
-            self._sort_and_refresh_data_treeview(highlight_item_id=item_id)
-
-    def process_delete_data_from_server(self, item_id_to_delete: str):
-        item_id = item_id_to_delete.strip()
-        if item_id:
-            with self._all_race_data_lock:
-                if item_id in self.all_race_data_dict: del self.all_race_data_dict[item_id]
-            self._sort_and_refresh_data_treeview()
+    def process_delta_from_server(self, message: Dict[str, Any]):
+        sequence = message.get("seq")
+        if self.race_data_sequence is None or sequence is None or sequence <= self.race_data_sequence:
+            return  # Vor dem vollständigen Stand oder bereits darin enthalten
+        if sequence != self.race_data_sequence + 1:
+            print(f"Lücke in den Updates ({self.race_data_sequence} -> {sequence}), fordere vollständigen Stand an.")
+            self.race_data_sequence = None
+            send_message_to_server_func({"type": MSG_RESYNC})
+            return
+
+        upserts = [item for item in message.get("upserts", []) if item.get("app_item_id")]
+        with self._all_race_data_lock:
+            for item_id in message.get("deletes", []):
+                self.all_race_data_dict.pop(item_id, None)
+            for item in upserts:
+                self.all_race_data_dict[item["app_item_id"]] = self._race_data_from_item(item)
+        self.race_data_sequence = sequence
+        self._sort_and_refresh_data_treeview(highlight_item_id=upserts[0]["app_item_id"] if len(upserts) == 1 else None)
 
 
 if __name__ == "__main__":
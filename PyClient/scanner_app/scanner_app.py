@@ -10,8 +10,16 @@ from typing import Dict, Any, Optional, List
 import socket
 import queue
 import time
+import os
+import sys
 from pynput import keyboard
 
+# Das Nachrichtenprotokoll teilen sich alle Apps über main_app/common
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "main_app"))
+from common.protocol import (
+    FrameDecoder, FrameError, encode_frame, MSG_SCAN, MSG_RESYNC, MSG_ALL_DATA, MSG_DELTA, MSG_RACER_DATA,
+)
+
 HOST = '127.0.0.1'
 PORT = 65432
 received_message_queue = queue.Queue()
@@ -19,31 +27,32 @@ message_to_server_queue = queue.Queue()
 
 
 # --- NEUER, STABILER NETZWERK-CODE ---
-def send_message_to_server_func(values: List[Any]):
-    message_to_server_queue.put(values)
+def send_message_to_server_func(message: Dict[str, Any]):
+    message_to_server_queue.put(message)
 
 
 def receive_message_from_server_func(s: socket.socket):
-    buffer = ""
+    decoder = FrameDecoder()
     s.settimeout(1.0)
     while getattr(threading.current_thread(), "do_run", True):
         try:
-            data_chunk = s.recv(8192)
+            data_chunk = s.recv(65536)
             if not data_chunk:
                 print("Verbindung vom Server geschlossen.")
                 received_message_queue.put(("CONNECTION_LOST", None))
                 return
-            buffer += data_chunk.decode('utf-8')
-            while "$END$" in buffer:
-                message, buffer = buffer.split("$END$", 1)
-                if message:
-                    received_message_queue.put(("MESSAGE", message))
+            for message in decoder.feed(data_chunk):
+                received_message_queue.put(("MESSAGE", message))
         except socket.timeout:
             continue
         except (socket.error, ConnectionResetError) as e:
             print(f"Socket-Fehler im Empfänger: {e}")
             received_message_queue.put(("CONNECTION_LOST", None))
             return
+        except FrameError as e:
+            print(f"Ungültige Nachricht vom Server: {e}")
+            received_message_queue.put(("CONNECTION_LOST", None))
+            return
         except Exception as e:
             print(f"Unerwarteter Fehler im Empfänger: {e}")
             received_message_queue.put(("CONNECTION_LOST", None))
@@ -65,9 +74,8 @@ def client_communication_thread_func(app_instance):
 
             while receiver_thread.is_alive():
                 try:
-                    msg_list_to_send = message_to_server_queue.get(timeout=0.2)
-                    text_to_server = "$#".join(map(str, msg_list_to_send)) + "$#$END$"
-                    s.sendall(text_to_server.encode('utf-8'))
+                    message_to_send = message_to_server_queue.get(timeout=0.2)
+                    s.sendall(encode_frame(message_to_send))
                 except queue.Empty:
                     continue
                 except socket.error as e:
@@ -95,19 +103,13 @@ def process_server_messages_func(app_instance):
             app_instance.after(0, app_instance.update_connection_status, True)
 
             if msg_type == "MESSAGE":
-                if payload.startswith("ALL_DATA:"):
-                    app_instance.after(0, app_instance.process_all_data_from_server, payload[len("ALL_DATA:"):])
-                elif payload == "ALL_DATA_EMPTY":
-                    app_instance.after(0, app_instance.process_all_data_from_server, "")
-                elif payload.startswith("UPDATE_DATA:"):
-                    app_instance.after(0, app_instance.process_update_data_from_server, payload[len("UPDATE_DATA:"):])
-                elif payload.startswith("DELETE_DATA:"):
-                    app_instance.after(0, app_instance.process_delete_data_from_server, payload[len("DELETE_DATA:"):])
-                elif payload.startswith("RACER_DATA_UPDATE:"):
-                    app_instance.after(0, app_instance.process_racer_data_from_server,
-                                       payload[len("RACER_DATA_UPDATE:"):])
-                elif payload == "RACER_DATA_EMPTY":
-                    app_instance.after(0, app_instance.process_racer_data_from_server, "")
+                message_type = payload.get("type")
+                if message_type == MSG_ALL_DATA:
+                    app_instance.after(0, app_instance.process_all_data_from_server, payload)
+                elif message_type == MSG_DELTA:
+                    app_instance.after(0, app_instance.process_delta_from_server, payload)
+                elif message_type == MSG_RACER_DATA:
+                    app_instance.after(0, app_instance.process_racer_data_from_server, payload.get("racers", []))
         except Exception as e:
             print(f"Fehler in process_server_messages_func: {e}")
 
@@ -172,6 +174,8 @@ class ScannerApp(ctk.CTk):
         self._scan_log_lock = threading.Lock()
         self.all_race_data_dict: Dict[str, Dict[str, Any]] = {}
         self._all_race_data_lock = threading.Lock()
+        # Sequenznummer des zuletzt übernommenen Stands; None bis zum nächsten vollständigen Stand
+        self.race_data_sequence: Optional[int] = None
         self.racer_data_by_start_number: Dict[str, Dict[str, str]] = {}
         self._racer_data_lock = threading.Lock()
 
@@ -197,6 +201,8 @@ class ScannerApp(ctk.CTk):
         threading.Thread(target=self._real_scan_thread_target, daemon=True).start()
 
     def update_connection_status(self, is_connected: bool):
+        if not is_connected:
+            self.race_data_sequence = None  # Nach dem Reconnect kommt ein vollständiger Stand
         if is_connected:
             self.status_label.configure(text="Verbunden", text_color="green")
         else:
@@ -298,9 +304,10 @@ class ScannerApp(ctk.CTk):
         new_entry = ScanLogEntry(start_nummer=start_nummer, status=SCAN_LOG_STATUS_PENDING)
         with self._scan_log_lock:
             self.scan_log_entries.insert(0, new_entry)
-        values_to_send = [new_entry.timestamp_scan_lokal.strftime("%H:%M:%S (%d.%m)"), new_entry.start_nummer,
-                          new_entry.scan_id]
-        send_message_to_server_func(values_to_send)
+        send_message_to_server_func({
+            "type": MSG_SCAN, "timestamp": new_entry.timestamp_scan_lokal.isoformat(timespec="seconds"),
+            "start_nummer": new_entry.start_nummer, "scan_id": new_entry.scan_id,
+        })
         self._refresh_scan_log_treeview()
 
     def _refresh_scan_log_treeview(self):
@@ -339,53 +346,45 @@ class ScannerApp(ctk.CTk):
             self.all_data_tree.selection_set(highlight_item_id)
             self.all_data_tree.see(highlight_item_id)
 
-    def process_all_data_from_server(self, data_payload: str):
-        new_data_dict = {}
-        if data_payload:
-            for item_str in data_payload.split('|'):
-                if not item_str: continue
-                parts = item_str.split('$#')
-                if len(parts) >= 7:
-                    item_id, start_nr, name, s_class, round_nr, run_time, ts = parts[:7]
-                    new_data_dict[item_id] = {"start_nummer": start_nr, "racer_name": name, "soapbox_class": s_class,
-                                              "round_number_main": round_nr, "renn_zeit": run_time,
-                                              "mess_zeit_combined": ts}
+    @staticmethod
+    def _race_data_from_item(item: Dict[str, Any]) -> Dict[str, Any]:
+        return {"start_nummer": item.get("start_nummer", "-"), "racer_name": item.get("racer_name", "-"),
+                "soapbox_class": item.get("soapbox_class", "-"), "round_number_main": item.get("round_number", "-"),
+                "renn_zeit": item.get("renn_zeit", ""), "mess_zeit_combined": item.get("mess_zeit", "")}
+
+    def process_all_data_from_server(self, message: Dict[str, Any]):
+        items = message.get("items", [])
+        new_data_dict = {item["app_item_id"]: self._race_data_from_item(item) for item in items if item.get("app_item_id")}
         with self._all_race_data_lock:
             self.all_race_data_dict = new_data_dict
+        self.race_data_sequence = message.get("seq")
         self._sort_and_refresh_all_data_treeview()
 
-    def process_update_data_from_server(self, item_payload: str):
-        if not item_payload: return
-        parts = item_payload.split('$#')
-        if len(parts) >= 7:
-            item_id, start_nr, name, s_class, round_nr, run_time, ts = parts[:7]
-            updated_data = {"start_nummer": start_nr, "racer_name": name, "soapbox_class": s_class,
-                            "round_number_main": round_nr, "renn_zeit": run_time, "mess_zeit_combined": ts}
-            with self._all_race_data_lock:
-                self.all_race_data_dict[item_id] = updated_data
-            self._sort_and_refresh_all_data_treeview(highlight_item_id=item_id)
-
-    def process_delete_data_from_server(self, item_id_to_delete: str):
-        item_id = item_id_to_delete.strip()
-        if item_id:
-            with self._all_race_data_lock:
-                if item_id in self.all_race_data_dict: del self.all_race_data_dict[item_id]
-            self._sort_and_refresh_all_data_treeview()
-
-    def process_racer_data_from_server(self, racer_data_payload: str):
-        new_racer_data = {}
-        if racer_data_payload:
-            for pair_str in racer_data_payload.split('|'):
-                if not pair_str: continue
-                try:
-                    start_nr, name, s_class = pair_str.split(':', 2)
-                    new_racer_data[start_nr] = {'name': name, 'class': s_class}
-                except ValueError:
-                    try:
-                        start_nr, name = pair_str.split(':', 1)
-                        new_racer_data[start_nr] = {'name': name, 'class': 'N/A'}
-                    except ValueError:
-                        pass
+    def process_delta_from_server(self, message: Dict[str, Any]):
+        sequence = message.get("seq")
+        if self.race_data_sequence is None or sequence is None or sequence <= self.race_data_sequence:
+            return  # Vor dem vollständigen Stand oder bereits darin enthalten
+        if sequence != self.race_data_sequence + 1:
+            print(f"Lücke in den Updates ({self.race_data_sequence} -> {sequence}), fordere vollständigen Stand an.")
+            self.race_data_sequence = None
+            send_message_to_server_func({"type": MSG_RESYNC})
+            return
+
+        upserts = [item for item in message.get("upserts", []) if item.get("app_item_id")]
+        with self._all_race_data_lock:
+            for item_id in message.get("deletes", []):
+                self.all_race_data_dict.pop(item_id, None)
+            for item in upserts:
+                self.all_race_data_dict[item["app_item_id"]] = self._race_data_from_item(item)
+        self.race_data_sequence = sequence
+        self._sort_and_refresh_all_data_treeview(highlight_item_id=upserts[0]["app_item_id"] if len(upserts) == 1 else None)
+
+    def process_racer_data_from_server(self, racers: List[Dict[str, Any]]):
+        new_racer_data = {
+            str(racer["start_number"]): {'name': racer.get("full_name", "-"),
+                                         'class': racer.get("soapbox_class_display", "N/A")}
+            for racer in racers if racer.get("start_number")
+        }
         with self._racer_data_lock:
             self.racer_data_by_start_number = new_racer_data
         self._refresh_scan_log_treeview()
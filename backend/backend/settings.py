@@ -41,7 +41,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'race_core.middleware.AsyncCapableWhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -79,9 +79,24 @@ DATABASES = {
         "PASSWORD": os.environ.get("DB_PASSWORD"),
         "HOST": os.environ.get("DB_HOST", "localhost"),
         "PORT": os.environ.get("DB_PORT"),
+        # Verbindungen über Requests hinweg wiederverwenden statt pro Request neu aufzubauen
+        "CONN_MAX_AGE": int(os.environ.get("DB_CONN_MAX_AGE", "60")),
+        "CONN_HEALTH_CHECKS": os.environ.get("DB_CONN_HEALTH_CHECKS", "True") == "True",
     }
 }
 
+# Optionaler psycopg3-Connection-Pool (ersetzt persistente Verbindungen, Django erlaubt nicht beides).
+# Lohnt sich vor allem bei Gunicorn mit Threads (--threads) oder unter ASGI.
+if os.environ.get("DB_POOL_ENABLED") == "True" and DATABASES["default"]["ENGINE"] == "django.db.backends.postgresql":
+    DATABASES["default"]["CONN_MAX_AGE"] = 0
+    DATABASES["default"]["OPTIONS"] = {
+        "pool": {
+            "min_size": int(os.environ.get("DB_POOL_MIN_SIZE", "2")),
+            "max_size": int(os.environ.get("DB_POOL_MAX_SIZE", "10")),
+            "timeout": float(os.environ.get("DB_POOL_TIMEOUT", "10")),
+        }
+    }
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -143,6 +158,40 @@ else:
     CSRF_TRUSTED_ORIGINS = []
 CORS_ALLOWS_CREDENTIALS = True
 
+# Optionaler Antwort-Cache für die race_core-Listen. Bei mehreren Worker-Prozessen ein gemeinsames
+# Backend verwenden (z.B. RESPONSE_CACHE_BACKEND=django.core.cache.backends.filebased.FileBasedCache
+# mit RESPONSE_CACHE_LOCATION=/var/tmp/race_core_cache), damit Invalidierungen alle Worker erreichen.
+RESPONSE_CACHE_ENABLED = os.environ.get("RESPONSE_CACHE_ENABLED") == "True"
+RESPONSE_CACHE_ALIAS = "race_core"
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    RESPONSE_CACHE_ALIAS: {
+        "BACKEND": os.environ.get("RESPONSE_CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"),
+        "LOCATION": os.environ.get("RESPONSE_CACHE_LOCATION", "race-core-responses"),
+        "TIMEOUT": int(os.environ.get("RESPONSE_CACHE_TIMEOUT", "300")),
+    },
+}
+
+# Optionales Request-Profiling: Server-Timing-Header und Histogramme je View unter /api/_metrics (nur Staff).
+# Gemessen wird nur eine Stichprobe der Anfragen, damit es auch im Produktivbetrieb aktiv bleiben kann.
+PROFILING_ENABLED = os.environ.get("PROFILING_ENABLED") == "True"
+PROFILING_SAMPLE_RATE = float(os.environ.get("PROFILING_SAMPLE_RATE", "0.1"))
+PROFILING_WINDOW = int(os.environ.get("PROFILING_WINDOW", "500"))
+if PROFILING_ENABLED:
+    MIDDLEWARE.insert(0, "race_core.profiling.ProfilingMiddleware")
+
+# Aufbewahrung der Tombstones gelöschter Läufe für /api/raceruns/changes/; ältere Tokens bekommen den kompletten Bestand
+RACE_RUN_TOMBSTONE_RETENTION_HOURS = float(os.environ.get("RACE_RUN_TOMBSTONE_RETENTION_HOURS", "48"))
+
+# Verteilung der Live-Events (/api/live/raceruns/): "local" nur im eigenen Prozess, "postgres" per
+# LISTEN/NOTIFY an den separaten ASGI-Live-Dienst, wenn die API in mehreren Gunicorn-Workern läuft
+LIVE_EVENTS_BACKEND = os.environ.get("LIVE_EVENTS_BACKEND", "local")
+
+# Prozessweiter Startnummer-Index für Zeitmessungs-Writes, nur bei einem einzelnen Serverprozess aktivieren
+RACER_INDEX_CACHE = os.environ.get("RACER_INDEX_CACHE") == "True"
+
 if DEBUG:
     INTERNAL_IPS = [
         "127.0.0.1",
@@ -19,20 +19,23 @@ done
 
 >&2 echo "PostgreSQL ist hochgefahren - fahre fort"
 
-echo "Führe Datenbankmigrationen aus..."
-python manage.py migrate --noinput
-
-STATIC_ROOT_DIR="/app/staticfiles_collected"
-
-if [ ! -f "${STATIC_ROOT_DIR}/staticfiles.json" ]; then
-    echo "Statisches Verzeichnis ist leer oder Manifest fehlt. Führe collectstatic aus..."
-    python manage.py collectstatic --noinput --clear
-else
-    echo "Statisches Verzeichnis existiert bereits. Überspringe collectstatic."
+# Migrationen & Co. nur im Web-Dienst, der Live-Dienst startet direkt
+if [ "${RUN_STARTUP_TASKS:-True}" = "True" ]; then
+    echo "Führe Datenbankmigrationen aus..."
+    python manage.py migrate --noinput
+
+    STATIC_ROOT_DIR="/app/staticfiles_collected"
+
+    if [ ! -f "${STATIC_ROOT_DIR}/staticfiles.json" ]; then
+        echo "Statisches Verzeichnis ist leer oder Manifest fehlt. Führe collectstatic aus..."
+        python manage.py collectstatic --noinput --clear
+    else
+        echo "Statisches Verzeichnis existiert bereits. Überspringe collectstatic."
+    fi
+
+    echo "Versuche, initialen Superuser zu erstellen..."
+    python manage.py create_initial_superuser
 fi
 
-echo "Versuche, initialen Superuser zu erstellen..."
-python manage.py create_initial_superuser
-
-echo "Starte Gunicorn..."
+echo "Starte Server..."
 exec "$@"
\ No newline at end of file
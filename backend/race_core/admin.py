@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Team, Racer, RaceRun, Soapbox
+from .models import Team, Racer, RaceRun, Soapbox, Standing
 
 
 class RacerInline(admin.TabularInline):
@@ -14,9 +14,13 @@ class TeamAdmin(admin.ModelAdmin):
     search_fields = ('name',)
     inlines = [RacerInline]
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_racer_count()
+
     def racer_count(self, obj):
-        return obj.racers.count()
+        return obj.racer_count
     racer_count.short_description = "Number of Racers"
+    racer_count.admin_order_field = 'annotated_racer_count'
 
 
 @admin.register(Soapbox)
@@ -47,11 +51,16 @@ class RacerAdmin(admin.ModelAdmin):
         }),
     )
     readonly_fields = ('best_time_display',)
+    list_select_related = ('team',)
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_best_time()
 
     def best_time_display(self, obj):
         time_val = obj.best_time_seconds
-        return f"{time_val}s" if time_val is not None else "N/A"
+        return f"{time_val:.3f}s" if time_val is not None else "N/A"
     best_time_display.short_description = "Best Time"
+    best_time_display.admin_order_field = 'annotated_best_time'
 
 
 @admin.register(RaceRun)
@@ -87,3 +96,17 @@ class RaceRunAdmin(admin.ModelAdmin):
         return format_html('<a href="{}">{}</a>', link, obj.racer.full_name)
     racer_link.short_description = "Racer"
     racer_link.admin_order_field = 'racer'
+
+
+@admin.register(Standing)
+class StandingAdmin(admin.ModelAdmin):
+    list_display = ('racer', 'soapbox_class', 'rank', 'best_time_seconds', 'heat_1_time_seconds', 'heat_2_time_seconds')
+    list_filter = ('soapbox_class',)
+    search_fields = ('racer__first_name', 'racer__last_name', 'racer__start_number')
+    list_select_related = ('racer',)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
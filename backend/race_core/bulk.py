@@ -0,0 +1,232 @@
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+from .models import RaceRun
+from .racer_index import get_racer_index
+from .serializers import RaceRunBulkDeleteSerializer, RaceRunBulkUpsertSerializer
+from .signals import batched_changes, reserve_change_seq
+
+UPSERT_FIELDS = ['racer', 'run_type', 'run_identifier', 'time_in_seconds', 'disqualified', 'notes', 'recorded_at']
+
+
+class RaceRunBulkProcessor:
+    """
+    Wendet eine Liste von Upserts und Löschungen, adressiert über
+    (racer_start_number, run_type, run_identifier) oder optional die Server-ID,
+    in einer Transaktion an.
+    Ungültige Einträge werden übersprungen und im Ergebnis gemeldet.
+    """
+
+    def __init__(self, upserts, deletes):
+        self.raw_upserts = upserts
+        self.raw_deletes = deletes
+        self.results = []
+        self.racer_index = get_racer_index()
+        self.by_key = {}
+        self.by_id = {}
+        self.claimed_runs = set()
+        self.change_seq = None
+
+    def _result(self, action, index, data, status, **extra):
+        self.results.append({'action': action, 'index': index, 'ref': data.get('ref'), 'status': status, **extra})
+
+    def _validate(self, action, raw_items, serializer_class):
+        validated = []
+        for index, raw in enumerate(raw_items):
+            serializer = serializer_class(data=raw)
+            if serializer.is_valid():
+                validated.append((index, serializer.validated_data))
+            else:
+                self._result(action, index, raw, 'invalid', errors=serializer.errors)
+        return validated
+
+    def _racer_for(self, action, index, data):
+        start_number = data['racer_start_number']
+        racer = self.racer_index.lookup_start_number(start_number)
+        if racer is False:
+            error = _(f"Racer with start number '{start_number}' not found.")
+        elif racer is None:
+            error = _(f"Multiple racers found with start number '{start_number}'.")
+        else:
+            return racer
+        self._result(action, index, data, 'invalid', errors={'racer_start_number': [error]})
+        return None
+
+    def _reserve_change_seq(self):
+        # Vor den Zeilensperren, in derselben Reihenfolge wie RaceRun.save(); ein Wert für den ganzen Vorgang
+        self.change_seq = reserve_change_seq()
+
+    def _load_existing_runs(self, upserts, deletes):
+        start_numbers = {data['racer_start_number'] for _, data in upserts + deletes}
+        self.racer_index.preload(start_numbers=start_numbers)
+        racers = (self.racer_index.lookup_start_number(start_number) for start_number in start_numbers)
+        racer_ids = [racer.id for racer in racers if racer]
+        run_ids = [data['id'] for _, data in upserts + deletes if data.get('id')]
+        # Gesperrt bis zum Ende der Transaktion, damit parallele Schreibzugriffe die Zuordnung nicht veralten lassen
+        runs = RaceRun.objects.select_related('racer').select_for_update(of=('self',)).filter(
+            Q(racer_id__in=racer_ids) | Q(pk__in=run_ids)
+        ).order_by()
+        for run in runs:
+            self.by_key[(run.racer_id, run.run_type, run.run_identifier)] = run
+            self.by_id[run.pk] = run
+
+    def process(self):
+        deletes = self._validate('delete', self.raw_deletes, RaceRunBulkDeleteSerializer)
+        upserts = self._validate('upsert', self.raw_upserts, RaceRunBulkUpsertSerializer)
+        with transaction.atomic(), batched_changes() as batch:
+            self._reserve_change_seq()
+            self._load_existing_runs(upserts, deletes)
+            self._apply_deletes(deletes)
+            self._apply_upserts(upserts, batch)
+
+        self.results.sort(key=lambda result: (result['action'] != 'upsert', result['index']))
+        return self.results
+
+    def _apply_deletes(self, deletes):
+        to_delete = []
+        for index, data in deletes:
+            racer = self._racer_for('delete', index, data)
+            if racer is None:
+                continue
+            run = self.by_id.get(data.get('id')) or self.by_key.get(
+                (racer.id, data['run_type'], data['run_identifier'])
+            )
+            if run is None:
+                self._result('delete', index, data, 'not_found')
+                continue
+            self.by_id.pop(run.pk, None)
+            self.by_key.pop((run.racer_id, run.run_type, run.run_identifier), None)
+            to_delete.append(run.pk)
+            self._result('delete', index, data, 'deleted', id=run.pk)
+
+        if to_delete:
+            RaceRun.objects.filter(pk__in=to_delete).delete()
+
+    def _apply_upserts(self, upserts, batch):
+        self._write_upserts(*self._plan_upserts(upserts), batch)
+
+    def _plan_upserts(self, upserts):
+        claimed_keys, claimed_runs = set(), self.claimed_runs
+        to_create, to_update = [], []
+
+        for index, data in upserts:
+            racer = self._racer_for('upsert', index, data)
+            if racer is None:
+                continue
+            key = (racer.id, data['run_type'], data['run_identifier'])
+            run = self.by_id.get(data.get('id')) or self.by_key.get(key)
+            occupant = self.by_key.get(key)
+            if key in claimed_keys or (occupant is not None and occupant is not run) or \
+                    (run is not None and run.pk in claimed_runs):
+                self._result('upsert', index, data, 'invalid', errors={
+                    'non_field_errors': [_("A race run with this racer, run type, and run identifier already exists.")]
+                })
+                continue
+            claimed_keys.add(key)
+            if run is not None:
+                claimed_runs.add(run.pk)
+
+            if run is None:
+                run = RaceRun(
+                    racer=racer,
+                    run_type=data['run_type'],
+                    run_identifier=data['run_identifier'],
+                    time_in_seconds=data.get('time_in_seconds'),
+                    disqualified=data.get('disqualified', False),
+                    notes=data.get('notes'),
+                    recorded_at=data.get('recorded_at') or timezone.now(),
+                )
+                to_create.append((index, data, run))
+                continue
+
+            before = [getattr(run, field) for field in UPSERT_FIELDS]
+            self.by_key.pop((run.racer_id, run.run_type, run.run_identifier), None)
+            run.racer = racer
+            run.run_type = data['run_type']
+            run.run_identifier = data['run_identifier']
+            for field in ('time_in_seconds', 'disqualified', 'notes', 'recorded_at'):
+                if field in data:
+                    setattr(run, field, data[field])
+            if run.disqualified and 'time_in_seconds' not in data:
+                run.time_in_seconds = None
+            self.by_key[key] = run
+
+            if [getattr(run, field) for field in UPSERT_FIELDS] == before:
+                self._result('upsert', index, data, 'unchanged', id=run.pk)
+            else:
+                to_update.append((index, data, run))
+
+        return to_create, to_update
+
+    def _write_upserts(self, to_create, to_update, batch):
+        if to_update:
+            # bulk_update setzt auto_now-Felder nicht selbst
+            now = timezone.now()
+            for _, _, run in to_update:
+                run.updated_at = now
+                run.change_seq = self.change_seq
+            RaceRun.objects.bulk_update([run for _, _, run in to_update], UPSERT_FIELDS + ['updated_at', 'change_seq'])
+        if to_create:
+            for _, _, run in to_create:
+                run.change_seq = self.change_seq
+            RaceRun.objects.bulk_create([run for _, _, run in to_create])
+
+        for status, items in (('updated', to_update), ('created', to_create)):
+            for index, data, run in items:
+                batch.race_run_saved(run, created=status == 'created')
+                self._result('upsert', index, data, status, id=run.pk)
+
+
+class RaceRunReplaceProcessor(RaceRunBulkProcessor):
+    """
+    Ersetzt den kompletten Bestand an RaceRuns durch den übergebenen Datensatz.
+    Zuordnung nur über (racer_start_number, run_type, run_identifier); alles, was nicht
+    im Datensatz vorkommt, wird gelöscht. Ist ein Eintrag ungültig, wird nichts geändert.
+    """
+
+    def __init__(self, runs):
+        super().__init__(upserts=runs, deletes=[])
+
+    def _load_existing_runs(self, upserts, deletes):
+        self.racer_index.preload(start_numbers={data['racer_start_number'] for _, data in upserts})
+        # Gesperrt bis zum Ende der Transaktion, damit parallele Schreibzugriffe den Diff nicht veralten lassen
+        for run in RaceRun.objects.select_related('racer').select_for_update(of=('self',)).order_by():
+            self.by_key[(run.racer_id, run.run_type, run.run_identifier)] = run
+
+    def process(self):
+        upserts = self._validate('upsert', self.raw_upserts, RaceRunBulkUpsertSerializer)
+        for _, data in upserts:
+            data.pop('id', None)
+
+        stale = []
+        with transaction.atomic(), batched_changes() as batch:
+            self._reserve_change_seq()
+            self._load_existing_runs(upserts, [])
+            to_create, to_update = self._plan_upserts(upserts)
+            if not any(result['status'] == 'invalid' for result in self.results):
+                stale = [run for run in self.by_key.values() if run.pk not in self.claimed_runs]
+                if stale:
+                    RaceRun.objects.filter(pk__in=[run.pk for run in stale]).delete()
+                self._write_upserts(to_create, to_update, batch)
+        for run in stale:
+            self.results.append({'action': 'delete', 'index': None, 'ref': None, 'status': 'deleted', 'id': run.pk})
+
+        self.results.sort(key=lambda result: (result['action'] != 'upsert', result['index'] or 0))
+        return self.results
+
+
+def summarize_bulk_results(results):
+    counts = Counter(result['status'] for result in results)
+    return {
+        'created': counts['created'],
+        'updated': counts['updated'],
+        'unchanged': counts['unchanged'],
+        'deleted': counts['deleted'],
+        'not_found': counts['not_found'],
+        'failed': counts['invalid'],
+        'results': results,
+    }
@@ -0,0 +1,59 @@
+import datetime
+
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+from .models import DataVersion, RaceRun, RaceRunTombstone
+
+# Höchste change_seq bereits gelöschter Tombstones; ältere Tokens bekommen den kompletten Bestand
+TOMBSTONES_PRUNED = 'racerun_tombstones_pruned'
+
+
+def tombstone_retention():
+    return datetime.timedelta(hours=getattr(settings, 'RACE_RUN_TOMBSTONE_RETENTION_HOURS', 48))
+
+
+def prune_race_run_tombstones():
+    """Löscht Tombstones, die älter als die Aufbewahrungsdauer sind. Liefert die Anzahl gelöschter Einträge."""
+    expired = RaceRunTombstone.objects.filter(deleted_at__lt=timezone.now() - tombstone_retention())
+    watermark = expired.aggregate(models.Max('change_seq'))['change_seq__max']
+    if watermark is None:
+        return 0
+    # Erst die Grenze festhalten, dann löschen: Ein Abruf dazwischen bekommt höchstens unnötig alles
+    DataVersion.objects.bulk_create([DataVersion(name=TOMBSTONES_PRUNED, version=0)], ignore_conflicts=True)
+    DataVersion.objects.filter(name=TOMBSTONES_PRUNED, version__lt=watermark).update(version=watermark)
+    deleted, _ = expired.filter(change_seq__lte=watermark).delete()
+    return deleted
+
+
+def encode_change_token(change_seq):
+    return str(change_seq)
+
+
+def decode_change_token(token):
+    """Wirft ValueError bei ungültigen Tokens."""
+    change_seq = int(token)
+    if change_seq < 0:
+        raise ValueError(token)
+    return change_seq
+
+
+def race_run_changes(since, queryset=None):
+    """
+    Liefert (token, full, geänderte RaceRuns, gelöschte IDs) seit der Sequenznummer `since`.
+    Ohne `since`, mit einem Token vor den bereits gelöschten Tombstones oder einem unbekannten Token
+    (z.B. nach einem Datenbank-Reset) wird der komplette Bestand geliefert (`full`).
+    Die gelöschten IDs sind nicht auf die Filter von `queryset` eingeschränkt; unbekannte IDs sind zu ignorieren.
+    Das Token ist beim nächsten Abruf als `since` zu übergeben.
+    """
+    # Vor den Daten lesen: Alle Werte bis hierhin sind committet, spätere kommen beim nächsten Abruf (erneut)
+    current = DataVersion.current_value(RaceRun.CHANGE_SEQUENCE)
+    token = encode_change_token(current)
+    runs = RaceRun.objects.all() if queryset is None else queryset
+    if since is None or since > current or since < DataVersion.current_value(TOMBSTONES_PRUNED):
+        return token, True, runs, []
+
+    runs = runs.filter(change_seq__gt=since).order_by('change_seq', 'id')
+    deleted_ids = RaceRunTombstone.objects.filter(change_seq__gt=since).values_list('race_run_id', flat=True)
+    return token, False, runs, list(deleted_ids)
@@ -0,0 +1,123 @@
+from collections import defaultdict
+from operator import itemgetter
+
+from rest_framework import serializers
+from rest_framework.relations import PrimaryKeyRelatedField
+
+from .serializers import RaceRunSerializer, RacerSerializer
+
+# Felder, deren to_representation Werte aus values_list() unverändert zurückgibt
+PASSTHROUGH_FIELDS = (
+    serializers.CharField, serializers.ChoiceField, serializers.IntegerField, serializers.BooleanField,
+    serializers.ReadOnlyField, PrimaryKeyRelatedField,
+)
+
+
+def _full_name(first_name, last_name):
+    return f"{first_name} {last_name}"
+
+
+class CompactListSerializer:
+    """
+    Schneller Ersatz für `serializer_class(queryset, many=True).data` bei großen Listen.
+    Feldauswahl (?fields=), Reihenfolge und Formatierung kommen vom DRF-Serializer, die Zeilen werden
+    aber direkt aus values_list()-Tupeln gebaut. Das JSON ist identisch zur Ausgabe des Serializers.
+    """
+    serializer_class = None
+    # Ausgabefeld -> values()-Lookup, wenn die Quelle keine Spalte ist (z.B. eine Property)
+    sources = {}
+    # Ausgabefeld -> (values()-Lookups, Funktion) für zusammengesetzte Werte
+    computed = {}
+    # Ausgabefeld -> (CompactListSerializer-Klasse, Fremdschlüssel der Kindzeilen)
+    nested = {}
+
+    def __init__(self, queryset, context=None):
+        self.queryset = queryset
+        self.context = context or {}
+        self.fields = self.serializer_class(context=self.context).fields
+
+    def _columns(self):
+        lookups = []
+
+        def index(lookup):
+            if lookup not in lookups:
+                lookups.append(lookup)
+            return lookups.index(lookup)
+
+        model = self.serializer_class.Meta.model
+        columns = []
+        for name, field in self.fields.items():
+            if name in self.nested:
+                columns.append((name, lambda values: None))
+            elif name in self.computed:
+                field_lookups, func = self.computed[name]
+                positions = [index(lookup) for lookup in field_lookups]
+                columns.append((name, lambda values, p=positions, f=func: f(*[values[i] for i in p])))
+            elif field.source.startswith('get_') and field.source.endswith('_display'):
+                # Entspricht Model.get_FOO_display(), die Labels werden einmal pro Liste aufgelöst
+                attname = field.source[len('get_'):-len('_display')]
+                labels = {value: str(label) for value, label in model._meta.get_field(attname).flatchoices}
+                position = index(attname)
+                columns.append((name, lambda values, p=position, l=labels: l.get(values[p], values[p])))
+            else:
+                position = index(self.sources.get(name, field.source.replace('.', '__')))
+                if isinstance(field, PASSTHROUGH_FIELDS):
+                    columns.append((name, itemgetter(position)))
+                else:
+                    columns.append((name, lambda values, p=position, f=field.to_representation:
+                                    None if values[p] is None else f(values[p])))
+        return lookups, columns
+
+    def rows(self, queryset, group_by=None):
+        """Liefert die Zeilen als Liste oder, mit `group_by`, als Dict Lookup-Wert -> Zeilen."""
+        lookups, columns = self._columns()
+        for lookup in (group_by, 'pk' if self.nested else None):
+            if lookup and lookup not in lookups:
+                lookups.append(lookup)
+        group_position = lookups.index(group_by) if group_by else None
+        pk_position = lookups.index('pk') if self.nested else None
+
+        rows, groups, primary_keys = [], defaultdict(list), []
+        for values in queryset.prefetch_related(None).values_list(*lookups):
+            row = {name: get(values) for name, get in columns}
+            rows.append(row)
+            if group_by:
+                groups[values[group_position]].append(row)
+            if self.nested:
+                primary_keys.append(values[pk_position])
+
+        for name, (serializer_class, foreign_key) in self.nested.items():
+            if name not in self.fields:
+                continue
+            # Eine Abfrage für alle Kindzeilen; verschachtelte Serializer bekommen wie in DRF keine Feldauswahl
+            model = serializer_class.serializer_class.Meta.model
+            children = serializer_class(None).rows(
+                model.objects.filter(**{f'{foreign_key}__in': primary_keys}), group_by=foreign_key
+            )
+            for row, pk in zip(rows, primary_keys):
+                row[name] = children.get(pk, [])
+        return groups if group_by else rows
+
+    @property
+    def data(self):
+        return self.rows(self.queryset)
+
+
+class CompactRaceRunListSerializer(CompactListSerializer):
+    serializer_class = RaceRunSerializer
+    computed = {
+        'racer_name': (('racer__first_name', 'racer__last_name'), _full_name),
+    }
+
+
+class CompactRacerListSerializer(CompactListSerializer):
+    serializer_class = RacerSerializer
+    sources = {
+        'best_time_seconds': 'annotated_best_time',
+    }
+    computed = {
+        'full_name': (('first_name', 'last_name'), _full_name),
+    }
+    nested = {
+        'races': (CompactRaceRunListSerializer, 'racer'),
+    }
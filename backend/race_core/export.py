@@ -0,0 +1,99 @@
+import csv
+import datetime
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+
+from .models import RaceRun, Standing
+
+EXPORT_CHUNK_SIZE = 2000
+ROWS_PER_WRITE = 200
+
+RACE_RUN_EXPORT_COLUMNS = [
+    ('id', 'id'),
+    ('racer_id', 'racer_id'),
+    ('start_number', 'racer__start_number'),
+    ('first_name', 'racer__first_name'),
+    ('last_name', 'racer__last_name'),
+    ('team', 'racer__team__name'),
+    ('soapbox_class', 'racer__soapbox_class'),
+    ('run_type', 'run_type'),
+    ('run_identifier', 'run_identifier'),
+    ('time_in_seconds', 'time_in_seconds'),
+    ('disqualified', 'disqualified'),
+    ('notes', 'notes'),
+    ('recorded_at', 'recorded_at'),
+    ('updated_at', 'updated_at'),
+]
+
+RESULT_EXPORT_COLUMNS = [
+    ('racer_id', 'racer_id'),
+    ('start_number', 'racer__start_number'),
+    ('first_name', 'racer__first_name'),
+    ('last_name', 'racer__last_name'),
+    ('team', 'racer__team__name'),
+    ('soapbox', 'racer__soapbox__name'),
+    ('soapbox_class', 'soapbox_class'),
+    ('rank', 'rank'),
+    ('best_time_seconds', 'best_time_seconds'),
+    ('heat_1_time_seconds', 'heat_1_time_seconds'),
+    ('heat_1_disqualified', 'heat_1_disqualified'),
+    ('heat_2_time_seconds', 'heat_2_time_seconds'),
+    ('heat_2_disqualified', 'heat_2_disqualified'),
+]
+
+
+class _Echo:
+    """Pseudo-Buffer für csv.writer, der die geschriebene Zeile direkt zurückgibt."""
+
+    def write(self, value):
+        return value
+
+
+def _iterate_rows(queryset, columns):
+    # values_list + iterator: keine Model-Instanzen, kein Zwischenspeichern des gesamten Ergebnisses
+    return queryset.values_list(*(lookup for _, lookup in columns)).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+
+def _grouped(lines):
+    lines = iter(lines)
+    while group := ''.join(islice(lines, ROWS_PER_WRITE)):
+        yield group
+
+
+def race_run_csv_lines():
+    writer = csv.writer(_Echo())
+    yield writer.writerow([name for name, _ in RACE_RUN_EXPORT_COLUMNS])
+    rows = _iterate_rows(RaceRun.objects.all(), RACE_RUN_EXPORT_COLUMNS)
+    yield from _grouped(
+        writer.writerow([value.isoformat() if isinstance(value, datetime.datetime) else value for value in row])
+        for row in rows
+    )
+
+
+def result_ndjson_lines():
+    names = [name for name, _ in RESULT_EXPORT_COLUMNS]
+    encoder = DjangoJSONEncoder(separators=(',', ':'), ensure_ascii=False)
+    rows = _iterate_rows(Standing.objects.all(), RESULT_EXPORT_COLUMNS)
+    yield from _grouped(encoder.encode(dict(zip(names, row))) + '\n' for row in rows)
+
+
+async def _async_lines(lines):
+    # Unter ASGI würde Django einen synchronen Iterator komplett puffern; die Datenbankzugriffe
+    # laufen daher stückweise im Sync-Thread.
+    lines = iter(lines)
+    while part := await sync_to_async(next)(lines, None):
+        yield part
+
+
+def streaming_export_response(request, lines, content_type, filename):
+    if isinstance(request, ASGIRequest):
+        lines = _async_lines(lines)
+    response = StreamingHttpResponse(lines, content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,200 @@
+import asyncio
+import itertools
+import json
+import logging
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+RESYNC = object()
+
+LIVE_EVENTS_CHANNEL = 'race_core_live'
+LISTENER_RECONNECT_SECONDS = 3
+
+
+class Subscription:
+    def __init__(self, loop, queue_size):
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.backlog = []
+
+    def deliver(self, event):
+        # Läuft im Event-Loop des Abonnenten. Ist die Queue voll, kommt der Client nicht
+        # mehr hinterher und wird zum vollständigen Neuladen aufgefordert.
+        if self.queue.full():
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC)
+        else:
+            self.queue.put_nowait(event)
+
+
+class EventBroker:
+    """
+    Prozessinterner Pub/Sub für Live-Events. Veröffentlichen ist threadsicher (Signale
+    laufen in Sync-Threads), die Auslieferung erfolgt im Event-Loop des jeweiligen Abonnenten.
+    """
+
+    def __init__(self, history_size=256, queue_size=100):
+        self._lock = threading.Lock()
+        self._subscriptions = set()
+        self._history = deque(maxlen=history_size)
+        self._sequence = itertools.count(1)
+        self._last_event_id = 0
+        self.queue_size = queue_size
+
+    def publish(self, event_type, payload):
+        data = json.dumps(payload, cls=DjangoJSONEncoder, separators=(',', ':'))
+        with self._lock:
+            event = (next(self._sequence), event_type, data)
+            self._last_event_id = event[0]
+            self._history.append(event)
+            subscriptions = list(self._subscriptions)
+
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.deliver, event)
+            except RuntimeError:
+                # Event-Loop wurde bereits geschlossen
+                self.unsubscribe(subscription)
+        return event
+
+    def resync_all(self):
+        # Events können verloren gegangen sein: Verlauf verwerfen und alle Abonnenten neu laden lassen
+        with self._lock:
+            self._history.clear()
+            subscriptions = list(self._subscriptions)
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.deliver, RESYNC)
+            except RuntimeError:
+                self.unsubscribe(subscription)
+
+    def subscribe(self, last_event_id=None):
+        subscription = Subscription(asyncio.get_running_loop(), self.queue_size)
+        with self._lock:
+            if last_event_id is not None:
+                latest = self._last_event_id
+                oldest = self._history[0][0] if self._history else latest + 1
+                if last_event_id > latest or last_event_id + 1 < oldest:
+                    # Lücke in der Historie oder Server-Neustart: Client muss neu laden
+                    subscription.backlog = [RESYNC]
+                else:
+                    subscription.backlog = [event for event in self._history if event[0] > last_event_id]
+            self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    @property
+    def subscriber_count(self):
+        return len(self._subscriptions)
+
+
+race_run_events = EventBroker()
+
+
+def notify_enabled(using='default'):
+    return settings.LIVE_EVENTS_BACKEND == 'postgres' and connections[using].vendor == 'postgresql'
+
+
+def publish_race_run_event(event_type, payload):
+    """
+    Veröffentlicht ein Live-Event. Mit LIVE_EVENTS_BACKEND=postgres geht es per NOTIFY an alle
+    Prozesse (z.B. Gunicorn-Worker -> ASGI-Live-Dienst), sonst nur an den eigenen Prozess.
+    """
+    if not notify_enabled():
+        return race_run_events.publish(event_type, payload)
+    message = json.dumps({'type': event_type, 'data': payload}, cls=DjangoJSONEncoder, separators=(',', ':'))
+    with connections['default'].cursor() as cursor:
+        cursor.execute('SELECT pg_notify(%s, %s)', [LIVE_EVENTS_CHANNEL, message])
+
+
+class PostgresEventListener(threading.Thread):
+    """
+    Hört im Live-Prozess per LISTEN auf Events anderer Prozesse und reicht sie an den Broker weiter.
+    Nutzt eine eigene Verbindung außerhalb von Djangos Verbindungsverwaltung (und des Pools).
+    """
+
+    def __init__(self, broker, channel=LIVE_EVENTS_CHANNEL, using='default'):
+        super().__init__(name='race-core-live-listener', daemon=True)
+        self.broker = broker
+        self.channel = channel
+        self.using = using
+
+    def run(self):
+        while True:
+            try:
+                self.listen()
+            except Exception:
+                logger.exception("LISTEN auf '%s' abgebrochen, verbinde neu", self.channel)
+            time.sleep(LISTENER_RECONNECT_SECONDS)
+
+    def listen(self):
+        import psycopg
+        from psycopg import sql
+
+        settings_dict = connections[self.using].settings_dict
+        with psycopg.connect(
+            dbname=settings_dict['NAME'],
+            user=settings_dict['USER'],
+            password=settings_dict['PASSWORD'],
+            host=settings_dict['HOST'] or None,
+            port=settings_dict['PORT'] or None,
+            autocommit=True,
+        ) as conn:
+            conn.execute(sql.SQL('LISTEN {}').format(sql.Identifier(self.channel)))
+            # Während der Verbindungslücke verpasste Events lassen sich nicht nachliefern
+            self.broker.resync_all()
+            for notify in conn.notifies():
+                self.dispatch(notify.payload)
+
+    def dispatch(self, payload):
+        try:
+            message = json.loads(payload)
+            self.broker.publish(message['type'], message['data'])
+        except (ValueError, KeyError, TypeError):
+            logger.warning("Ungültiges Live-Event verworfen: %r", payload)
+
+
+_listener = None
+_listener_lock = threading.Lock()
+
+
+def ensure_event_listener():
+    # Startet den Listener erst mit dem ersten Live-Client, WSGI-Worker brauchen ihn nie
+    global _listener
+    if not notify_enabled():
+        return
+    with _listener_lock:
+        if _listener is None:
+            _listener = PostgresEventListener(race_run_events)
+            _listener.start()
+
+
+def format_sse(event):
+    if event is RESYNC:
+        return 'event: resync\ndata: {}\n\n'
+    event_id, event_type, data = event
+    return f'id: {event_id}\nevent: {event_type}\ndata: {data}\n\n'
+
+
+def race_run_payload(instance):
+    return {
+        'id': instance.pk,
+        'racer': instance.racer_id,
+        'racer_start_number': instance.racer.start_number,
+        'run_type': instance.run_type,
+        'run_identifier': instance.run_identifier,
+        'time_in_seconds': instance.time_in_seconds,
+        'disqualified': instance.disqualified,
+        'recorded_at': instance.recorded_at,
+    }
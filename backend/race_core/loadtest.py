@@ -0,0 +1,162 @@
+import json
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import connection, connections
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+from .models import Racer
+from .profiling import percentile
+
+API_PREFIX = '/api/'
+
+
+class LoadTestError(Exception):
+    pass
+
+
+def _read_requests(rng, racer_ids, change_token):
+    # Zuschauer auf der Ergebnisseite plus gelegentliche Detail- und Listenabrufe, gewichtet
+    return rng.choices([
+        ('standings-list', 'GET', 'standings/', None),
+        ('standings-list-class', 'GET', f'standings/?class={rng.choice(Racer.SoapboxClass.values)}', None),
+        ('racerun-changes', 'GET', f'raceruns/changes/?since={change_token}', None),
+        ('racerun-list', 'GET', 'raceruns/', None),
+        ('racer-list', 'GET', 'racers/', None),
+        ('racer-detail', 'GET', f'racers/{rng.choice(racer_ids)}/', None),
+        ('team-list', 'GET', 'teams/', None),
+    ], weights=[5, 3, 3, 2, 1, 2, 1])[0]
+
+
+def _write_requests(rng, runs):
+    # Zeitnahme: einzelne Korrekturen per PATCH und gebündelte Übertragungen über raceruns/bulk/
+    run = rng.choice(runs)
+    time_in_seconds = f"{rng.uniform(35, 55):.3f}"
+    if rng.random() < 0.75:
+        return 'racerun-partial-update', 'PATCH', f"raceruns/{run['id']}/", {'time_in_seconds': time_in_seconds}
+    return 'racerun-bulk', 'POST', 'raceruns/bulk/', {'upserts': [{
+        'racer_start_number': run['racer_start_number'],
+        'run_type': run['run_type'],
+        'run_identifier': run['run_identifier'],
+        'time_in_seconds': time_in_seconds,
+    }]}
+
+
+def build_request_plan(requests, write_ratio, racer_ids, runs, change_token, seed=1):
+    """Erzeugt eine reproduzierbare Folge von (Name, Methode, Pfad, Body)."""
+    rng = random.Random(seed)
+    return [
+        _write_requests(rng, runs) if rng.random() < write_ratio else _read_requests(rng, racer_ids, change_token)
+        for _ in range(requests)
+    ]
+
+
+class ClientTarget:
+    """Schickt Anfragen über den Django-Testclient im selben Prozess und zählt die SQL-Queries."""
+
+    def __init__(self, user=None):
+        self.client = Client()
+        if user is not None:
+            self.client.force_login(user)
+
+    def request(self, method, path, body=None):
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            response = self.client.generic(
+                method, API_PREFIX + path,
+                data=json.dumps(body) if body is not None else '',
+                content_type='application/json',
+            )
+            content = b''.join(response.streaming_content) if response.streaming else response.content
+            elapsed = time.perf_counter() - start
+        return response.status_code, elapsed, len(queries), content
+
+
+class HttpTarget:
+    """Schickt Anfragen an einen laufenden Server; SQL-Queries sind von außen nicht messbar."""
+
+    def __init__(self, base_url, token=None):
+        self.base_url = base_url.rstrip('/') + API_PREFIX
+        self.headers = {'Content-Type': 'application/json'}
+        if token:
+            self.headers['Authorization'] = f'Bearer {token}'
+
+    def request(self, method, path, body=None):
+        data = json.dumps(body).encode() if body is not None else None
+        request = urllib.request.Request(self.base_url + path, data=data, headers=self.headers, method=method)
+        start = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request) as response:
+                status, content = response.status, response.read()
+        except urllib.error.HTTPError as e:
+            status, content = e.code, e.read()
+        return status, time.perf_counter() - start, None, content
+
+
+def _get_json(target, path):
+    status, _, _, content = target.request('GET', path)
+    if status != 200:
+        raise LoadTestError(f"GET {API_PREFIX}{path} returned {status}.")
+    return json.loads(content)
+
+
+def summarize(samples):
+    summary = {}
+    for name, entries in sorted(samples.items()):
+        durations = sorted(elapsed for _, elapsed, _ in entries)
+        queries = [count for _, _, count in entries if count is not None]
+        summary[name] = {
+            'requests': len(entries),
+            'errors': sum(1 for status, _, _ in entries if status >= 400),
+            'p50_ms': percentile(durations, 50) * 1000,
+            'p95_ms': percentile(durations, 95) * 1000,
+            'p99_ms': percentile(durations, 99) * 1000,
+            'queries_avg': sum(queries) / len(queries) if queries else None,
+            'queries_max': max(queries) if queries else None,
+        }
+    return summary
+
+
+def run_load_test(make_target, requests=1000, concurrency=1, write_ratio=0.1, seed=1):
+    """
+    Spielt eine gemischte Last aus Lese- und Schreibanfragen ab. `make_target` liefert je
+    Worker-Thread ein ClientTarget oder HttpTarget. Gibt (Zusammenfassung je Endpoint, Gesamtdauer) zurück.
+    """
+    setup_target = make_target()
+    racer_ids = [racer['id'] for racer in _get_json(setup_target, 'racers/?fields=id')]
+    runs = _get_json(setup_target, 'raceruns/?fields=id,racer_start_number,run_type,run_identifier')
+    if not racer_ids or not runs:
+        raise LoadTestError("No racers or race runs found; run 'manage.py seed_event' first.")
+    # Änderungs-Feed ab Start des Lasttests, wie ein bereits synchronisierter Client
+    change_token = _get_json(setup_target, 'raceruns/changes/?fields=id')['token']
+    plan = build_request_plan(requests, write_ratio, racer_ids, runs, change_token, seed=seed)
+
+    def work(chunk, target):
+        return [(name, *target.request(method, path, body)[:3]) for name, method, path, body in chunk]
+
+    def threaded_work(chunk):
+        try:
+            return work(chunk, make_target())
+        finally:
+            # Jeder Thread hat eigene Datenbankverbindungen
+            if threading.current_thread() is not threading.main_thread():
+                connections.close_all()
+
+    start = time.perf_counter()
+    if concurrency <= 1:
+        results = [work(plan, setup_target)]
+    else:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            results = list(executor.map(threaded_work, [plan[i::concurrency] for i in range(concurrency)]))
+    wall_time = time.perf_counter() - start
+
+    samples = defaultdict(list)
+    for name, status, elapsed, queries in (entry for chunk in results for entry in chunk):
+        samples[name].append((status, elapsed, queries))
+    return summarize(samples), wall_time
@@ -0,0 +1,90 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.core.signals import request_started, request_finished
+from django.db import connection, connections
+from django.db.backends.signals import connection_created
+
+from race_core.models import Standing
+from race_core.profiling import percentile
+
+
+class Command(BaseCommand):
+    help = (
+        'Compares the per-request cost of opening a fresh database connection (CONN_MAX_AGE=0, no pool) with '
+        'the configured connection reuse (DB_CONN_MAX_AGE / DB_POOL_*). Each simulated request runs the '
+        'request_started/request_finished cycle with a small standings query, like a worker serving the results page.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500, help='Requests per mode.')
+        parser.add_argument('--concurrency', type=int, default=4, help='Number of concurrent workers (threads).')
+
+    def simulate_request(self):
+        request_started.send(sender=self.__class__)
+        try:
+            start = time.perf_counter()
+            list(Standing.objects.values_list('racer_id', 'rank')[:50])
+            return time.perf_counter() - start
+        finally:
+            request_finished.send(sender=self.__class__)
+
+    def run_mode(self, requests, concurrency, overrides):
+        connects = []
+        lock = threading.Lock()
+
+        def count_connection(**kwargs):
+            with lock:
+                connects.append(1)
+
+        def worker(count):
+            try:
+                return [self.simulate_request() for _ in range(count)]
+            finally:
+                if threading.current_thread() is not threading.main_thread():
+                    connections.close_all()
+
+        per_worker = [requests // concurrency + (1 if i < requests % concurrency else 0) for i in range(concurrency)]
+        # Alle Threads teilen sich das settings_dict des Alias, die Werte gelten damit für jeden Worker
+        settings_dict = connection.settings_dict
+        original = {key: settings_dict[key] for key in overrides}
+        settings_dict.update(overrides)
+        connection.close()
+        connection_created.connect(count_connection, weak=False)
+        start = time.perf_counter()
+        try:
+            if concurrency <= 1:
+                durations = worker(requests)
+            else:
+                with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                    durations = [d for chunk in executor.map(worker, per_worker) for d in chunk]
+        finally:
+            connection_created.disconnect(count_connection)
+            connection.close()
+            settings_dict.update(original)
+        wall_time = time.perf_counter() - start
+        return sorted(durations), len(connects), wall_time
+
+    def handle(self, *args, **options):
+        settings_dict = connection.settings_dict
+        pool = bool(settings_dict.get('OPTIONS', {}).get('pool'))
+        configured = "pool" if pool else f"CONN_MAX_AGE={settings_dict['CONN_MAX_AGE']}"
+        fresh_options = {k: v for k, v in settings_dict.get('OPTIONS', {}).items() if k != 'pool'}
+        modes = [
+            ('fresh', {'CONN_MAX_AGE': 0, 'OPTIONS': fresh_options}),
+            (configured, {}),
+        ]
+
+        self.stdout.write(f"{'mode':<20}{'connects':>10}{'avg ms':>9}{'p95 ms':>9}{'req/s':>9}")
+        averages = {}
+        for name, overrides in modes:
+            durations, connects, wall_time = self.run_mode(options['requests'], options['concurrency'], overrides)
+            averages[name] = sum(durations) / len(durations) * 1000
+            self.stdout.write(
+                f"{name:<20}{connects:>10}{averages[name]:>9.2f}{percentile(durations, 95) * 1000:>9.2f}"
+                f"{len(durations) / wall_time:>9.0f}"
+            )
+        saving = averages['fresh'] - averages[configured]
+        self.stdout.write(self.style.SUCCESS(f"Connection reuse saves {saving:.2f} ms per request ({configured})."))
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from race_core.racer_import import RacerImporter, RacerImportError, read_registration_rows
+
+
+class Command(BaseCommand):
+    help = (
+        'Imports racers from a registration file (.csv or .xlsx). Teams and soapboxes are created by name, '
+        'racers are created or updated by start number.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV or XLSX file with a header row (first_name, last_name, start_number, soapbox_class, team, soapbox).')
+        parser.add_argument('--batch-size', type=int, default=500, help='Number of racers written per query.')
+        parser.add_argument('--dry-run', action='store_true', help='Validate the file without writing anything.')
+
+    def handle(self, *args, **options):
+        try:
+            importer = RacerImporter(list(read_registration_rows(options['path'])), batch_size=options['batch_size'])
+            summary = importer.run(dry_run=options['dry_run'])
+        except (OSError, RacerImportError) as e:
+            raise CommandError(str(e))
+
+        for line_number, errors in importer.errors:
+            self.stderr.write(self.style.ERROR(f"Line {line_number}: {' '.join(str(error) for error in errors)}"))
+
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING(f"Dry run: {len(importer.errors)} invalid rows, nothing was written."))
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f"Racers created: {summary['racers_created']}, updated: {summary['racers_updated']}, "
+            f"teams created: {summary['teams_created']}, soapboxes created: {summary['soapboxes_created']}, "
+            f"skipped rows: {len(importer.errors)}."
+        ))
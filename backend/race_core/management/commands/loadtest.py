@@ -0,0 +1,70 @@
+from functools import partial
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+
+from race_core.loadtest import ClientTarget, HttpTarget, LoadTestError, run_load_test
+
+
+class Command(BaseCommand):
+    help = (
+        'Replays a mix of results-page reads and timing-desk writes against the race_core API and reports '
+        'p50/p95/p99 latency and SQL queries per request for each endpoint. Writes modify the database; '
+        'use it on seeded data (see seed_event).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=1000, help='Total number of requests.')
+        parser.add_argument('--concurrency', type=int, default=50, help='Number of concurrent clients.')
+        parser.add_argument('--write-ratio', type=float, default=0.1, help='Share of write requests (0..1).')
+        parser.add_argument('--seed', type=int, default=1, help='Random seed for the request mix.')
+        parser.add_argument('--username', help='User for write requests (default: first active superuser).')
+        parser.add_argument(
+            '--base-url',
+            help='Run against a running server (e.g. http://localhost:8000) instead of the in-process test client. '
+                 'Query counts are only available in-process.',
+        )
+
+    def get_user(self, username):
+        User = get_user_model()
+        users = User.objects.filter(is_active=True)
+        user = users.filter(username=username).first() if username else users.filter(is_superuser=True).first()
+        if user is None:
+            raise CommandError("No user for write requests found; pass --username or use --write-ratio 0.")
+        return user
+
+    def handle(self, *args, **options):
+        user = self.get_user(options['username']) if options['write_ratio'] > 0 else None
+        if options['base_url']:
+            from rest_framework_simplejwt.tokens import AccessToken
+            token = str(AccessToken.for_user(user)) if user else None
+            make_target = partial(HttpTarget, options['base_url'], token)
+        else:
+            make_target = partial(ClientTarget, user)
+
+        try:
+            # Der Testclient meldet sich als "testserver"
+            with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+                summary, wall_time = run_load_test(
+                    make_target,
+                    requests=options['requests'],
+                    concurrency=options['concurrency'],
+                    write_ratio=options['write_ratio'],
+                    seed=options['seed'],
+                )
+        except LoadTestError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(f"{'endpoint':<24}{'n':>6}{'err':>5}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'queries':>10}")
+        for name, row in summary.items():
+            queries = '-' if row['queries_avg'] is None else f"{row['queries_avg']:.1f}/{row['queries_max']}"
+            self.stdout.write(
+                f"{name:<24}{row['requests']:>6}{row['errors']:>5}"
+                f"{row['p50_ms']:>9.1f}{row['p95_ms']:>9.1f}{row['p99_ms']:>9.1f}{queries:>10}"
+            )
+        total = sum(row['requests'] for row in summary.values())
+        self.stdout.write(self.style.SUCCESS(
+            f"{total} requests in {wall_time:.1f}s ({total / wall_time:.0f} req/s, concurrency {options['concurrency']})."
+        ))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from race_core.models import Standing
+from race_core.standings import rebuild_all_standings
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the standings table (best times, heat times and ranks) from all race runs.'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            rebuild_all_standings()
+        self.stdout.write(self.style.SUCCESS(f"Standings rebuilt for {Standing.objects.count()} racers."))
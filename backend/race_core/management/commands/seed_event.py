@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from race_core.seeding import seed_event
+
+
+class Command(BaseCommand):
+    help = (
+        'Replaces all teams, soapboxes, racers and race runs with a deterministic synthetic event '
+        '(for load tests and benchmarks).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--racers', type=int, default=500, help='Number of racers.')
+        parser.add_argument('--runs-per-racer', type=int, default=3, help='Race runs per racer (practice, heat 1, heat 2, ...).')
+        parser.add_argument('--teams', type=int, default=None, help='Number of teams (default: one per five racers).')
+        parser.add_argument('--seed', type=int, default=1, help='Random seed; the same seed produces the same data.')
+        parser.add_argument('--no-input', '--noinput', action='store_false', dest='interactive',
+                            help='Do not ask for confirmation before deleting existing data.')
+
+    def handle(self, *args, **options):
+        if options['racers'] < 0 or options['runs_per_racer'] < 0:
+            raise CommandError("--racers and --runs-per-racer must not be negative.")
+        if options['interactive']:
+            answer = input("This deletes all teams, soapboxes, racers and race runs. Type 'yes' to continue: ")
+            if answer != 'yes':
+                raise CommandError("Seeding cancelled.")
+
+        counts = seed_event(
+            racers=options['racers'],
+            runs_per_racer=options['runs_per_racer'],
+            teams=options['teams'],
+            seed=options['seed'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Seeded {counts['teams']} teams, {counts['soapboxes']} soapboxes, {counts['racers']} racers "
+            f"and {counts['race_runs']} race runs."
+        ))
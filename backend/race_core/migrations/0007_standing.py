@@ -0,0 +1,71 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:50
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def populate_standings(apps, schema_editor):
+    Racer = apps.get_model('race_core', 'Racer')
+    RaceRun = apps.get_model('race_core', 'RaceRun')
+    Standing = apps.get_model('race_core', 'Standing')
+
+    standings = {
+        racer.id: Standing(racer_id=racer.id, soapbox_class=racer.soapbox_class, best_time_seconds=racer.best_time)
+        for racer in Racer.objects.annotate(
+            best_time=models.Min(
+                'races__time_in_seconds',
+                filter=models.Q(races__disqualified=False) & ~models.Q(races__run_type='PR'),
+            )
+        )
+    }
+    heat_runs = RaceRun.objects.filter(run_type__in=['H1', 'H2'], run_identifier=1).values_list(
+        'racer_id', 'run_type', 'time_in_seconds', 'disqualified'
+    )
+    for racer_id, run_type, time_in_seconds, disqualified in heat_runs:
+        prefix = 'heat_1' if run_type == 'H1' else 'heat_2'
+        setattr(standings[racer_id], f'{prefix}_time_seconds', None if disqualified else time_in_seconds)
+        setattr(standings[racer_id], f'{prefix}_disqualified', disqualified)
+
+    by_class = {}
+    for standing in standings.values():
+        if standing.best_time_seconds is not None:
+            by_class.setdefault(standing.soapbox_class, []).append(standing)
+    for class_standings in by_class.values():
+        class_standings.sort(key=lambda s: (s.best_time_seconds, s.racer_id))
+        previous_time, previous_rank = None, None
+        for position, standing in enumerate(class_standings, start=1):
+            standing.rank = previous_rank if standing.best_time_seconds == previous_time else position
+            previous_time, previous_rank = standing.best_time_seconds, standing.rank
+
+    Standing.objects.bulk_create(standings.values())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('race_core', '0006_alter_racer_soapbox_class'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Standing',
+            fields=[
+                ('racer', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='standing', serialize=False, to='race_core.racer', verbose_name='Racer')),
+                ('soapbox_class', models.CharField(choices=[('LRJ', 'Luftreifen Junior'), ('LRS', 'Luftreifen Senior'), ('HRJ', 'Hartreifen Junior'), ('HRS', 'Hartreifen Senior'), ('XKL', 'X-Klasse'), ('VTR', 'Veteranen'), ('UNK', 'Unknown')], default='UNK', max_length=3, verbose_name='Soapbox Class')),
+                ('rank', models.PositiveIntegerField(blank=True, help_text='Rank within the soapbox class. Empty while the racer has no valid time.', null=True, verbose_name='Rank')),
+                ('best_time_seconds', models.DecimalField(blank=True, decimal_places=3, max_digits=6, null=True, verbose_name='Best Time (seconds)')),
+                ('heat_1_time_seconds', models.DecimalField(blank=True, decimal_places=3, max_digits=6, null=True, verbose_name='Heat 1 Time (seconds)')),
+                ('heat_1_disqualified', models.BooleanField(default=False, verbose_name='Heat 1 Disqualified')),
+                ('heat_2_time_seconds', models.DecimalField(blank=True, decimal_places=3, max_digits=6, null=True, verbose_name='Heat 2 Time (seconds)')),
+                ('heat_2_disqualified', models.BooleanField(default=False, verbose_name='Heat 2 Disqualified')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Updated At')),
+            ],
+            options={
+                'verbose_name': 'Standing',
+                'verbose_name_plural': 'Standings',
+                'ordering': ['soapbox_class', models.OrderBy(models.F('rank'), nulls_last=True), 'racer_id'],
+                'indexes': [models.Index(fields=['soapbox_class', 'rank'], name='standing_class_rank_idx')],
+            },
+        ),
+        migrations.RunPython(populate_standings, migrations.RunPython.noop),
+    ]
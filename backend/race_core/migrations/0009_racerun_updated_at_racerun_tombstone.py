@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:05
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('race_core', '0008_dataversion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RaceRunTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('race_run_id', models.BigIntegerField(db_index=True, verbose_name='Race Run ID')),
+                ('racer_id', models.BigIntegerField(verbose_name='Racer ID')),
+                ('run_type', models.CharField(choices=[('PR', 'Practice'), ('H1', 'Heat 1'), ('H2', 'Heat 2')], max_length=2, verbose_name='Run Type')),
+                ('run_identifier', models.PositiveSmallIntegerField(verbose_name='Run Identifier')),
+                ('deleted_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now, verbose_name='Deleted At')),
+            ],
+            options={
+                'verbose_name': 'Race Run Tombstone',
+                'verbose_name_plural': 'Race Run Tombstones',
+                'ordering': ['deleted_at', 'id'],
+            },
+        ),
+        migrations.AddField(
+            model_name='racerun',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True, verbose_name='Updated At'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('race_core', '0009_racerun_updated_at_racerun_tombstone'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='racer',
+            index=models.Index(fields=['last_name', 'first_name'], name='racer_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='racer',
+            index=models.Index(fields=['soapbox_class', 'last_name', 'first_name'], name='racer_class_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='racerun',
+            index=models.Index(condition=models.Q(('disqualified', False), models.Q(('run_type', 'PR'), _negated=True)), fields=['racer', 'time_in_seconds'], name='racerun_best_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='racerun',
+            index=models.Index(fields=['recorded_at', 'id'], name='racerun_recorded_idx'),
+        ),
+    ]
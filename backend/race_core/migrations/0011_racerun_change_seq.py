@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('race_core', '0010_race_core_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='racerun',
+            name='change_seq',
+            field=models.PositiveBigIntegerField(db_index=True, default=0, editable=False, verbose_name='Change Sequence'),
+        ),
+        migrations.AddField(
+            model_name='raceruntombstone',
+            name='change_seq',
+            field=models.PositiveBigIntegerField(db_index=True, default=0, verbose_name='Change Sequence'),
+        ),
+        migrations.AlterField(
+            model_name='racerun',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='Updated At'),
+        ),
+    ]
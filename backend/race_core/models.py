@@ -1,8 +1,21 @@
-from django.db import models
+from django.db import models, transaction
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 
+class TeamQuerySet(models.QuerySet):
+    RACER_SUMMARY_FIELDS = ('id', 'team_id', 'first_name', 'last_name', 'start_number')
+
+    def with_racer_count(self):
+        return self.annotate(annotated_racer_count=models.Count('racers'))
+
+    def with_racer_summary(self):
+        # Fahrerliste mit einer Prefetch-Query und nur den benötigten Spalten
+        return self.with_racer_count().prefetch_related(
+            models.Prefetch('racers', queryset=Racer.objects.only(*self.RACER_SUMMARY_FIELDS))
+        )
+
+
 class Team(models.Model):
     name = models.CharField(
         _("Team Name"),
@@ -13,6 +26,8 @@ class Team(models.Model):
     created_at = models.DateTimeField(auto_now_add=True, verbose_name=_("Created At"))
     updated_at = models.DateTimeField(auto_now=True, verbose_name=_("Updated At"))
 
+    objects = TeamQuerySet.as_manager()
+
     class Meta:
         verbose_name = _("Team")
         verbose_name_plural = _("Teams")
@@ -21,6 +36,12 @@ class Team(models.Model):
     def __str__(self):
         return self.name
 
+    @property
+    def racer_count(self):
+        if hasattr(self, 'annotated_racer_count'):
+            return self.annotated_racer_count
+        return self.racers.count()
+
 
 class Soapbox(models.Model):
     name = models.CharField(
@@ -41,6 +62,17 @@ class Soapbox(models.Model):
         return self.name
 
 
+class RacerQuerySet(models.QuerySet):
+    def with_best_time(self):
+        # Korrelierte Subquery statt Min()+GROUP BY, damit pro Fahrer racerun_best_time_idx greift
+        best_time = RaceRun.objects.filter(
+            racer=models.OuterRef('pk'), disqualified=False, time_in_seconds__isnull=False
+        ).exclude(
+            run_type=RaceRun.RaceRunType.PRACTICE
+        ).order_by('time_in_seconds').values('time_in_seconds')[:1]
+        return self.annotate(annotated_best_time=models.Subquery(best_time))
+
+
 class Racer(models.Model):
     first_name = models.CharField(_("First Name"), max_length=50)
     last_name = models.CharField(_("Last Name"), max_length=50)
@@ -90,10 +122,16 @@ class Racer(models.Model):
     created_at = models.DateTimeField(auto_now_add=True, verbose_name=_("Created At"))
     updated_at = models.DateTimeField(auto_now=True, verbose_name=_("Updated At"))
 
+    objects = RacerQuerySet.as_manager()
+
     class Meta:
         verbose_name = _("Racer")
         verbose_name_plural = _("Racers")
         ordering = ['last_name', 'first_name']
+        indexes = [
+            models.Index(fields=['last_name', 'first_name'], name='racer_name_idx'),
+            models.Index(fields=['soapbox_class', 'last_name', 'first_name'], name='racer_class_name_idx'),
+        ]
 
     def __str__(self):
         return f"{self.first_name} {self.last_name}"
@@ -104,17 +142,20 @@ class Racer(models.Model):
 
     @property
     def best_time_seconds(self):
-        valid_runs = self.races.filter(
+        # Bevorzugt die Annotation aus RacerQuerySet.with_best_time(), um N+1-Queries zu vermeiden
+        if hasattr(self, 'annotated_best_time'):
+            return self.annotated_best_time
+        return self.races.filter(
             disqualified=False, time_in_seconds__isnull=False
         ).exclude(
             run_type=RaceRun.RaceRunType.PRACTICE
-        )
-        if valid_runs.exists():
-            return valid_runs.order_by('time_in_seconds').first().time_in_seconds
-        return None
+        ).order_by('time_in_seconds').values_list('time_in_seconds', flat=True).first()
 
 
 class RaceRun(models.Model):
+    # Zähler in DataVersion, aus dem jeder Schreibzugriff seine change_seq bezieht
+    CHANGE_SEQUENCE = 'racerun_changes'
+
     racer = models.ForeignKey(
         Racer,
         related_name='races',
@@ -152,13 +193,127 @@ class RaceRun(models.Model):
         help_text=_("Type of race run (e.g., Practice, Heat 1, Heat 2).")
     )
     recorded_at = models.DateTimeField(default=timezone.now, verbose_name=_("Recorded At"))
+    updated_at = models.DateTimeField(auto_now=True, verbose_name=_("Updated At"))
+    change_seq = models.PositiveBigIntegerField(_("Change Sequence"), default=0, db_index=True, editable=False)
 
     class Meta:
         verbose_name = _("Race Run")
         verbose_name_plural = _("Race Runs")
         unique_together = ('racer', 'run_type', 'run_identifier')
         ordering = ['racer__last_name', 'racer__first_name', 'run_type', 'run_identifier']
+        indexes = [
+            # Bestzeit-Abfragen: gültige Wertungsläufe eines Fahrers nach Zeit sortiert
+            models.Index(
+                fields=['racer', 'time_in_seconds'],
+                name='racerun_best_time_idx',
+                condition=models.Q(disqualified=False) & ~models.Q(run_type='PR'),
+            ),
+            models.Index(fields=['recorded_at', 'id'], name='racerun_recorded_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        # Sequenzwert und Zeile in derselben Transaktion, sonst wäre der Wert vor der Zeile sichtbar
+        with transaction.atomic(using=kwargs.get('using'), savepoint=False):
+            self.change_seq = DataVersion.next_value(self.CHANGE_SEQUENCE)
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = {*kwargs['update_fields'], 'change_seq'}
+            super().save(*args, **kwargs)
 
     def __str__(self):
         status = "DQ" if self.disqualified else (f"{self.time_in_seconds}s" if self.time_in_seconds is not None else "N/A")
         return f"{self.racer.full_name} - {self.get_run_type_display()} Run {self.run_identifier} - {status}"
+
+
+class RaceRunTombstone(models.Model):
+    """Merkt sich gelöschte RaceRuns, damit der Änderungs-Feed auch Löschungen ausliefern kann."""
+    race_run_id = models.BigIntegerField(_("Race Run ID"), db_index=True)
+    racer_id = models.BigIntegerField(_("Racer ID"))
+    run_type = models.CharField(_("Run Type"), max_length=2, choices=RaceRun.RaceRunType.choices)
+    run_identifier = models.PositiveSmallIntegerField(_("Run Identifier"))
+    deleted_at = models.DateTimeField(_("Deleted At"), default=timezone.now, db_index=True)
+    change_seq = models.PositiveBigIntegerField(_("Change Sequence"), default=0, db_index=True)
+
+    class Meta:
+        verbose_name = _("Race Run Tombstone")
+        verbose_name_plural = _("Race Run Tombstones")
+        ordering = ['deleted_at', 'id']
+
+    @classmethod
+    def for_run(cls, race_run):
+        return cls(
+            race_run_id=race_run.pk,
+            racer_id=race_run.racer_id,
+            run_type=race_run.run_type,
+            run_identifier=race_run.run_identifier,
+            change_seq=race_run.change_seq,
+        )
+
+    def __str__(self):
+        return f"RaceRun #{self.race_run_id} deleted at {self.deleted_at}"
+
+
+class Standing(models.Model):
+    racer = models.OneToOneField(
+        Racer,
+        related_name='standing',
+        on_delete=models.CASCADE,
+        primary_key=True,
+        verbose_name=_("Racer")
+    )
+    soapbox_class = models.CharField(
+        _("Soapbox Class"),
+        max_length=3,
+        choices=Racer.SoapboxClass.choices,
+        default=Racer.SoapboxClass.UNKNOWN,
+    )
+    rank = models.PositiveIntegerField(
+        _("Rank"),
+        blank=True,
+        null=True,
+        help_text=_("Rank within the soapbox class. Empty while the racer has no valid time.")
+    )
+    best_time_seconds = models.DecimalField(_("Best Time (seconds)"), max_digits=6, decimal_places=3, blank=True, null=True)
+    heat_1_time_seconds = models.DecimalField(_("Heat 1 Time (seconds)"), max_digits=6, decimal_places=3, blank=True, null=True)
+    heat_1_disqualified = models.BooleanField(_("Heat 1 Disqualified"), default=False)
+    heat_2_time_seconds = models.DecimalField(_("Heat 2 Time (seconds)"), max_digits=6, decimal_places=3, blank=True, null=True)
+    heat_2_disqualified = models.BooleanField(_("Heat 2 Disqualified"), default=False)
+    updated_at = models.DateTimeField(auto_now=True, verbose_name=_("Updated At"))
+
+    class Meta:
+        verbose_name = _("Standing")
+        verbose_name_plural = _("Standings")
+        ordering = ['soapbox_class', models.F('rank').asc(nulls_last=True), 'racer_id']
+        indexes = [
+            models.Index(fields=['soapbox_class', 'rank'], name='standing_class_rank_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.racer.full_name} - {self.get_soapbox_class_display()} #{self.rank or '-'}"
+
+
+class DataVersion(models.Model):
+    name = models.CharField(_("Name"), max_length=50, primary_key=True)
+    version = models.PositiveBigIntegerField(_("Version"), default=0)
+    updated_at = models.DateTimeField(_("Updated At"), default=timezone.now)
+
+    class Meta:
+        verbose_name = _("Data Version")
+        verbose_name_plural = _("Data Versions")
+
+    @classmethod
+    def next_value(cls, name):
+        """
+        Erhöht den Zähler `name` und liefert den neuen Wert. Muss in einer Transaktion laufen: Die Zeile
+        bleibt bis zum Commit gesperrt, parallele Schreiber erhalten ihre Werte so in Commit-Reihenfolge.
+        """
+        if not cls.objects.filter(name=name).update(version=models.F('version') + 1):
+            cls.objects.bulk_create([cls(name=name, version=0)], ignore_conflicts=True)
+            cls.objects.filter(name=name).update(version=models.F('version') + 1)
+        return cls.objects.values_list('version', flat=True).get(name=name)
+
+    @classmethod
+    def current_value(cls, name):
+        return cls.objects.filter(name=name).values_list('version', flat=True).first() or 0
+
+    def __str__(self):
+        return f"{self.name} v{self.version}"
@@ -0,0 +1,24 @@
+from rest_framework.pagination import CursorPagination
+
+
+class OptInCursorPagination(CursorPagination):
+    """
+    Cursor-Pagination, die nur greift, wenn der Client `cursor` oder `page_size` mitschickt.
+    Ohne diese Parameter bleibt die Antwort die bisherige, vollständige Liste.
+    """
+    page_size = 100
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if not {self.cursor_query_param, self.page_size_query_param} & request.query_params.keys():
+            return None
+        return super().paginate_queryset(queryset, request, view)
+
+
+class RaceRunCursorPagination(OptInCursorPagination):
+    ordering = ('recorded_at', 'id')
+
+
+class RacerCursorPagination(OptInCursorPagination):
+    ordering = ('id',)
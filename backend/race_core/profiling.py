@@ -0,0 +1,181 @@
+import heapq
+import math
+import os
+import random
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+
+HISTOGRAM_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+SLOW_QUERIES_PER_REQUEST = 3
+SQL_PREVIEW_LENGTH = 300
+
+
+def percentile(sorted_values, pct):
+    """Nearest-Rank-Perzentil einer sortierten Liste."""
+    return sorted_values[max(0, math.ceil(pct / 100 * len(sorted_values)) - 1)]
+
+
+class QueryRecorder:
+    """execute_wrapper, der Anzahl, Gesamtdauer und die langsamsten Queries einer Anfrage festhält."""
+
+    def __init__(self, keep=SLOW_QUERIES_PER_REQUEST):
+        self.keep = keep
+        self.count = 0
+        self.duration = 0.0
+        self.slowest = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.count += 1
+            self.duration += elapsed
+            entry = (elapsed, sql[:SQL_PREVIEW_LENGTH])
+            if len(self.slowest) < self.keep:
+                heapq.heappush(self.slowest, entry)
+            else:
+                heapq.heappushpop(self.slowest, entry)
+
+
+class RequestMetrics:
+    """
+    Rollierende Messwerte je View (die letzten `PROFILING_WINDOW` Stichproben) im aktuellen Prozess.
+    Bei mehreren Worker-Prozessen sieht jeder Abruf nur die Werte des antwortenden Workers.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.samples = defaultdict(lambda: deque(maxlen=getattr(settings, 'PROFILING_WINDOW', 500)))
+            self.totals = defaultdict(int)
+
+    def record(self, view, total, recorder):
+        sample = (total, recorder.duration, recorder.count, sorted(recorder.slowest, reverse=True))
+        with self.lock:
+            self.samples[view].append(sample)
+            self.totals[view] += 1
+
+    def snapshot(self):
+        with self.lock:
+            samples = {view: list(entries) for view, entries in self.samples.items()}
+            totals = dict(self.totals)
+
+        views = {}
+        for view, entries in sorted(samples.items()):
+            durations = sorted(total * 1000 for total, _, _, _ in entries)
+            query_counts = [count for _, _, count, _ in entries]
+            histogram = {str(bound): sum(1 for d in durations if d <= bound) for bound in HISTOGRAM_BUCKETS_MS}
+            histogram['+Inf'] = len(durations)
+            slowest = heapq.nlargest(5, (query for *_, queries in entries for query in queries))
+            views[view] = {
+                'sampled_requests': totals[view],
+                'window': len(entries),
+                'p50_ms': round(percentile(durations, 50), 2),
+                'p95_ms': round(percentile(durations, 95), 2),
+                'p99_ms': round(percentile(durations, 99), 2),
+                'db_avg_ms': round(sum(db for _, db, _, _ in entries) * 1000 / len(entries), 2),
+                'queries_avg': round(sum(query_counts) / len(entries), 2),
+                'queries_max': max(query_counts),
+                'histogram_ms': histogram,
+                'slowest_queries': [{'ms': round(elapsed * 1000, 2), 'sql': sql} for elapsed, sql in slowest],
+            }
+        return views
+
+
+request_metrics = RequestMetrics()
+
+
+def server_timing_header(total, recorder):
+    return (
+        f'total;dur={total * 1000:.1f}, '
+        f'db;dur={recorder.duration * 1000:.1f};desc="{recorder.count} queries", '
+        f'app;dur={max(total - recorder.duration, 0) * 1000:.1f}'
+    )
+
+
+def _view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return '<unresolved>'
+    return match.view_name or match.route
+
+
+class ProfilingMiddleware:
+    """
+    Misst für eine Stichprobe der Anfragen (PROFILING_SAMPLE_RATE) Gesamtzeit, DB-Zeit, Query-Anzahl
+    und die langsamsten Queries. Ergebnisse gehen als Server-Timing-Header an den Client und in
+    die Histogramme von /api/_metrics.
+
+    Sync und async nutzbar, damit die async Kette unter ASGI nicht in Threads umgeleitet wird.
+    DB-Verbindungen sind threadgebunden; async Anfragen instrumentieren deshalb die Verbindungen des
+    thread-sensitiven Threads, in dem auch ihre sync_to_async-Datenbankzugriffe laufen.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not _sampled():
+            return self.get_response(request)
+
+        recorder = QueryRecorder()
+        start = time.perf_counter()
+        with _recording(recorder):
+            response = self.get_response(request)
+        return _finish(request, response, time.perf_counter() - start, recorder)
+
+    async def __acall__(self, request):
+        if not _sampled():
+            return await self.get_response(request)
+
+        recorder = QueryRecorder()
+        start = time.perf_counter()
+        recording = await sync_to_async(_recording)(recorder)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(recording.close)()
+        return _finish(request, response, time.perf_counter() - start, recorder)
+
+
+def _sampled():
+    return random.random() < getattr(settings, 'PROFILING_SAMPLE_RATE', 0.1)
+
+
+def _recording(recorder):
+    stack = ExitStack()
+    for connection in connections.all():
+        stack.enter_context(connection.execute_wrapper(recorder))
+    return stack
+
+
+def _finish(request, response, total, recorder):
+    request_metrics.record(_view_name(request), total, recorder)
+    response['Server-Timing'] = server_timing_header(total, recorder)
+    return response
+
+
+def metrics_snapshot():
+    return {
+        'pid': os.getpid(),
+        'enabled': 'race_core.profiling.ProfilingMiddleware' in settings.MIDDLEWARE,
+        'sample_rate': getattr(settings, 'PROFILING_SAMPLE_RATE', 0.1),
+        'views': request_metrics.snapshot(),
+    }
@@ -0,0 +1,202 @@
+import csv
+from pathlib import Path
+
+from django.db import transaction
+from django.utils.translation import gettext_lazy as _
+
+from .models import Team, Soapbox, Racer
+from .racer_index import invalidate_racer_index
+from .signals import batched_changes
+from .versioning import TEAMS, SOAPBOXES, RACERS
+
+# Spaltenüberschriften (klein geschrieben) -> Racer-Feld
+COLUMN_ALIASES = {
+    'first_name': 'first_name',
+    'vorname': 'first_name',
+    'last_name': 'last_name',
+    'nachname': 'last_name',
+    'start_number': 'start_number',
+    'startnummer': 'start_number',
+    'soapbox_class': 'soapbox_class',
+    'class': 'soapbox_class',
+    'klasse': 'soapbox_class',
+    'team': 'team',
+    'soapbox': 'soapbox',
+    'seifenkiste': 'soapbox',
+}
+
+# Werden bei vorhandenen Racern nur überschrieben, wenn die Datei die Spalte enthält
+OPTIONAL_UPDATE_FIELDS = ['soapbox_class', 'team', 'soapbox']
+
+
+class RacerImportError(Exception):
+    pass
+
+
+def read_registration_rows(path):
+    """Liefert (Zeilennummer, Dict mit Racer-Feldern) für eine CSV- oder XLSX-Datei."""
+    path = Path(path)
+    if path.suffix.lower() == '.xlsx':
+        raw_rows = _read_xlsx(path)
+    else:
+        raw_rows = _read_csv(path)
+
+    header = next(raw_rows, None)
+    if header is None:
+        raise RacerImportError(_("The file is empty."))
+    columns = [COLUMN_ALIASES.get(str(name or '').strip().lower()) for name in header]
+    missing = {'first_name', 'last_name', 'start_number'} - set(columns)
+    if missing:
+        raise RacerImportError(_(f"Missing columns: {', '.join(sorted(missing))}."))
+
+    for line_number, values in enumerate(raw_rows, start=2):
+        row = {
+            column: str(value).strip() if value is not None else ''
+            for column, value in zip(columns, values) if column
+        }
+        if any(row.values()):
+            yield line_number, row
+
+
+def _read_csv(path):
+    with path.open(newline='', encoding='utf-8-sig') as f:
+        sample = f.read(4096)
+        f.seek(0)
+        try:
+            dialect = csv.Sniffer().sniff(sample, delimiters=',;\t')
+        except csv.Error:
+            dialect = csv.excel
+        yield from csv.reader(f, dialect)
+
+
+def _read_xlsx(path):
+    try:
+        import openpyxl
+    except ImportError:
+        raise RacerImportError(_("Reading .xlsx files requires the 'openpyxl' package.")) from None
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        yield from workbook.worksheets[0].iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+
+class RacerImporter:
+    """
+    Legt Teams, Seifenkisten und Racer aus Anmeldedaten gebündelt an bzw. aktualisiert sie.
+    Racer werden über die Startnummer zugeordnet (case-insensitive), Teams und Seifenkisten über den Namen.
+    Fehlerhafte Zeilen werden übersprungen und in `errors` gemeldet.
+    """
+
+    def __init__(self, rows, batch_size=500):
+        self.rows = rows
+        self.batch_size = batch_size
+        self.errors = []
+        self.summary = {'teams_created': 0, 'soapboxes_created': 0, 'racers_created': 0, 'racers_updated': 0}
+        self.class_lookup = {}
+        for value, label in Racer.SoapboxClass.choices:
+            self.class_lookup[value.lower()] = value
+            self.class_lookup[str(label).lower()] = value
+
+    def _clean(self, line_number, row, seen_start_numbers):
+        errors = []
+        for field, max_length in (('first_name', 50), ('last_name', 50), ('start_number', 10)):
+            if not row.get(field):
+                errors.append(_(f"'{field}' is required."))
+            elif len(row[field]) > max_length:
+                errors.append(_(f"'{field}' is longer than {max_length} characters."))
+        # Team und Seifenkiste sind optional, werden aber über ihren Namen angelegt
+        for field, max_length in (('team', 100), ('soapbox', 100)):
+            if len(row.get(field) or '') > max_length:
+                errors.append(_(f"'{field}' is longer than {max_length} characters."))
+
+        soapbox_class = row.get('soapbox_class', '')
+        row['soapbox_class'] = self.class_lookup.get(soapbox_class.lower(), Racer.SoapboxClass.UNKNOWN) \
+            if soapbox_class else Racer.SoapboxClass.UNKNOWN
+        if soapbox_class and soapbox_class.lower() not in self.class_lookup:
+            errors.append(_(f"Unknown soapbox class '{soapbox_class}'."))
+
+        start_number_key = row.get('start_number', '').upper()
+        if start_number_key in seen_start_numbers:
+            errors.append(_(f"Start number '{row['start_number']}' already used in line {seen_start_numbers[start_number_key]}."))
+        elif start_number_key:
+            seen_start_numbers[start_number_key] = line_number
+
+        if errors:
+            self.errors.append((line_number, errors))
+            return None
+        return row
+
+    def _resolve_names(self, model, names, summary_key):
+        # Vorhandene Namen mit einer Query laden, fehlende gebündelt anlegen
+        names = {name for name in names if name}
+        if not names:
+            return {}
+        existing = dict(model.objects.filter(name__in=names).values_list('name', 'pk'))
+        missing = names - existing.keys()
+        if missing:
+            model.objects.bulk_create([model(name=name) for name in missing], ignore_conflicts=True)
+            existing = dict(model.objects.filter(name__in=names).values_list('name', 'pk'))
+            self.summary[summary_key] += len(missing)
+        return existing
+
+    @staticmethod
+    def _update_fields(columns):
+        # Fehlt z.B. die Klassen-Spalte, bleibt die Klasse vorhandener Racer erhalten statt auf UNK zu fallen
+        optional = [field for field in OPTIONAL_UPDATE_FIELDS if field in columns]
+        return ['first_name', 'last_name', *optional, 'updated_at']
+
+    def run(self, dry_run=False):
+        seen_start_numbers = {}
+        columns = set()
+        rows = []
+        for line_number, row in self.rows:
+            columns.update(row)
+            if cleaned := self._clean(line_number, row, seen_start_numbers):
+                rows.append(cleaned)
+        if dry_run or not rows:
+            return self.summary
+
+        with transaction.atomic(), batched_changes() as batch:
+            teams = self._resolve_names(Team, (row.get('team') for row in rows), 'teams_created')
+            soapboxes = self._resolve_names(Soapbox, (row.get('soapbox') for row in rows), 'soapboxes_created')
+
+            # Vorhandene Schreibweise der Startnummer übernehmen, damit der Konflikt auf dem Unique-Index greift
+            existing_start_numbers = {
+                start_number.upper(): start_number
+                for start_number in Racer.objects.filter(start_number__isnull=False).values_list('start_number', flat=True)
+            }
+            racers = []
+            for row in rows:
+                start_number = existing_start_numbers.get(row['start_number'].upper(), row['start_number'])
+                racers.append(Racer(
+                    first_name=row['first_name'],
+                    last_name=row['last_name'],
+                    start_number=start_number,
+                    soapbox_class=row['soapbox_class'],
+                    team_id=teams.get(row.get('team')),
+                    soapbox_id=soapboxes.get(row.get('soapbox')),
+                ))
+                if start_number.upper() in existing_start_numbers:
+                    self.summary['racers_updated'] += 1
+                else:
+                    self.summary['racers_created'] += 1
+
+            Racer.objects.bulk_create(
+                racers,
+                batch_size=self.batch_size,
+                update_conflicts=True,
+                unique_fields=['start_number'],
+                update_fields=self._update_fields(columns),
+            )
+
+            # bulk_create sendet keine Signale, die Folgearbeiten werden direkt am Batch gemeldet
+            racer_ids = {racer.pk for racer in racers}
+            if None in racer_ids:
+                # Backends ohne RETURNING bei Konflikten liefern keine IDs zurück
+                start_numbers = [racer.start_number for racer in racers]
+                racer_ids = Racer.objects.filter(start_number__in=start_numbers).values_list('pk', flat=True)
+            batch.racer_ids.update(racer_ids)
+            batch.versions.update({RACERS, TEAMS, SOAPBOXES})
+        invalidate_racer_index()
+        return self.summary
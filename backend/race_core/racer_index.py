@@ -0,0 +1,95 @@
+import threading
+
+from django.conf import settings
+from django.db.models.functions import Upper
+
+from .models import Racer
+
+
+class RacerIndex:
+    """
+    Index Startnummer (case-insensitive) bzw. ID -> Racer.
+    Fehlende Einträge werden gebündelt mit einer Query nachgeladen. Mehrdeutige
+    Startnummern werden als None, unbekannte als False abgelegt.
+    """
+
+    def __init__(self):
+        self._by_start_number = {}
+        self._by_id = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def invalidate(self):
+        with self._lock:
+            self._generation += 1
+            self._by_start_number = {}
+            self._by_id = {}
+
+    def _store(self, generation, racers, start_number_keys=()):
+        by_start_number = dict.fromkeys(start_number_keys, False)
+        for racer in racers:
+            if racer.start_number is None:
+                continue
+            key = racer.start_number.upper()
+            by_start_number[key] = racer if by_start_number.get(key, False) is False else None
+        with self._lock:
+            # Ergebnisse einer Query, die vor einer Invalidierung lief, nicht übernehmen
+            if generation != self._generation:
+                return
+            self._by_id.update((racer.pk, racer) for racer in racers)
+            self._by_start_number.update(
+                (key, racer) for key, racer in by_start_number.items() if key in start_number_keys
+            )
+
+    def preload(self, start_numbers=(), ids=()):
+        start_number_keys = {str(start_number).upper() for start_number in start_numbers} - self._by_start_number.keys()
+        ids = set(ids) - self._by_id.keys()
+        generation = self._generation
+        if start_number_keys:
+            racers = list(
+                Racer.objects.annotate(start_number_upper=Upper('start_number'))
+                .filter(start_number_upper__in=start_number_keys).order_by()
+            )
+            self._store(generation, racers, start_number_keys)
+        if ids:
+            self._store(generation, list(Racer.objects.filter(pk__in=ids).order_by()))
+
+    def lookup_start_number(self, start_number):
+        """Liefert den Racer, None bei Mehrdeutigkeit oder False, wenn es keinen gibt."""
+        key = str(start_number).upper()
+        if key not in self._by_start_number:
+            self.preload(start_numbers=[key])
+        return self._by_start_number.get(key, False)
+
+    def get_by_start_number(self, start_number):
+        racer = self.lookup_start_number(start_number)
+        if racer is False:
+            raise Racer.DoesNotExist
+        if racer is None:
+            raise Racer.MultipleObjectsReturned
+        return racer
+
+    def get_by_id(self, racer_id):
+        if racer_id not in self._by_id:
+            self.preload(ids=[racer_id])
+        try:
+            return self._by_id[racer_id]
+        except KeyError:
+            raise Racer.DoesNotExist from None
+
+
+_process_racer_index = RacerIndex()
+
+
+def get_racer_index():
+    """
+    Prozessweiter Index, wenn RACER_INDEX_CACHE aktiv ist (Invalidierung über die Racer-Signale),
+    sonst ein frischer Index pro Aufruf bzw. Request.
+    """
+    if getattr(settings, 'RACER_INDEX_CACHE', False):
+        return _process_racer_index
+    return RacerIndex()
+
+
+def invalidate_racer_index():
+    _process_racer_index.invalidate()
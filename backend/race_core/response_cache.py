@@ -0,0 +1,50 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+KEY_PREFIX = 'race_core'
+
+
+def response_cache_enabled():
+    return getattr(settings, 'RESPONSE_CACHE_ENABLED', False)
+
+
+def get_response_cache():
+    return caches[getattr(settings, 'RESPONSE_CACHE_ALIAS', 'default')]
+
+
+def _generation_key(name):
+    return f'{KEY_PREFIX}:generation:{name}'
+
+
+def get_generations(names):
+    """
+    Liefert die aktuellen Cache-Generationen der Tabellen. Fehlt eine (neu oder verdrängt),
+    wird sie mit einem Zeitwert angelegt, damit sie nie auf einen früheren Stand zurückfällt.
+    """
+    cache = get_response_cache()
+    keys = [_generation_key(name) for name in names]
+    generations = cache.get_many(keys)
+    for key in keys:
+        if key not in generations:
+            cache.add(key, time.time_ns(), timeout=None)
+            generations[key] = cache.get(key)
+    return [generations[key] for key in keys]
+
+
+def invalidate_response_cache(*names):
+    cache = get_response_cache()
+    for name in set(names):
+        try:
+            cache.incr(_generation_key(name))
+        except ValueError:
+            cache.set(_generation_key(name), time.time_ns(), timeout=None)
+
+
+def response_cache_key(request, names):
+    # Die Generationen stecken im Schlüssel, alte Einträge werden dadurch nie mehr gelesen und laufen aus
+    generations = '|'.join(f'{name}:{generation}' for name, generation in zip(names, get_generations(names)))
+    variant = f'{request.get_full_path()}|{request.accepted_media_type}|{generations}'
+    return f'{KEY_PREFIX}:response:{hashlib.sha1(variant.encode()).hexdigest()}'
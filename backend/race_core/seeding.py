@@ -0,0 +1,71 @@
+import random
+from decimal import Decimal
+
+from django.db import transaction
+
+from .models import Team, Soapbox, Racer, RaceRun
+from .racer_index import invalidate_racer_index
+from .signals import batched_changes, reserve_change_seq
+from .versioning import TEAMS, SOAPBOXES, RACERS, RACE_RUNS
+
+FIRST_NAMES = ['Anna', 'Ben', 'Clara', 'David', 'Emma', 'Felix', 'Greta', 'Hannes', 'Ida', 'Jonas', 'Lena', 'Moritz']
+LAST_NAMES = ['Bauer', 'Fischer', 'Hofmann', 'Koch', 'Meyer', 'Müller', 'Richter', 'Schmidt', 'Schulz', 'Wagner']
+RUN_TYPES = [RaceRun.RaceRunType.PRACTICE, RaceRun.RaceRunType.HEAT_1, RaceRun.RaceRunType.HEAT_2]
+SEED_CLASSES = [value for value in Racer.SoapboxClass.values if value != Racer.SoapboxClass.UNKNOWN]
+
+
+def seed_event(racers=500, runs_per_racer=3, teams=None, seed=1, batch_size=1000):
+    """
+    Legt ein synthetisches Rennen an: Teams, Seifenkisten, Racer mit Startnummern `S0001`… und
+    `runs_per_racer` Läufe pro Racer (reihum Training, Lauf 1, Lauf 2). Gleicher `seed` ergibt gleiche Daten.
+    Vorhandene Teams, Seifenkisten, Racer und Läufe werden vorher gelöscht.
+    """
+    rng = random.Random(seed)
+    team_count = teams if teams is not None else max(1, racers // 5)
+
+    with transaction.atomic(), batched_changes() as batch:
+        # Über die normalen Löschungen, damit Tombstones und Live-Events für Clients entstehen
+        RaceRun.objects.all().delete()
+        Racer.objects.all().delete()
+        Team.objects.all().delete()
+        Soapbox.objects.all().delete()
+
+        team_objects = Team.objects.bulk_create(
+            [Team(name=f"Team {i + 1:03d}") for i in range(team_count)], batch_size=batch_size
+        )
+        soapbox_objects = Soapbox.objects.bulk_create(
+            [Soapbox(name=f"Kiste {i + 1:04d}") for i in range(racers)], batch_size=batch_size
+        )
+        Racer.objects.bulk_create([
+            Racer(
+                first_name=rng.choice(FIRST_NAMES),
+                last_name=rng.choice(LAST_NAMES),
+                start_number=f"S{i + 1:04d}",
+                soapbox_class=SEED_CLASSES[i % len(SEED_CLASSES)],
+                team=team_objects[i % team_count] if team_objects else None,
+                soapbox=soapbox_objects[i],
+            )
+            for i in range(racers)
+        ], batch_size=batch_size)
+
+        runs = []
+        change_seq = reserve_change_seq()
+        racer_ids = list(Racer.objects.order_by('start_number').values_list('id', flat=True))
+        for racer_id in racer_ids:
+            base_time = rng.uniform(35, 55)
+            for i in range(runs_per_racer):
+                runs.append(RaceRun(
+                    racer_id=racer_id,
+                    run_type=RUN_TYPES[i % len(RUN_TYPES)],
+                    run_identifier=i // len(RUN_TYPES) + 1,
+                    time_in_seconds=Decimal(f"{base_time + rng.uniform(-2, 2):.3f}"),
+                    disqualified=rng.random() < 0.02,
+                    change_seq=change_seq,
+                ))
+        RaceRun.objects.bulk_create(runs, batch_size=batch_size)
+
+        # bulk_create sendet keine Signale: Standings und Versionen laufen über den Batch
+        batch.racer_ids.update(racer_ids)
+        batch.versions.update({TEAMS, SOAPBOXES, RACERS, RACE_RUNS})
+    invalidate_racer_index()
+    return {'teams': team_count, 'soapboxes': racers, 'racers': racers, 'race_runs': len(runs)}
@@ -1,9 +1,38 @@
+from django.db import IntegrityError, transaction
 from rest_framework import serializers
-from .models import Team, Racer, RaceRun, Soapbox
+from rest_framework.settings import api_settings
+from .models import Team, Racer, RaceRun, Soapbox, Standing
+from .racer_index import get_racer_index
 from django.utils.translation import gettext_lazy as _
 
 
-class RaceRunSerializer(serializers.ModelSerializer):
+def get_requested_fields(request):
+    """Liefert die per ?fields=a,b angefragten Felder oder None, wenn der Parameter fehlt."""
+    fields = request.query_params.get('fields') if request is not None else None
+    if not fields:
+        return None
+    return {name.strip() for name in fields.split(',') if name.strip()}
+
+
+class SparseFieldsetMixin:
+    """
+    Beschränkt die Ausgabe auf die per ?fields= angefragten Felder.
+    Gilt nur für den Serializer, der den Request im Kontext übergeben bekommt, nicht für verschachtelte.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        requested = get_requested_fields(kwargs.get('context', {}).get('request'))
+        if requested is None:
+            return
+        unknown = requested - self.fields.keys()
+        if unknown:
+            raise serializers.ValidationError({'fields': [_(f"Unknown fields: {', '.join(sorted(unknown))}.")]})
+        for name in self.fields.keys() - requested:
+            self.fields.pop(name)
+
+
+class RaceRunSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     racer_name = serializers.CharField(source='racer.full_name', read_only=True)
     run_type_display = serializers.CharField(source='get_run_type_display', read_only=True)
     racer_start_number = serializers.CharField(source='racer.start_number', read_only=True, allow_null=True)
@@ -22,10 +51,11 @@ class RaceRunSerializer(serializers.ModelSerializer):
             'run_type',
             'run_type_display',
             'recorded_at',
+            'updated_at',
         ]
 
 
-class RacerSerializer(serializers.ModelSerializer):
+class RacerSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     team_name = serializers.CharField(source='team.name', read_only=True, allow_null=True)
     soapbox_name = serializers.CharField(source='soapbox.name', read_only=True, allow_null=True)
     best_time_seconds = serializers.DecimalField(max_digits=6, decimal_places=3, read_only=True, allow_null=True)
@@ -54,6 +84,38 @@ class RacerSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'full_name', 'best_time_seconds', 'team_name', 'soapbox_class_display', 'races', 'soapbox_name']
 
 
+class StandingSerializer(serializers.ModelSerializer):
+    racer_name = serializers.CharField(source='racer.full_name', read_only=True)
+    racer_start_number = serializers.CharField(source='racer.start_number', read_only=True, allow_null=True)
+    team = serializers.IntegerField(source='racer.team_id', read_only=True, allow_null=True)
+    team_name = serializers.CharField(source='racer.team.name', read_only=True, allow_null=True)
+    soapbox = serializers.IntegerField(source='racer.soapbox_id', read_only=True, allow_null=True)
+    soapbox_name = serializers.CharField(source='racer.soapbox.name', read_only=True, allow_null=True)
+    soapbox_class_display = serializers.CharField(source='get_soapbox_class_display', read_only=True)
+
+    class Meta:
+        model = Standing
+        fields = [
+            'racer',
+            'racer_name',
+            'racer_start_number',
+            'team',
+            'team_name',
+            'soapbox',
+            'soapbox_name',
+            'soapbox_class',
+            'soapbox_class_display',
+            'rank',
+            'best_time_seconds',
+            'heat_1_time_seconds',
+            'heat_1_disqualified',
+            'heat_2_time_seconds',
+            'heat_2_disqualified',
+            'updated_at',
+        ]
+        read_only_fields = fields
+
+
 class SoapboxSerializer(serializers.ModelSerializer):
 
     class Meta:
@@ -69,7 +131,7 @@ class SoapboxSerializer(serializers.ModelSerializer):
 
 class TeamSerializer(serializers.ModelSerializer):
     racers_info = serializers.SerializerMethodField(read_only=True)
-    racer_count = serializers.IntegerField(source='racers.count', read_only=True)
+    racer_count = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = Team
@@ -84,7 +146,12 @@ class TeamSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'racer_count', 'racers_info']
 
     def get_racers_info(self, obj):
-        return obj.racers.values('id', 'first_name', 'last_name', 'start_number')
+        # racers.all() statt values(), damit der Prefetch aus with_racer_summary() genutzt wird
+        return [
+            {'id': racer.id, 'first_name': racer.first_name, 'last_name': racer.last_name,
+             'start_number': racer.start_number}
+            for racer in obj.racers.all()
+        ]
 
 
 class TeamWriteSerializer(serializers.ModelSerializer):
@@ -144,6 +211,13 @@ class RaceRunWriteSerializer(serializers.ModelSerializer):
             'recorded_at',
         ]
 
+    @property
+    def racer_index(self):
+        # Pro Request geteilt (auch zwischen Kind-Serializern), bei RACER_INDEX_CACHE prozessweit
+        if 'racer_index' not in self.context:
+            self.context['racer_index'] = get_racer_index()
+        return self.context['racer_index']
+
     def _get_racer_instance_from_input_data(self, input_data_dict):
         racer_id_input = input_data_dict.get('racer_id')
         racer_start_number_input = input_data_dict.get('racer_start_number')
@@ -154,7 +228,7 @@ class RaceRunWriteSerializer(serializers.ModelSerializer):
         if racer_pk_from_direct_input is not None:
             try:
                 racer_pk = int(racer_pk_from_direct_input)
-                identified_racer = Racer.objects.get(id=racer_pk)
+                identified_racer = self.racer_index.get_by_id(racer_pk)
             except (ValueError, TypeError):
                 raise serializers.ValidationError(
                     {'racer': _(f"Invalid value for Racer PK: '{racer_pk_from_direct_input}'. Must be an integer.")})
@@ -163,12 +237,12 @@ class RaceRunWriteSerializer(serializers.ModelSerializer):
                     {'racer': _(f"Racer with PK {racer_pk_from_direct_input} not found.")})
         elif racer_id_input is not None:
             try:
-                identified_racer = Racer.objects.get(id=racer_id_input)
+                identified_racer = self.racer_index.get_by_id(racer_id_input)
             except Racer.DoesNotExist:
                 raise serializers.ValidationError({'racer_id': _(f"Racer with ID {racer_id_input} not found.")})
         elif racer_start_number_input is not None:
             try:
-                identified_racer = Racer.objects.get(start_number__iexact=str(racer_start_number_input))
+                identified_racer = self.racer_index.get_by_start_number(racer_start_number_input)
             except Racer.DoesNotExist:
                 raise serializers.ValidationError(
                     {'racer_start_number': _(f"Racer with start number '{racer_start_number_input}' not found.")})
@@ -181,31 +255,7 @@ class RaceRunWriteSerializer(serializers.ModelSerializer):
     def validate(self, data):
         self.context['_identified_racer'] = self._get_racer_instance_from_input_data(data)
 
-        racer_for_validation = None
-        if self.instance:
-            racer_for_validation = self.context.get('_identified_racer', self.instance.racer)
-        else:
-            racer_for_validation = self.context.get('_identified_racer')
-
-        if racer_for_validation:
-            run_type = data.get('run_type', self.instance.run_type if self.instance else None)
-            run_identifier = data.get('run_identifier', self.instance.run_identifier if self.instance else None)
-
-            if run_type is not None and run_identifier is not None:
-                queryset = RaceRun.objects.filter(
-                    racer=racer_for_validation,
-                    run_type=run_type,
-                    run_identifier=run_identifier
-                )
-                if self.instance:
-                    queryset = queryset.exclude(pk=self.instance.pk)
-
-                if queryset.exists():
-                    raise serializers.ValidationError(
-                        _("A race run with this racer, run type, and run identifier already exists."),
-                        code='unique'
-                    )
-        elif not self.instance:
+        if not self.context.get('_identified_racer') and not self.instance:
             raise serializers.ValidationError(
                 _("A racer must be identified via 'racer' (PK), 'racer_id', or 'racer_start_number'.")
             )
@@ -232,7 +282,7 @@ class RaceRunWriteSerializer(serializers.ModelSerializer):
         validated_data.pop('racer_start_number', None)
 
         validated_data['racer'] = racer_instance
-        return super().create(validated_data)
+        return self._save_with_unique_check(super().create, validated_data)
 
     def update(self, instance, validated_data):
         identified_racer_for_update = self.context.get('_identified_racer')
@@ -247,7 +297,63 @@ class RaceRunWriteSerializer(serializers.ModelSerializer):
         validated_data.pop('racer_id', None)
         validated_data.pop('racer_start_number', None)
 
-        return super().update(instance, validated_data)
+        return self._save_with_unique_check(super().update, instance, validated_data)
+
+    def _save_with_unique_check(self, save, *args):
+        # Die Eindeutigkeit sichert der Unique-Constraint; nur im Fehlerfall wird nachgeschaut,
+        # ob er die Ursache war, und daraus der übliche Validierungsfehler gemacht.
+        try:
+            with transaction.atomic():
+                return save(*args)
+        except IntegrityError:
+            run = self.instance or RaceRun(**args[-1])
+            conflicts = RaceRun.objects.filter(
+                racer_id=run.racer_id,
+                run_type=run.run_type,
+                run_identifier=run.run_identifier
+            ).exclude(pk=run.pk)
+            if conflicts.exists():
+                raise serializers.ValidationError({
+                    api_settings.NON_FIELD_ERRORS_KEY: [
+                        _("A race run with this racer, run type, and run identifier already exists.")
+                    ]
+                }, code='unique')
+            raise
 
     def to_representation(self, instance):
         return RaceRunSerializer(instance, context=self.context).data
+
+
+class RaceRunKeySerializer(serializers.Serializer):
+    ref = serializers.CharField(required=False, allow_null=True, allow_blank=True, max_length=100)
+    racer_start_number = serializers.CharField(max_length=10)
+    run_type = serializers.ChoiceField(choices=RaceRun.RaceRunType.choices)
+    run_identifier = serializers.IntegerField(min_value=1, max_value=32767, default=1)
+
+
+class RaceRunBulkDeleteSerializer(RaceRunKeySerializer):
+    id = serializers.IntegerField(required=False, allow_null=True)
+
+
+class RaceRunBulkUpsertSerializer(RaceRunKeySerializer):
+    id = serializers.IntegerField(required=False, allow_null=True)
+    time_in_seconds = serializers.DecimalField(max_digits=6, decimal_places=3, required=False, allow_null=True)
+    disqualified = serializers.BooleanField(required=False)
+    notes = serializers.CharField(required=False, allow_null=True, allow_blank=True)
+    recorded_at = serializers.DateTimeField(required=False)
+
+    def validate(self, data):
+        if data.get('disqualified') and data.get('time_in_seconds') is not None:
+            raise serializers.ValidationError({
+                'time_in_seconds': _("A disqualified run cannot have a time. Set time to null or remove it.")
+            })
+        return data
+
+
+class RaceRunBulkSerializer(serializers.Serializer):
+    upserts = serializers.ListField(child=serializers.DictField(), required=False, default=list)
+    deletes = serializers.ListField(child=serializers.DictField(), required=False, default=list)
+
+
+class RaceRunReplaceSerializer(serializers.Serializer):
+    runs = serializers.ListField(child=serializers.DictField(), allow_empty=True)
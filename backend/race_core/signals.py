@@ -0,0 +1,162 @@
+import threading
+from contextlib import contextmanager
+
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, pre_delete
+from django.dispatch import receiver
+
+from .changes import prune_race_run_tombstones
+from .live import publish_race_run_event, race_run_payload
+from .models import Team, Soapbox, Racer, RaceRun, RaceRunTombstone, DataVersion
+from .racer_index import invalidate_racer_index
+from .standings import refresh_standings, rerank_class
+from .versioning import bump_versions, TEAMS, SOAPBOXES, RACERS, RACE_RUNS, STANDINGS
+
+VERSIONED_MODELS = {
+    Team: TEAMS,
+    Soapbox: SOAPBOXES,
+    Racer: RACERS,
+    RaceRun: RACE_RUNS,
+}
+
+_local = threading.local()
+
+
+class ChangeBatch:
+    """
+    Sammelt die Folgearbeiten von Änderungen (Standings, Versionen, Live-Events) und
+    führt sie nach dem Commit gebündelt aus.
+    """
+
+    def __init__(self, collect_tombstones=False):
+        self.racer_ids = set()
+        self.rerank_classes = set()
+        self.versions = set()
+        self.events = []
+        self.collect_tombstones = collect_tombstones
+        self.tombstones = []
+        self.change_seq = None
+
+    def race_run_saved(self, instance, created):
+        self.racer_ids.add(instance.racer_id)
+        self.versions.add(RACE_RUNS)
+        self.events.append(('created' if created else 'updated', race_run_payload(instance)))
+
+    def race_run_deleted(self, instance):
+        self.racer_ids.add(instance.racer_id)
+        self.versions.add(RACE_RUNS)
+        self.events.append(('deleted', {'id': instance.pk, 'racer': instance.racer_id}))
+        # Tombstones gehören in die Transaktion der Löschung, nicht in den Nachlauf
+        tombstone = RaceRunTombstone.for_run(instance)
+        if self.collect_tombstones:
+            self.tombstones.append(tombstone)
+        else:
+            tombstone.save()
+
+    def flush_tombstones(self):
+        if self.tombstones:
+            RaceRunTombstone.objects.bulk_create(self.tombstones)
+            self.tombstones = []
+
+    def run(self):
+        # Läuft erst nach dem Commit, damit kaskadierende Löschungen
+        # (Racer -> RaceRuns -> Standing) keine Zeilen für bereits gelöschte Racer anlegen.
+        refresh_standings(self.racer_ids)
+        for soapbox_class in self.rerank_classes:
+            if rerank_class(soapbox_class):
+                self.versions.add(STANDINGS)
+        if self.versions:
+            bump_versions(*self.versions)
+        for event_type, payload in self.events:
+            publish_race_run_event(event_type, payload)
+        # Nur nach Löschungen aufräumen, dann wächst die Tabelle nicht und normale Writes kosten nichts extra
+        if any(event_type == 'deleted' for event_type, _ in self.events):
+            prune_race_run_tombstones()
+
+
+@contextmanager
+def batched_changes():
+    """
+    Bündelt alle Signale innerhalb des Blocks zu einem einzigen Nachlauf nach dem Commit.
+    Für Bulk-Operationen gedacht, die Signale umgehen (bulk_create/bulk_update) und ihre
+    Änderungen direkt am zurückgegebenen Batch melden. Die Signal-Receiver nutzen ihn ebenfalls.
+
+    Der Nachlauf wird erst beim Verlassen des Blocks eingeplant, also nachdem der Batch befüllt ist:
+    Außerhalb einer Transaktion führt on_commit ihn sofort aus. Schreibt der Block RaceRuns, gehört er
+    komplett in eine Transaktion (`with transaction.atomic(), batched_changes()`), da alle Zeilen
+    denselben Sequenzwert bekommen.
+    """
+    if getattr(_local, 'batch', None) is not None:
+        yield _local.batch
+        return
+
+    batch = ChangeBatch(collect_tombstones=True)
+    _local.batch = batch
+    try:
+        yield batch
+    finally:
+        _local.batch = None
+    batch.flush_tombstones()
+    transaction.on_commit(batch.run)
+
+
+@receiver(post_save, sender=RaceRun, dispatch_uid='race_core_racerun_saved')
+def race_run_saved(sender, instance, created, **kwargs):
+    with batched_changes() as batch:
+        batch.race_run_saved(instance, created)
+
+
+def reserve_change_seq():
+    """
+    Liefert einen RaceRun-Sequenzwert für Schreibzugriffe ohne save(). Innerhalb eines
+    batched_changes()-Blocks gilt ein Wert für den ganzen Block, sonst wird pro Aufruf ein neuer gezogen.
+    """
+    batch = getattr(_local, 'batch', None)
+    if batch is None or not transaction.get_connection().in_atomic_block:
+        return DataVersion.next_value(RaceRun.CHANGE_SEQUENCE)
+    if batch.change_seq is None:
+        batch.change_seq = DataVersion.next_value(RaceRun.CHANGE_SEQUENCE)
+    return batch.change_seq
+
+
+@receiver(pre_delete, sender=RaceRun, dispatch_uid='race_core_racerun_deleting')
+def race_run_deleting(sender, instance, **kwargs):
+    # Sequenz für den Tombstone vor den Zeilensperren der Löschung ziehen, in derselben Reihenfolge wie save()
+    instance.change_seq = reserve_change_seq()
+
+
+@receiver(post_delete, sender=RaceRun, dispatch_uid='race_core_racerun_deleted')
+def race_run_deleted(sender, instance, **kwargs):
+    with batched_changes() as batch:
+        batch.race_run_deleted(instance)
+
+
+def racer_changed():
+    # Sofort und nach dem Commit, damit kein zwischenzeitlich geladener alter Stand im Index bleibt
+    invalidate_racer_index()
+    transaction.on_commit(invalidate_racer_index)
+
+
+@receiver(post_save, sender=Racer, dispatch_uid='race_core_racer_saved')
+def racer_saved(sender, instance, **kwargs):
+    racer_changed()
+    with batched_changes() as batch:
+        batch.racer_ids.add(instance.pk)
+        batch.versions.add(RACERS)
+
+
+@receiver(post_delete, sender=Racer, dispatch_uid='race_core_racer_deleted')
+def racer_deleted(sender, instance, **kwargs):
+    racer_changed()
+    with batched_changes() as batch:
+        batch.rerank_classes.add(instance.soapbox_class)
+        batch.versions.add(RACERS)
+
+
+@receiver(post_save, sender=Team, dispatch_uid='race_core_team_saved')
+@receiver(post_delete, sender=Team, dispatch_uid='race_core_team_deleted')
+@receiver(post_save, sender=Soapbox, dispatch_uid='race_core_soapbox_saved')
+@receiver(post_delete, sender=Soapbox, dispatch_uid='race_core_soapbox_deleted')
+def lookup_table_changed(sender, **kwargs):
+    with batched_changes() as batch:
+        batch.versions.add(VERSIONED_MODELS[sender])
@@ -0,0 +1,101 @@
+from django.db import models
+from django.utils import timezone
+
+from .models import Racer, RaceRun, Standing
+from .versioning import bump_versions, STANDINGS
+
+STANDING_FIELDS = [
+    'soapbox_class',
+    'best_time_seconds',
+    'heat_1_time_seconds',
+    'heat_1_disqualified',
+    'heat_2_time_seconds',
+    'heat_2_disqualified',
+]
+
+HEAT_FIELD_PREFIXES = {
+    RaceRun.RaceRunType.HEAT_1: 'heat_1',
+    RaceRun.RaceRunType.HEAT_2: 'heat_2',
+}
+
+
+def refresh_standings(racer_ids):
+    """
+    Berechnet die Standing-Zeilen der angegebenen Racer neu und aktualisiert
+    danach die Ränge der betroffenen Klassen. Alle anderen Zeilen bleiben unberührt.
+    """
+    racer_ids = set(racer_ids)
+    if not racer_ids:
+        return
+
+    existing = {s.racer_id: s for s in Standing.objects.filter(racer_id__in=racer_ids)}
+    affected_classes = {s.soapbox_class for s in existing.values()}
+
+    computed = {
+        racer.id: Standing(racer_id=racer.id, soapbox_class=racer.soapbox_class, best_time_seconds=racer.annotated_best_time)
+        for racer in Racer.objects.with_best_time().filter(pk__in=racer_ids).only('id', 'soapbox_class')
+    }
+    heat_runs = RaceRun.objects.filter(
+        racer_id__in=computed.keys(), run_type__in=HEAT_FIELD_PREFIXES.keys(), run_identifier=1
+    ).values_list('racer_id', 'run_type', 'time_in_seconds', 'disqualified')
+    for racer_id, run_type, time_in_seconds, disqualified in heat_runs:
+        prefix = HEAT_FIELD_PREFIXES[run_type]
+        setattr(computed[racer_id], f'{prefix}_time_seconds', None if disqualified else time_in_seconds)
+        setattr(computed[racer_id], f'{prefix}_disqualified', disqualified)
+
+    to_create, to_update = [], []
+    now = timezone.now()
+    for racer_id, standing in computed.items():
+        affected_classes.add(standing.soapbox_class)
+        current = existing.get(racer_id)
+        if current is None:
+            to_create.append(standing)
+        elif any(getattr(current, field) != getattr(standing, field) for field in STANDING_FIELDS):
+            for field in STANDING_FIELDS:
+                setattr(current, field, getattr(standing, field))
+            # bulk_update setzt auto_now nicht selbst
+            current.updated_at = now
+            to_update.append(current)
+
+    Standing.objects.bulk_create(to_create)
+    Standing.objects.bulk_update(to_update, STANDING_FIELDS + ['updated_at'])
+
+    changed = bool(to_create or to_update)
+    for soapbox_class in affected_classes:
+        changed |= rerank_class(soapbox_class)
+    # Eine Versionserhöhung für alle Klassen statt einer pro Klasse
+    if changed:
+        bump_versions(STANDINGS)
+
+
+def rerank_class(soapbox_class):
+    """
+    Vergibt die Ränge einer Klasse neu (gleiche Zeit = gleicher Rang) und
+    schreibt nur die Zeilen zurück, deren Rang sich tatsächlich geändert hat.
+    Gibt zurück, ob sich ein Rang geändert hat; die Version erhöht der Aufrufer.
+    """
+    rows = Standing.objects.filter(soapbox_class=soapbox_class).order_by(
+        models.F('best_time_seconds').asc(nulls_last=True), 'racer_id'
+    ).only('racer_id', 'best_time_seconds', 'rank')
+
+    changed = []
+    previous_time, previous_rank = None, None
+    for position, row in enumerate(rows, start=1):
+        if row.best_time_seconds is None:
+            new_rank = None
+        elif row.best_time_seconds == previous_time:
+            new_rank = previous_rank
+        else:
+            new_rank = position
+        previous_time, previous_rank = row.best_time_seconds, new_rank
+
+        if row.rank != new_rank:
+            row.rank = new_rank
+            changed.append(row)
+
+    Standing.objects.bulk_update(changed, ['rank'])
+    return bool(changed)
+
+
+def rebuild_all_standings():
+    refresh_standings(Racer.objects.values_list('id', flat=True))
@@ -1,4 +1,4 @@
-from django.test import TestCase
+from django.test import TestCase, RequestFactory
 from django.contrib.admin.sites import AdminSite
 from django.urls import reverse
 from django.utils.html import format_html
@@ -33,6 +33,12 @@ class AdminMethodTests(TestCase):
         racer_no_time = Racer.objects.create(first_name="NoTime", last_name="Admin", soapbox_class='XKL')
         self.assertEqual(racer_admin.best_time_display(racer_no_time), "N/A")
 
+    def test_racer_admin_best_time_display_uses_annotation(self):
+        racer_admin = RacerAdmin(model=Racer, admin_site=self.site)
+        racer = racer_admin.get_queryset(RequestFactory().get('/')).get(pk=self.racer1.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(racer_admin.best_time_display(racer), "29.500s")
+
     def test_racerun_admin_run_type_display(self):
         racerun_admin = RaceRunAdmin(model=RaceRun, admin_site=self.site)
         self.assertEqual(racerun_admin.run_type_display(self.run1), RaceRun.RaceRunType.HEAT_1.label)
@@ -43,4 +49,10 @@ class AdminMethodTests(TestCase):
         # Wir müssen hier den String-Output der format_html Funktion vergleichen
         generated_link_str = str(racerun_admin.racer_link(self.run1))
         self.assertIn(expected_url, generated_link_str)
-        self.assertIn(self.racer1.full_name, generated_link_str)
\ No newline at end of file
+        self.assertIn(self.racer1.full_name, generated_link_str)
+
+    def test_team_admin_racer_count_uses_annotation(self):
+        team_admin = TeamAdmin(model=Team, admin_site=self.site)
+        team = team_admin.get_queryset(RequestFactory().get('/')).get(pk=self.team1.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(team_admin.racer_count(team), 2)
@@ -0,0 +1,82 @@
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITransactionTestCase
+from race_core.models import Team, Racer, RaceRun, Standing
+from .test_api_base import APITestsBase
+
+
+class ConditionalGetAPITests(APITestsBase):
+    def test_list_returns_etag_and_not_modified(self):
+        self.unauthenticate()
+        url = reverse('team-list')
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response['ETag']
+        self.assertIn('no-cache', response['Cache-Control'])
+
+        with self.assertNumQueries(1):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_write_changes_etag(self):
+        self.unauthenticate()
+        url = reverse('racer-list')
+        etag = self.client.get(url)['ETag']
+
+        with self.captureOnCommitCallbacks(execute=True):
+            RaceRun.objects.create(racer=self.racer1, run_type='H1', run_identifier=1, time_in_seconds="41.000")
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_unrelated_write_keeps_etag(self):
+        self.unauthenticate()
+        url = reverse('soapbox-list')
+        etag = self.client.get(url)['ETag']
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Team.objects.create(name="Unrelated Team")
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_retrieve_supports_if_modified_since(self):
+        self.unauthenticate()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.team1.save()
+        url = reverse('team-detail', kwargs={'pk': self.team1.pk})
+        response = self.client.get(url)
+        self.assertIn('Last-Modified', response)
+
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+
+class WritesOutsideTransactionTests(APITransactionTestCase):
+    """Ohne umschließende Transaktion führt on_commit den Nachlauf sofort aus; TestCase kann das nicht abbilden."""
+
+    def setUp(self):
+        admin = get_user_model().objects.create_superuser(username='txadmin', password='txpassword123')
+        self.client.force_authenticate(admin)
+
+    def test_team_write_changes_etag(self):
+        url = reverse('team-list')
+        etag = self.client.get(url)['ETag']
+
+        response = self.client.post(url, {'name': "Team ohne Transaktion"}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_racer_write_creates_standing(self):
+        response = self.client.post(reverse('racer-list'), {
+            'first_name': "Ohne", 'last_name': "Transaktion", 'soapbox_class': 'LRJ', 'start_number': "TX1",
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+        racer = Racer.objects.get(start_number="TX1")
+        self.assertTrue(Standing.objects.filter(racer=racer, soapbox_class='LRJ').exists())
@@ -0,0 +1,96 @@
+import asyncio
+from unittest import mock
+from asgiref.sync import iscoroutinefunction
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from race_core.middleware import AsyncCapableWhiteNoiseMiddleware
+from race_core.models import Racer, RaceRun
+from race_core.response_cache import get_response_cache
+from race_core.standings import rebuild_all_standings
+from .test_api_base import APITestsBase
+
+
+class PublicListTests(APITestsBase):
+    def setUp(self):
+        super().setUp()
+        racer2 = Racer.objects.create(first_name="Public", last_name="Zwei", soapbox_class='LRJ', start_number="PB2")
+        RaceRun.objects.create(racer=racer2, run_type='H1', run_identifier=1, time_in_seconds="41.100")
+        RaceRun.objects.create(racer=self.racer1, run_type='H1', run_identifier=1, time_in_seconds="42.200")
+        rebuild_all_standings()
+
+    def assertSameAsViewSet(self, public_name, viewset_name, query=''):
+        public = self.client.get(reverse(public_name) + query)
+        sync = self.client.get(reverse(viewset_name) + query, HTTP_ACCEPT='application/json')
+        self.assertEqual(public.status_code, status.HTTP_200_OK)
+        self.assertEqual(public.content, sync.content)
+        self.assertEqual(public['ETag'], sync['ETag'])
+        return public
+
+    def test_lists_match_viewset_output(self):
+        self.assertSameAsViewSet('public-standing-list', 'standing-list')
+        self.assertSameAsViewSet('public-racer-list', 'racer-list')
+        self.assertSameAsViewSet('public-racerun-list', 'racerun-list')
+
+    def test_filters_and_fields_are_applied(self):
+        response = self.assertSameAsViewSet('public-standing-list', 'standing-list', '?class=LRJ')
+        self.assertEqual(len(response.json()), 1)
+        self.assertSameAsViewSet('public-racer-list', 'racer-list', '?fields=id,full_name&soapbox_class=XKL')
+        # Nur die verschachtelten Läufe, ohne Bestzeit-Annotation
+        response = self.assertSameAsViewSet('public-racer-list', 'racer-list', '?fields=id,races')
+        self.assertEqual(set(response.json()[0]), {'id', 'races'})
+        self.assertSameAsViewSet('public-racerun-list', 'racerun-list', f'?racer={self.racer1.pk}')
+
+    def test_invalid_parameters_return_400(self):
+        self.assertEqual(self.client.get(reverse('public-standing-list') + '?class=XYZ').status_code, 400)
+        self.assertEqual(self.client.get(reverse('public-racer-list') + '?fields=nope').status_code, 400)
+
+    def test_conditional_get_returns_304(self):
+        etag = self.client.get(reverse('public-racer-list'))['ETag']
+        response = self.client.get(reverse('public-racer-list'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_only_get_is_allowed(self):
+        self.authenticate_as_admin()
+        response = self.client.post(reverse('public-racer-list'), {})
+        self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+    @override_settings(RESPONSE_CACHE_ENABLED=True)
+    def test_served_from_response_cache(self):
+        get_response_cache().clear()
+        first = self.client.get(reverse('public-standing-list'))
+        with self.assertNumQueries(0):
+            second = self.client.get(reverse('public-standing-list'))
+        self.assertEqual(first.content, second.content)
+
+    async def test_async_client(self):
+        response = await self.async_client.get(reverse('public-racerun-list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.json()), 3)
+
+    async def test_rendering_runs_off_the_event_loop(self):
+        on_event_loop = []
+        render = JSONRenderer.render
+
+        def recording_render(renderer, *args, **kwargs):
+            try:
+                asyncio.get_running_loop()
+                on_event_loop.append(True)
+            except RuntimeError:
+                on_event_loop.append(False)
+            return render(renderer, *args, **kwargs)
+
+        with mock.patch.object(JSONRenderer, 'render', recording_render):
+            response = await self.async_client.get(reverse('public-racer-list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(on_event_loop, [False])
+
+
+class AsyncCapableWhiteNoiseMiddlewareTests(APITestsBase):
+    def test_async_chain_stays_async(self):
+        async def get_response(request):
+            return None
+
+        self.assertTrue(iscoroutinefunction(AsyncCapableWhiteNoiseMiddleware(get_response)))
+        self.assertFalse(iscoroutinefunction(AsyncCapableWhiteNoiseMiddleware(lambda request: None)))
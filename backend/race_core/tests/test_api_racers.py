@@ -1,6 +1,8 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework import status
-from race_core.models import Racer, Team
+from race_core.models import Racer, Team, RaceRun
 from .test_api_base import APITestsBase
 
 class RacerAPITests(APITestsBase):
@@ -43,3 +45,42 @@ class RacerAPITests(APITestsBase):
         self.assertTrue(len(response.data) >= 1)
         for racer_data in response.data:
             self.assertEqual(racer_data['soapbox_class'], Racer.SoapboxClass.X_KLASSE.value)
+
+    def test_list_racers_query_count_is_constant(self):
+        self.unauthenticate()
+        url = reverse('racer-list')
+
+        def create_racers(count, offset):
+            for i in range(offset, offset + count):
+                racer = Racer.objects.create(
+                    first_name=f"Bulk{i}", last_name="Racer", team=self.team1,
+                    soapbox_class='LRJ', start_number=f"QC{i}"
+                )
+                RaceRun.objects.create(racer=racer, run_type='H1', run_identifier=1, time_in_seconds="40.000")
+                RaceRun.objects.create(racer=racer, run_type='H2', run_identifier=1, time_in_seconds="39.000")
+
+        create_racers(3, 0)
+        with CaptureQueriesContext(connection) as small:
+            self.client.get(url)
+        create_racers(20, 3)
+        with CaptureQueriesContext(connection) as large:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(small), len(large))
+        racer_data = next(r for r in response.data if r['start_number'] == 'QC0')
+        self.assertEqual(racer_data['best_time_seconds'], "39.000")
+
+    def test_sparse_fieldset_skips_nested_races(self):
+        self.unauthenticate()
+        url = reverse('racer-list')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, {'fields': 'start_number,full_name,soapbox_class_display'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(set(response.data[0]), {'start_number', 'full_name', 'soapbox_class_display'})
+        self.assertFalse(any('race_core_racerun' in q['sql'] for q in queries))
+
+    def test_sparse_fieldset_unknown_field_returns_400(self):
+        self.unauthenticate()
+        response = self.client.get(reverse('racer-list'), {'fields': 'start_number,password'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('fields', response.data)
@@ -1,3 +1,6 @@
+import datetime
+
+from django.utils import timezone
 from django.urls import reverse
 from rest_framework import status
 from race_core.models import RaceRun, Racer
@@ -105,4 +108,29 @@ class RaceRunAPITests(APITestsBase):
         self.assertTrue(len(response.data) >= 1)
         for run_data in response.data:
             racer = Racer.objects.get(pk=run_data['racer'])
-            self.assertEqual(racer.team, self.team1)
\ No newline at end of file
+            self.assertEqual(racer.team, self.team1)
+
+    def test_cursor_pagination_is_opt_in_and_ordered_by_recorded_at(self):
+        self.unauthenticate()
+        start = timezone.now() - datetime.timedelta(hours=1)
+        for i in range(5):
+            RaceRun.objects.create(racer=self.racer1, run_type='H1', run_identifier=i + 1,
+                                   time_in_seconds="40.000", recorded_at=start + datetime.timedelta(minutes=i))
+        url = reverse('racerun-list')
+        self.assertIsInstance(self.client.get(url).data, list)
+
+        seen, next_url = [], url + '?page_size=2'
+        while next_url:
+            response = self.client.get(next_url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertLessEqual(len(response.data['results']), 2)
+            seen.extend(run['id'] for run in response.data['results'])
+            next_url = response.data['next']
+        expected = list(RaceRun.objects.order_by('recorded_at', 'id').values_list('id', flat=True))
+        self.assertEqual(seen, expected)
+
+    def test_sparse_fieldset_on_raceruns(self):
+        self.unauthenticate()
+        response = self.client.get(reverse('racerun-list'), {'fields': 'id,time_in_seconds'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(set(response.data[0]), {'id', 'time_in_seconds'})
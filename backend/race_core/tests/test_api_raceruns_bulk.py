@@ -0,0 +1,182 @@
+from unittest import mock
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from race_core.bulk import RaceRunBulkProcessor, RaceRunReplaceProcessor
+from race_core.models import Racer, RaceRun, Standing
+from .test_api_base import APITestsBase
+
+
+class RaceRunBulkAPITests(APITestsBase):
+    def setUp(self):
+        super().setUp()
+        self.url = reverse('racerun-bulk')
+        self.racer2 = Racer.objects.create(first_name="Bulk", last_name="Two", soapbox_class='LRJ', start_number="B2")
+
+    def test_bulk_requires_authentication(self):
+        self.unauthenticate()
+        response = self.client.post(self.url, {'upserts': []}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_bulk_upserts_and_deletes_in_one_request(self):
+        self.authenticate_as_admin()
+        payload = {
+            'upserts': [
+                {'ref': 'a', 'racer_start_number': 'b2', 'run_type': 'H1', 'run_identifier': 1, 'time_in_seconds': '41.100'},
+                {'ref': 'b', 'racer_start_number': 'API_B1', 'run_type': 'H1', 'time_in_seconds': '39.900'},
+            ],
+            'deletes': [
+                {'ref': 'c', 'racer_start_number': 'API_B1', 'run_type': 'PR', 'run_identifier': 1},
+                {'ref': 'd', 'racer_start_number': 'API_B1', 'run_type': 'H2', 'run_identifier': 1},
+            ],
+        }
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(self.url, payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        self.assertEqual(
+            (response.data['created'], response.data['deleted'], response.data['not_found']), (2, 1, 1)
+        )
+        self.assertEqual([r['ref'] for r in response.data['results']], ['a', 'b', 'c', 'd'])
+        self.assertFalse(RaceRun.objects.filter(pk=self.racerun1.pk).exists())
+        self.assertEqual(str(RaceRun.objects.get(racer=self.racer2, run_type='H1').time_in_seconds), "41.100")
+        self.assertEqual(Standing.objects.get(racer=self.racer2).rank, 1)
+
+    def test_bulk_updates_existing_run_by_key(self):
+        self.authenticate_as_admin()
+        payload = {'upserts': [
+            {'racer_start_number': 'API_B1', 'run_type': 'PR', 'run_identifier': 1, 'time_in_seconds': '65.000'},
+            {'racer_start_number': 'API_B1', 'run_type': 'PR', 'run_identifier': 1, 'time_in_seconds': '65.000'},
+        ]}
+        response = self.client.post(self.url, payload, format='json')
+        self.assertEqual(response.data['updated'], 1)
+        self.assertEqual(response.data['failed'], 1)
+        self.assertEqual(response.data['results'][0]['id'], self.racerun1.pk)
+        self.racerun1.refresh_from_db()
+        self.assertEqual(str(self.racerun1.time_in_seconds), "65.000")
+
+        response = self.client.post(self.url, {'upserts': payload['upserts'][:1]}, format='json')
+        self.assertEqual(response.data['unchanged'], 1)
+
+    def test_bulk_delete_by_server_id(self):
+        self.authenticate_as_admin()
+        payload = {'deletes': [
+            {'id': self.racerun1.pk, 'racer_start_number': 'API_B1', 'run_type': 'H1', 'run_identifier': 9},
+        ]}
+        response = self.client.post(self.url, payload, format='json')
+        self.assertEqual(response.data['deleted'], 1)
+        self.assertFalse(RaceRun.objects.filter(pk=self.racerun1.pk).exists())
+
+    def test_bulk_reports_invalid_items_and_applies_valid_ones(self):
+        self.authenticate_as_admin()
+        payload = {'upserts': [
+            {'racer_start_number': 'UNKNOWN', 'run_type': 'H1', 'time_in_seconds': '40.000'},
+            {'racer_start_number': 'B2', 'run_type': 'XX'},
+            {'racer_start_number': 'B2', 'run_type': 'H2', 'disqualified': True, 'time_in_seconds': '40.000'},
+            {'racer_start_number': 'B2', 'run_type': 'H2', 'disqualified': True},
+        ]}
+        response = self.client.post(self.url, payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        statuses = [r['status'] for r in response.data['results']]
+        self.assertEqual(statuses, ['invalid', 'invalid', 'invalid', 'created'])
+        self.assertIn('racer_start_number', response.data['results'][0]['errors'])
+        self.assertTrue(RaceRun.objects.get(racer=self.racer2, run_type='H2').disqualified)
+
+    def test_bulk_conflicting_with_concurrent_insert_returns_409(self):
+        self.authenticate_as_admin()
+        plan_upserts = RaceRunBulkProcessor._plan_upserts
+
+        def plan_then_insert(processor, upserts):
+            planned = plan_upserts(processor, upserts)
+            # Ein anderer Client legt denselben Lauf an, nachdem die vorhandenen Läufe gelesen wurden
+            RaceRun.objects.create(racer=self.racer1, run_type='H1', run_identifier=1, time_in_seconds="37.000")
+            return planned
+
+        payload = {'upserts': [{'racer_start_number': 'API_B1', 'run_type': 'H1', 'time_in_seconds': '38.000'}]}
+        with mock.patch.object(RaceRunBulkProcessor, '_plan_upserts', plan_then_insert):
+            response = self.client.post(self.url, payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT, response.data)
+        self.assertFalse(RaceRun.objects.filter(run_type='H1').exists())
+
+    def test_bulk_query_count_is_independent_of_batch_size(self):
+        self.authenticate_as_admin()
+        racers = [
+            Racer.objects.create(first_name="Many", last_name=str(i), soapbox_class='HRS', start_number=f"M{i}")
+            for i in range(30)
+        ]
+
+        def payload(racer_slice, run_type):
+            return {'upserts': [
+                {'racer_start_number': r.start_number, 'run_type': run_type, 'time_in_seconds': '50.000'}
+                for r in racer_slice
+            ]}
+
+        self.client.post(self.url, payload(racers[:1], 'PR'), format='json')
+        with CaptureQueriesContext(connection) as small:
+            self.client.post(self.url, payload(racers[:2], 'H1'), format='json')
+        with CaptureQueriesContext(connection) as large:
+            response = self.client.post(self.url, payload(racers, 'H2'), format='json')
+        self.assertEqual(response.data['created'], 30)
+        self.assertEqual(len(small), len(large))
+
+
+class RaceRunReplaceAPITests(APITestsBase):
+    def setUp(self):
+        super().setUp()
+        self.url = reverse('racerun-replace')
+        self.racer2 = Racer.objects.create(first_name="Replace", last_name="Two", soapbox_class='LRJ', start_number="R2")
+        self.keep = RaceRun.objects.create(racer=self.racer2, run_type='H1', run_identifier=1, time_in_seconds="40.000")
+        self.stale = RaceRun.objects.create(racer=self.racer2, run_type='H2', run_identifier=1, time_in_seconds="41.000")
+
+    def test_replace_requires_authentication(self):
+        self.unauthenticate()
+        response = self.client.post(self.url, {'runs': []}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_replace_diffs_dataset_against_database(self):
+        self.authenticate_as_admin()
+        payload = {'runs': [
+            {'ref': 'keep', 'racer_start_number': 'R2', 'run_type': 'H1', 'run_identifier': 1, 'time_in_seconds': '39.500'},
+            {'ref': 'new', 'racer_start_number': 'API_B1', 'run_type': 'H1', 'time_in_seconds': '38.000'},
+        ]}
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(self.url, payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        self.assertEqual((response.data['created'], response.data['updated'], response.data['deleted']), (1, 1, 2))
+        self.assertEqual(
+            set(RaceRun.objects.values_list('racer__start_number', 'run_type')), {('R2', 'H1'), ('API_B1', 'H1')}
+        )
+        self.keep.refresh_from_db()
+        self.assertEqual(str(self.keep.time_in_seconds), "39.500")
+        self.assertEqual(Standing.objects.get(racer=self.racer2).best_time_seconds, self.keep.time_in_seconds)
+
+    def test_replace_with_invalid_item_changes_nothing(self):
+        self.authenticate_as_admin()
+        payload = {'runs': [
+            {'ref': 'ok', 'racer_start_number': 'R2', 'run_type': 'H1', 'run_identifier': 1, 'time_in_seconds': '39.500'},
+            {'ref': 'bad', 'racer_start_number': 'UNKNOWN', 'run_type': 'H1'},
+        ]}
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(self.url, payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, response.data)
+        self.assertEqual(response.data['failed'], 1)
+        self.assertEqual(RaceRun.objects.count(), 3)
+        self.keep.refresh_from_db()
+        self.assertEqual(str(self.keep.time_in_seconds), "40.000")
+
+    def test_replace_conflicting_with_concurrent_insert_returns_409(self):
+        self.authenticate_as_admin()
+        plan_upserts = RaceRunReplaceProcessor._plan_upserts
+
+        def plan_then_insert(processor, upserts):
+            planned = plan_upserts(processor, upserts)
+            # Ein anderer Client legt denselben Lauf an, nachdem der Bestand gelesen wurde
+            RaceRun.objects.create(racer=self.racer1, run_type='H1', run_identifier=1, time_in_seconds="37.000")
+            return planned
+
+        payload = {'runs': [{'racer_start_number': 'API_B1', 'run_type': 'H1', 'time_in_seconds': '38.000'}]}
+        with mock.patch.object(RaceRunReplaceProcessor, '_plan_upserts', plan_then_insert):
+            response = self.client.post(self.url, payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT, response.data)
+        self.assertEqual(RaceRun.objects.count(), 3)
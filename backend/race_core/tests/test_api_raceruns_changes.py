@@ -0,0 +1,105 @@
+import datetime
+
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from race_core.changes import prune_race_run_tombstones
+from race_core.models import RaceRun, RaceRunTombstone
+from .test_api_base import APITestsBase
+
+
+class RaceRunChangesAPITests(APITestsBase):
+    def setUp(self):
+        super().setUp()
+        self.url = reverse('racerun-changes')
+
+    def current_token(self):
+        return self.client.get(self.url).data['token']
+
+    def test_without_since_returns_full_snapshot(self):
+        self.unauthenticate()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.data['full'])
+        self.assertEqual([run['id'] for run in response.data['results']], [self.racerun1.pk])
+        self.assertEqual(response.data['deleted'], [])
+
+    def test_since_returns_only_changed_and_deleted_runs(self):
+        untouched = RaceRun.objects.create(racer=self.racer1, run_type='H1', run_identifier=1, time_in_seconds="40.000")
+        doomed = RaceRun.objects.create(racer=self.racer1, run_type='H2', run_identifier=1, time_in_seconds="41.000")
+        token = self.current_token()
+
+        self.racerun1.notes = "geändert"
+        self.racerun1.save()
+        doomed_id = doomed.pk
+        doomed.delete()
+
+        response = self.client.get(self.url, {'since': token})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(response.data['full'])
+        self.assertEqual([run['id'] for run in response.data['results']], [self.racerun1.pk])
+        self.assertEqual(response.data['deleted'], [doomed_id])
+        self.assertNotIn(untouched.pk, [run['id'] for run in response.data['results']])
+        self.assertGreater(int(response.data['token']), int(token))
+
+    def test_bulk_writes_advance_sequence_and_record_tombstones(self):
+        self.authenticate_as_admin()
+        token = self.current_token()
+        response = self.client.post(reverse('racerun-bulk'), {
+            'upserts': [{'racer_start_number': 'API_B1', 'run_type': 'PR', 'run_identifier': 1, 'time_in_seconds': '60.000'}],
+        }, format='json')
+        self.assertEqual(response.data['updated'], 1, response.data)
+        response = self.client.get(self.url, {'since': token})
+        self.assertEqual([run['id'] for run in response.data['results']], [self.racerun1.pk])
+
+        response = self.client.post(reverse('racerun-replace'), {'runs': []}, format='json')
+        self.assertEqual(response.data['deleted'], 1, response.data)
+
+        response = self.client.get(self.url, {'since': token})
+        self.assertEqual(response.data['results'], [])
+        self.assertEqual(response.data['deleted'], [self.racerun1.pk])
+
+    def test_sequence_ignores_wall_clock(self):
+        token = self.current_token()
+        # Ein zurückgestellter Zeitstempel darf die Änderung nicht aus dem Feed fallen lassen
+        self.racerun1.save()
+        RaceRun.objects.filter(pk=self.racerun1.pk).update(updated_at=timezone.now() - datetime.timedelta(days=1))
+        response = self.client.get(self.url, {'since': token})
+        self.assertEqual([run['id'] for run in response.data['results']], [self.racerun1.pk])
+
+    @override_settings(RACE_RUN_TOMBSTONE_RETENTION_HOURS=1)
+    def test_token_before_pruned_tombstones_returns_full_snapshot(self):
+        doomed = RaceRun.objects.create(racer=self.racer1, run_type='H2', run_identifier=1, time_in_seconds="41.000")
+        token = self.current_token()
+        doomed.delete()
+        after_delete = self.current_token()
+        RaceRunTombstone.objects.update(deleted_at=timezone.now() - datetime.timedelta(hours=2))
+        self.assertEqual(prune_race_run_tombstones(), 1)
+
+        response = self.client.get(self.url, {'since': token})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.data['full'])
+        self.assertEqual([run['id'] for run in response.data['results']], [self.racerun1.pk])
+        self.assertEqual(response.data['deleted'], [])
+        self.assertFalse(self.client.get(self.url, {'since': after_delete}).data['full'])
+
+    def test_unknown_token_returns_full_snapshot(self):
+        # z.B. ein Zeitstempel-Token aus einer älteren Version oder ein Token vor einem Datenbank-Reset
+        response = self.client.get(self.url, {'since': str(int(self.current_token()) + 1000)})
+        self.assertTrue(response.data['full'])
+
+    @override_settings(RACE_RUN_TOMBSTONE_RETENTION_HOURS=1)
+    def test_deletions_prune_expired_tombstones(self):
+        expired = RaceRunTombstone.objects.create(race_run_id=999, racer_id=self.racer1.pk, run_type='H1',
+                                                  run_identifier=1)
+        RaceRunTombstone.objects.filter(pk=expired.pk).update(deleted_at=timezone.now() - datetime.timedelta(hours=2))
+        run_id = self.racerun1.pk
+        with self.captureOnCommitCallbacks(execute=True):
+            self.racerun1.delete()
+        self.assertEqual(list(RaceRunTombstone.objects.values_list('race_run_id', flat=True)), [run_id])
+
+    def test_invalid_token_returns_400(self):
+        response = self.client.get(self.url, {'since': 'gestern'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('since', response.data)
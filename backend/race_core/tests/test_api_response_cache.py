@@ -0,0 +1,66 @@
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from race_core.models import Team, Soapbox, RaceRun
+from race_core.response_cache import get_response_cache
+from .test_api_base import APITestsBase
+
+
+@override_settings(RESPONSE_CACHE_ENABLED=True)
+class ResponseCacheAPITests(APITestsBase):
+    def setUp(self):
+        super().setUp()
+        get_response_cache().clear()
+        self.unauthenticate()
+
+    def test_repeat_read_is_served_without_database(self):
+        url = reverse('team-list')
+        first = self.client.get(url)
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+
+        with self.assertNumQueries(0):
+            second = self.client.get(url)
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second['ETag'], first['ETag'])
+
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_query_string_is_part_of_the_key(self):
+        url = reverse('racer-list')
+        self.client.get(url)
+        with self.assertNumQueries(0):
+            self.client.get(url)
+        response = self.client.get(url, {'fields': 'start_number'})
+        self.assertEqual(set(response.data[0]), {'start_number'})
+
+    def test_related_write_invalidates_and_unrelated_write_does_not(self):
+        racers_url, soapboxes_url = reverse('racer-list'), reverse('soapbox-list')
+        self.client.get(racers_url)
+        self.client.get(soapboxes_url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            RaceRun.objects.create(racer=self.racer1, run_type='H1', run_identifier=1, time_in_seconds="41.000")
+
+        response = self.client.get(racers_url)
+        racer = next(r for r in response.data if r['id'] == self.racer1.pk)
+        self.assertEqual(racer['best_time_seconds'], "41.000")
+        with self.assertNumQueries(0):
+            self.client.get(soapboxes_url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Soapbox.objects.create(name="Cache Kiste")
+        response = self.client.get(soapboxes_url)
+        self.assertIn("Cache Kiste", [s['name'] for s in response.data])
+
+    def test_disabled_cache_always_queries(self):
+        url = reverse('team-list')
+        self.client.get(url)
+        with override_settings(RESPONSE_CACHE_ENABLED=False):
+            with self.assertNumQueries(3):
+                self.client.get(url)
+        with self.captureOnCommitCallbacks(execute=True):
+            Team.objects.create(name="Neues Team")
+        self.assertIn("Neues Team", [t['name'] for t in self.client.get(url).data])
@@ -1,6 +1,6 @@
 from django.urls import reverse
 from rest_framework import status
-from race_core.models import Team
+from race_core.models import Team, Racer
 from .test_api_base import APITestsBase # Importiere die Basisklasse
 
 class TeamAPITests(APITestsBase):
@@ -69,4 +69,18 @@ class TeamAPITests(APITestsBase):
         url = reverse('team-list')
         data = {"name": "Normal User Created Team"}
         response = self.client.post(url, data, format='json')
-        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
\ No newline at end of file
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+
+    def test_list_teams_runs_constant_number_of_queries(self):
+        self.unauthenticate()
+        for i in range(100):
+            team = Team.objects.create(name=f"Query Team {i:03d}")
+            Racer.objects.create(first_name="Q", last_name=f"Racer{i}", team=team, soapbox_class='LRJ',
+                                 start_number=f"QT{i}")
+        # Versionsabfrage für den ETag, Teams mit Anzahl, Prefetch der Fahrer
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('team-list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        team_data = next(t for t in response.data if t['name'] == "Query Team 042")
+        self.assertEqual(team_data['racer_count'], 1)
+        self.assertEqual(team_data['racers_info'][0]['start_number'], "QT42")
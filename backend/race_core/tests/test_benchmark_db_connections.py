@@ -0,0 +1,18 @@
+import io
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TransactionTestCase
+
+
+class BenchmarkDbConnectionsCommandTests(TransactionTestCase):
+    def test_reports_both_modes_and_restores_settings(self):
+        conn_max_age = connection.settings_dict['CONN_MAX_AGE']
+        out = io.StringIO()
+
+        call_command('benchmark_db_connections', '--requests', '5', '--concurrency', '1', stdout=out)
+
+        output = out.getvalue()
+        self.assertIn('fresh', output)
+        self.assertIn('ms per request', output)
+        self.assertEqual(connection.settings_dict['CONN_MAX_AGE'], conn_max_age)
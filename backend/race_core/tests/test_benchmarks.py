@@ -0,0 +1,161 @@
+import json
+import os
+import time
+
+from django.db import connection
+from django.test import TestCase, tag
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework.renderers import JSONRenderer
+from race_core.compact_serializers import CompactRacerListSerializer, CompactRaceRunListSerializer
+from race_core.models import Team, Soapbox, Racer, RaceRun, Standing
+from race_core.seeding import seed_event
+from race_core.serializers import (
+    TeamSerializer, SoapboxSerializer, RacerSerializer, RaceRunSerializer, StandingSerializer,
+)
+
+SCALES = (10, 100, 1000)
+
+# (Name, Funktion: Testfall -> URL)
+READ_ENDPOINTS = [
+    ('team-list', lambda t: reverse('team-list')),
+    ('team-detail', lambda t: reverse('team-detail', args=[t.first(Team)])),
+    ('soapbox-list', lambda t: reverse('soapbox-list')),
+    ('soapbox-detail', lambda t: reverse('soapbox-detail', args=[t.first(Soapbox)])),
+    ('racer-list', lambda t: reverse('racer-list')),
+    ('racer-list-paginated', lambda t: reverse('racer-list') + '?page_size=1000'),
+    ('racer-detail', lambda t: reverse('racer-detail', args=[t.first(Racer)])),
+    ('racerun-list', lambda t: reverse('racerun-list')),
+    ('racerun-list-paginated', lambda t: reverse('racerun-list') + '?page_size=1000'),
+    ('racerun-detail', lambda t: reverse('racerun-detail', args=[t.first(RaceRun)])),
+    ('racerun-changes', lambda t: reverse('racerun-changes') + '?since=0'),
+    ('standing-list', lambda t: reverse('standing-list')),
+    ('standing-detail', lambda t: reverse('standing-detail', args=[t.first(Standing)])),
+    ('export-raceruns-csv', lambda t: reverse('export-raceruns-csv')),
+    ('export-results-ndjson', lambda t: reverse('export-results-ndjson')),
+]
+
+# (Serializer, Queryset wie im zugehörigen ViewSet)
+SERIALIZERS = [
+    (TeamSerializer, lambda: Team.objects.with_racer_summary()),
+    (SoapboxSerializer, lambda: Soapbox.objects.all()),
+    (RacerSerializer, lambda: Racer.objects.select_related('team', 'soapbox').with_best_time().prefetch_related('races')),
+    (RaceRunSerializer, lambda: RaceRun.objects.select_related('racer', 'racer__team')),
+    (StandingSerializer, lambda: Standing.objects.select_related('racer', 'racer__team', 'racer__soapbox')),
+]
+
+# (Compact-Serializer, DRF-Serializer, Queryset) für den Vergleich der Listen-Fast-Paths
+COMPACT_SERIALIZERS = [
+    (CompactRacerListSerializer, RacerSerializer, SERIALIZERS[2][1]),
+    (CompactRaceRunListSerializer, RaceRunSerializer, SERIALIZERS[3][1]),
+]
+
+
+@tag('benchmark')
+class QueryCountBenchmarkTests(TestCase):
+    """
+    Misst SQL-Queries und Laufzeit aller Lese-Endpoints, der Bulk-Schreibpfade und der Read-Serializer
+    bei 10/100/1000 Racern (je drei Läufe). Schlägt fehl, sobald die Query-Anzahl mit der Datenmenge wächst
+    (N+1). Mit BENCHMARK_REPORT=<Datei> werden die Messwerte zusätzlich als JSON geschrieben.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.report = {}
+
+    @classmethod
+    def tearDownClass(cls):
+        report_path = os.environ.get('BENCHMARK_REPORT')
+        if report_path:
+            with open(report_path, 'w', encoding='utf-8') as f:
+                json.dump(cls.report, f, indent=2, sort_keys=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def first(self, model):
+        return model.objects.order_by('pk').values_list('pk', flat=True).first()
+
+    def seed(self, racers):
+        with self.captureOnCommitCallbacks(execute=True):
+            seed_event(racers=racers, runs_per_racer=3, seed=racers)
+
+    def measure(self, name, scale, func):
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            result = func()
+            elapsed = time.perf_counter() - start
+        self.report.setdefault(name, {})[scale] = {'queries': len(queries), 'ms': round(elapsed * 1000, 2)}
+        return result
+
+    def assertQueriesDoNotScale(self, names, max_per_row=0):
+        """
+        Vergleicht kleinste und größte Messung: mehr als `max_per_row` zusätzliche Queries je
+        zusätzlicher Zeile gelten als N+1.
+        """
+        smallest, largest = SCALES[0], SCALES[-1]
+        for name in names:
+            with self.subTest(name):
+                counts = {scale: entry['queries'] for scale, entry in self.report[name].items()}
+                per_row = (counts[largest] - counts[smallest]) / (largest - smallest)
+                self.assertLessEqual(per_row, max_per_row, f"{name}: query count grows with rows: {counts}")
+
+    def get(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, url)
+        if response.streaming:
+            b''.join(response.streaming_content)
+        return response
+
+    def test_read_endpoints(self):
+        for scale in SCALES:
+            self.seed(scale)
+            for name, url in READ_ENDPOINTS:
+                self.measure(name, scale, lambda: self.get(url(self)))
+        self.assertQueriesDoNotScale(name for name, _ in READ_ENDPOINTS)
+
+    def test_read_serializers(self):
+        for scale in SCALES:
+            self.seed(scale)
+            for serializer_class, queryset in SERIALIZERS:
+                self.measure(serializer_class.__name__, scale, lambda: serializer_class(queryset(), many=True).data)
+        self.assertQueriesDoNotScale(serializer_class.__name__ for serializer_class, _ in SERIALIZERS)
+
+    def test_compact_serializers(self):
+        for scale in SCALES:
+            self.seed(scale)
+            for compact_class, serializer_class, queryset in COMPACT_SERIALIZERS:
+                expected = self.measure(serializer_class.__name__, scale,
+                                        lambda: JSONRenderer().render(serializer_class(queryset(), many=True).data))
+                compact = self.measure(compact_class.__name__, scale,
+                                       lambda: JSONRenderer().render(compact_class(queryset()).data))
+                self.assertEqual(compact, expected, compact_class.__name__)
+        self.assertQueriesDoNotScale(compact_class.__name__ for compact_class, _, _ in COMPACT_SERIALIZERS)
+
+    def test_bulk_writes(self):
+        from django.contrib.auth import get_user_model
+        self.client.force_authenticate(get_user_model().objects.create_user(username='bench', password='bench'))
+
+        for scale in SCALES:
+            self.seed(scale)
+            runs = list(RaceRun.objects.values('racer__start_number', 'run_type', 'run_identifier'))
+            upserts = [{
+                'racer_start_number': run['racer__start_number'],
+                'run_type': run['run_type'],
+                'run_identifier': run['run_identifier'],
+                'time_in_seconds': '42.000',
+            } for run in runs[:scale]]
+
+            def post(url, payload):
+                with self.captureOnCommitCallbacks(execute=True):
+                    response = self.client.post(url, payload, format='json')
+                self.assertEqual(response.status_code, 200, response.data)
+
+            self.measure('racerun-bulk', scale, lambda: post(reverse('racerun-bulk'), {'upserts': upserts}))
+            self.measure('racerun-replace', scale, lambda: post(reverse('racerun-replace'), {'runs': upserts}))
+        # bulk_update/DELETE werden datenbankseitig nach Parameterlimit gestückelt, pro Klasse wird neu
+        # gerankt; beides wächst nur in Blöcken, nicht pro Zeile
+        self.assertQueriesDoNotScale(['racerun-bulk', 'racerun-replace'], max_per_row=0.1)
@@ -0,0 +1,77 @@
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory
+from rest_framework.request import Request
+from race_core.compact_serializers import CompactRacerListSerializer, CompactRaceRunListSerializer
+from race_core.models import Team, Soapbox, Racer, RaceRun
+from race_core.serializers import RacerSerializer, RaceRunSerializer
+from .test_api_base import APITestsBase
+
+
+def racer_queryset():
+    return Racer.objects.select_related('team', 'soapbox').with_best_time().prefetch_related('races')
+
+
+def racerun_queryset():
+    return RaceRun.objects.select_related('racer', 'racer__team')
+
+
+class CompactSerializerTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        team = Team.objects.create(name="Compact Team")
+        soapbox = Soapbox.objects.create(name="Compact Kiste")
+        cls.racer = Racer.objects.create(
+            first_name="Kompakt", last_name="Eins", team=team, soapbox=soapbox,
+            soapbox_class=Racer.SoapboxClass.X_KLASSE, start_number="C1",
+        )
+        # Ohne Team, Seifenkiste und Läufe
+        Racer.objects.create(first_name="Kompakt", last_name="Zwei", start_number="C2")
+        RaceRun.objects.create(racer=cls.racer, run_type='H1', run_identifier=1, time_in_seconds="50.123")
+        RaceRun.objects.create(racer=cls.racer, run_type='H2', run_identifier=1, disqualified=True, notes="Pylone")
+        RaceRun.objects.create(racer=cls.racer, run_type='PR', run_identifier=2, time_in_seconds="49.000", notes="")
+
+    def render(self, data):
+        return JSONRenderer().render(data)
+
+    def context(self, query=''):
+        return {'request': Request(APIRequestFactory().get('/' + query))}
+
+    def test_racer_output_is_identical(self):
+        for query in ('', '?fields=id,full_name,races', '?fields=best_time_seconds,team_name,soapbox_class_display'):
+            with self.subTest(query):
+                context = self.context(query)
+                expected = RacerSerializer(racer_queryset(), many=True, context=context).data
+                compact = CompactRacerListSerializer(racer_queryset(), context=context).data
+                self.assertEqual(self.render(compact), self.render(expected))
+
+    def test_racerun_output_is_identical(self):
+        for query in ('', '?fields=id,time_in_seconds,racer_name,run_type_display'):
+            with self.subTest(query):
+                context = self.context(query)
+                expected = RaceRunSerializer(racerun_queryset(), many=True, context=context).data
+                compact = CompactRaceRunListSerializer(racerun_queryset(), context=context).data
+                self.assertEqual(self.render(compact), self.render(expected))
+
+    def test_nested_runs_use_one_query(self):
+        with self.assertNumQueries(2):
+            CompactRacerListSerializer(racer_queryset(), context=self.context()).data
+
+
+class CompactListViewTests(APITestsBase):
+    def test_list_uses_compact_serializer_without_pagination(self):
+        response = self.client.get(reverse('racer-list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsInstance(response.data, list)
+        self.assertEqual(response.data[0]['races'][0]['time_in_seconds'], '70.000')
+
+    def test_paginated_list_keeps_drf_serializer(self):
+        paginated = self.client.get(reverse('racerun-list') + '?page_size=10')
+        plain = self.client.get(reverse('racerun-list'))
+        self.assertEqual(paginated.json()['results'], plain.json())
+
+    def test_unknown_field_is_rejected(self):
+        response = self.client.get(reverse('racer-list') + '?fields=id,unknown')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,54 @@
+import csv
+import io
+import json
+
+from django.urls import reverse
+from rest_framework import status
+from race_core.models import Racer, RaceRun
+from race_core.standings import rebuild_all_standings
+from .test_api_base import APITestsBase
+
+
+class ExportTests(APITestsBase):
+    def setUp(self):
+        super().setUp()
+        self.unauthenticate()
+        self.racer2 = Racer.objects.create(first_name="Export", last_name="Zwei, Komma", soapbox_class='XKL',
+                                           start_number="EX2")
+        RaceRun.objects.create(racer=self.racer1, run_type='H1', run_identifier=1, time_in_seconds="41.250")
+        RaceRun.objects.create(racer=self.racer2, run_type='H1', run_identifier=1, time_in_seconds="40.500")
+        rebuild_all_standings()
+
+    def test_race_runs_csv_streams_all_runs(self):
+        response = self.client.get(reverse('export-raceruns-csv'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertIn('raceruns.csv', response['Content-Disposition'])
+
+        chunks = iter(response.streaming_content)
+        header = next(chunks).decode()
+        self.assertTrue(header.startswith('id,racer_id,start_number'))
+        rows = list(csv.DictReader(io.StringIO(header + b''.join(chunks).decode())))
+        self.assertEqual(len(rows), RaceRun.objects.count())
+        row = next(r for r in rows if r['start_number'] == 'EX2')
+        self.assertEqual((row['last_name'], row['time_in_seconds'], row['disqualified']), ("Zwei, Komma", "40.500", "False"))
+
+    def test_results_ndjson_has_one_ranked_object_per_line(self):
+        response = self.client.get(reverse('export-results-ndjson'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        results = [json.loads(line) for line in lines]
+        self.assertEqual(len(results), Racer.objects.count())
+        ex2 = next(r for r in results if r['start_number'] == 'EX2')
+        self.assertEqual((ex2['rank'], ex2['best_time_seconds']), (1, "40.500"))
+
+    def test_export_rejects_post(self):
+        response = self.client.post(reverse('export-raceruns-csv'))
+        self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+    async def test_export_streams_asynchronously_under_asgi(self):
+        response = await self.async_client.get(reverse('export-results-ndjson'))
+        self.assertTrue(response.is_async)
+        lines = [line async for chunk in response.streaming_content for line in chunk.decode().splitlines()]
+        self.assertEqual(len(lines), await Racer.objects.acount())
@@ -0,0 +1,141 @@
+import io
+import os
+import tempfile
+import unittest
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from race_core.models import Team, Soapbox, Racer
+
+try:
+    import openpyxl
+except ImportError:
+    openpyxl = None
+
+
+class ImportRacersCommandTests(TestCase):
+    def write_file(self, content, suffix='.csv'):
+        fd, path = tempfile.mkstemp(suffix=suffix)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(content)
+        self.addCleanup(os.remove, path)
+        return path
+
+    def import_file(self, path, *args):
+        out, err = io.StringIO(), io.StringIO()
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('import_racers', path, *args, stdout=out, stderr=err)
+        return out.getvalue(), err.getvalue()
+
+    def test_creates_teams_soapboxes_and_racers(self):
+        path = self.write_file(
+            "first_name,last_name,start_number,soapbox_class,team,soapbox\n"
+            "Max,Muster,101,LRJ,Team Blau,Blitz\n"
+            "Erika,Muster,102,Luftreifen Senior,Team Blau,Donner\n"
+            "Paul,Solo,103,,,\n"
+        )
+        out, err = self.import_file(path)
+
+        self.assertIn('Racers created: 3', out)
+        self.assertEqual(err, '')
+        self.assertEqual(Team.objects.count(), 1)
+        self.assertEqual(Soapbox.objects.count(), 2)
+        erika = Racer.objects.get(start_number='102')
+        self.assertEqual(erika.soapbox_class, 'LRS')
+        self.assertEqual(erika.team.name, 'Team Blau')
+        self.assertEqual(erika.soapbox.name, 'Donner')
+        paul = Racer.objects.get(start_number='103')
+        self.assertEqual(paul.soapbox_class, 'UNK')
+        self.assertIsNone(paul.team)
+
+    def test_updates_existing_racers_by_start_number(self):
+        team = Team.objects.create(name="Altes Team")
+        Racer.objects.create(first_name="Alt", last_name="Name", start_number="A1", soapbox_class='UNK', team=team)
+        path = self.write_file("Vorname;Nachname;Startnummer;Klasse;Team\nNeu;Name;a1;HRS;Altes Team\n")
+
+        out, _ = self.import_file(path)
+
+        self.assertIn('updated: 1', out)
+        self.assertEqual(Team.objects.count(), 1)
+        racer = Racer.objects.get()
+        self.assertEqual((racer.first_name, racer.start_number, racer.soapbox_class), ("Neu", "A1", 'HRS'))
+        self.assertEqual(racer.team, team)
+
+    def test_reimport_without_optional_columns_keeps_existing_values(self):
+        team = Team.objects.create(name="Team Rot")
+        soapbox = Soapbox.objects.create(name="Rakete")
+        Racer.objects.create(first_name="Alt", last_name="Name", start_number="7", soapbox_class='HRS',
+                             team=team, soapbox=soapbox)
+        path = self.write_file("first_name,last_name,start_number\nNeu,Name,7\nNeu,Racer,8\n")
+
+        self.import_file(path)
+
+        racer = Racer.objects.get(start_number='7')
+        self.assertEqual(racer.first_name, "Neu")
+        self.assertEqual((racer.soapbox_class, racer.team, racer.soapbox), ('HRS', team, soapbox))
+        self.assertEqual(Racer.objects.get(start_number='8').soapbox_class, 'UNK')
+
+    def test_reports_invalid_rows_and_imports_the_rest(self):
+        path = self.write_file(
+            "first_name,last_name,start_number,soapbox_class\n"
+            "Max,Muster,1,LRJ\n"
+            ",Ohne Vorname,2,LRJ\n"
+            "Doppelt,Muster,1,LRJ\n"
+            "Falsche,Klasse,3,XYZ\n"
+        )
+        out, err = self.import_file(path)
+
+        self.assertIn('Line 3:', err)
+        self.assertIn('Line 4:', err)
+        self.assertIn('Line 5:', err)
+        self.assertIn('skipped rows: 3', out)
+        self.assertEqual(list(Racer.objects.values_list('start_number', flat=True)), ['1'])
+
+    def test_rejects_too_long_team_and_soapbox_names(self):
+        long_name = "x" * 101
+        path = self.write_file(
+            "first_name,last_name,start_number,team,soapbox\n"
+            f"Max,Muster,1,{long_name},Blitz\n"
+            f"Erika,Muster,2,Team A,{long_name}\n"
+            "Ok,Muster,3,Team A,Blitz\n"
+        )
+        out, err = self.import_file(path)
+
+        self.assertIn("Line 2: 'team' is longer than 100 characters.", err)
+        self.assertIn("Line 3: 'soapbox' is longer than 100 characters.", err)
+        self.assertEqual(list(Racer.objects.values_list('start_number', flat=True)), ['3'])
+        self.assertFalse(Team.objects.filter(name=long_name).exists())
+
+    def test_dry_run_writes_nothing(self):
+        path = self.write_file("first_name,last_name,start_number,team\nMax,Muster,1,Team\n")
+        self.import_file(path, '--dry-run')
+        self.assertFalse(Racer.objects.exists())
+        self.assertFalse(Team.objects.exists())
+
+    def test_missing_columns_raise_command_error(self):
+        path = self.write_file("name,team\nMax,Team\n")
+        with self.assertRaises(CommandError):
+            call_command('import_racers', path, stdout=io.StringIO())
+
+    def test_batches_racer_writes(self):
+        rows = ''.join(f"Racer,{i},{i},LRJ,Team {i % 3}\n" for i in range(25))
+        path = self.write_file("first_name,last_name,start_number,soapbox_class,team\n" + rows)
+        # Team- und Racer-Schreibzugriffe sind gebündelt, nicht pro Zeile
+        with self.assertNumQueries(9):
+            call_command('import_racers', path, '--batch-size', '10', stdout=io.StringIO())
+        self.assertEqual(Racer.objects.count(), 25)
+
+    @unittest.skipUnless(openpyxl, "openpyxl not installed")
+    def test_imports_xlsx(self):
+        fd, path = tempfile.mkstemp(suffix='.xlsx')
+        os.close(fd)
+        self.addCleanup(os.remove, path)
+        workbook = openpyxl.Workbook()
+        workbook.active.append(['first_name', 'last_name', 'start_number', 'soapbox_class'])
+        workbook.active.append(['Max', 'Muster', 7, 'LRJ'])
+        workbook.save(path)
+
+        self.import_file(path)
+
+        self.assertEqual(Racer.objects.get().start_number, '7')
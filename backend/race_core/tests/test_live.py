@@ -0,0 +1,108 @@
+import asyncio
+import json
+from asgiref.sync import sync_to_async
+from django.http import StreamingHttpResponse
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from race_core.live import (
+    EventBroker, PostgresEventListener, RESYNC, format_sse, publish_race_run_event, race_run_events,
+)
+from race_core.models import Racer, RaceRun
+
+
+class EventBrokerTests(SimpleTestCase):
+    async def test_publish_delivers_to_subscribers(self):
+        broker = EventBroker()
+        subscription = broker.subscribe()
+        broker.publish('created', {'id': 1, 'time_in_seconds': '40.000'})
+        event_id, event_type, data = await asyncio.wait_for(subscription.queue.get(), timeout=1)
+        self.assertEqual((event_id, event_type), (1, 'created'))
+        self.assertEqual(data, '{"id":1,"time_in_seconds":"40.000"}')
+
+    async def test_subscribe_replays_missed_events(self):
+        broker = EventBroker()
+        for i in range(3):
+            broker.publish('updated', {'id': i})
+        subscription = broker.subscribe(last_event_id=1)
+        self.assertEqual([event[0] for event in subscription.backlog], [2, 3])
+
+    async def test_subscribe_with_unknown_event_id_requests_resync(self):
+        broker = EventBroker(history_size=2)
+        for i in range(4):
+            broker.publish('updated', {'id': i})
+        self.assertEqual(broker.subscribe(last_event_id=1).backlog, [RESYNC])
+        self.assertEqual(broker.subscribe(last_event_id=99).backlog, [RESYNC])
+
+    async def test_slow_consumer_gets_resync(self):
+        broker = EventBroker(queue_size=2)
+        subscription = broker.subscribe()
+        for i in range(3):
+            broker.publish('updated', {'id': i})
+        await asyncio.sleep(0)
+        self.assertIs(subscription.queue.get_nowait(), RESYNC)
+        self.assertTrue(subscription.queue.empty())
+
+    async def test_resync_all_drops_history_and_notifies_subscribers(self):
+        broker = EventBroker()
+        broker.publish('updated', {'id': 1})
+        subscription = broker.subscribe()
+        broker.resync_all()
+        self.assertIs(await asyncio.wait_for(subscription.queue.get(), timeout=1), RESYNC)
+        # Wer den letzten Stand kennt, braucht danach kein weiteres resync
+        self.assertEqual(broker.subscribe(last_event_id=1).backlog, [])
+        self.assertEqual(broker.subscribe(last_event_id=0).backlog, [RESYNC])
+
+    def test_listener_dispatches_notifications_to_broker(self):
+        broker = EventBroker()
+        listener = PostgresEventListener(broker)
+        listener.dispatch('{"type":"created","data":{"id":4}}')
+        listener.dispatch('kein json')
+        self.assertEqual(list(broker._history), [(1, 'created', '{"id":4}')])
+
+    @override_settings(LIVE_EVENTS_BACKEND='postgres')
+    def test_notify_backend_falls_back_to_local_without_postgres(self):
+        event_id, event_type, _ = publish_race_run_event('updated', {'id': 9})
+        self.assertEqual(race_run_events._history[-1][:2], (event_id, 'updated'))
+
+    def test_format_sse(self):
+        self.assertEqual(format_sse((7, 'deleted', '{"id":3}')), 'id: 7\nevent: deleted\ndata: {"id":3}\n\n')
+
+
+class RaceRunLiveSignalTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.racer = Racer.objects.create(first_name="Live", last_name="Racer", soapbox_class='LRJ', start_number="L1")
+
+    def test_race_run_changes_are_published_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            run = RaceRun.objects.create(racer=self.racer, run_type='H1', run_identifier=1, time_in_seconds="41.250")
+        event_id, event_type, data = race_run_events._history[-1]
+        self.assertEqual(event_type, 'created')
+        self.assertEqual(json.loads(data)['racer_start_number'], "L1")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            run.delete()
+        _, event_type, data = race_run_events._history[-1]
+        self.assertEqual(event_type, 'deleted')
+        self.assertEqual(json.loads(data)['racer'], self.racer.id)
+
+
+class RaceRunLiveStreamTests(SimpleTestCase):
+    async def test_stream_sends_published_events(self):
+        response = await self.async_client.get(reverse('racerun-live'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+
+        stream = response.streaming_content
+        self.assertEqual(await anext(stream), b'retry: 3000\n\n')
+        next_chunk = asyncio.ensure_future(anext(stream))
+        await asyncio.sleep(0)
+        await sync_to_async(race_run_events.publish)('updated', {'id': 5})
+        chunk = await asyncio.wait_for(next_chunk, timeout=1)
+        self.assertIn(b'event: updated\ndata: {"id":5}', chunk)
+        await stream.aclose()
+
+    def test_stream_is_unavailable_under_wsgi(self):
+        response = self.client.get(reverse('racerun-live'))
+        self.assertEqual(response.status_code, 503)
+        self.assertNotIsInstance(response, StreamingHttpResponse)
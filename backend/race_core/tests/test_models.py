@@ -49,6 +49,11 @@ class RacerModelTests(TestCase):
         # The best time should be from H2 (39.900), not the faster PR run (35.000).
         self.assertEqual(self.racer.best_time_seconds, Decimal("39.900"))
 
+    def test_racer_with_best_time_annotation(self):
+        racer = Racer.objects.with_best_time().get(pk=self.racer.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(racer.best_time_seconds, Decimal("39.900"))
+
     def test_racer_best_time_seconds_no_valid_runs(self):
         racer_no_runs = Racer.objects.create(first_name="No", last_name="Runs", soapbox_class='LRJ')
         self.assertIsNone(racer_no_runs.best_time_seconds)
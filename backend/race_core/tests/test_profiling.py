@@ -0,0 +1,72 @@
+from django.conf import settings
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from asgiref.sync import iscoroutinefunction
+from race_core.profiling import ProfilingMiddleware, request_metrics, server_timing_header, QueryRecorder
+from .test_api_base import APITestsBase
+
+PROFILED_MIDDLEWARE = ['race_core.profiling.ProfilingMiddleware', *settings.MIDDLEWARE]
+
+
+@override_settings(MIDDLEWARE=PROFILED_MIDDLEWARE, PROFILING_SAMPLE_RATE=1.0)
+class ProfilingMiddlewareTests(APITestsBase):
+    def setUp(self):
+        super().setUp()
+        request_metrics.reset()
+
+    def test_adds_server_timing_header(self):
+        response = self.client.get(reverse('racer-list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        timing = response['Server-Timing']
+        self.assertIn('total;dur=', timing)
+        self.assertRegex(timing, r'db;dur=[\d.]+;desc="[1-9]\d* queries"')
+
+    async def test_async_views_are_measured(self):
+        response = await self.async_client.get(reverse('public-racer-list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertRegex(response['Server-Timing'], r'db;dur=[\d.]+;desc="[1-9]\d* queries"')
+
+    def test_async_chain_stays_async(self):
+        async def get_response(request):
+            return None
+
+        self.assertTrue(iscoroutinefunction(ProfilingMiddleware(get_response)))
+        self.assertFalse(iscoroutinefunction(ProfilingMiddleware(lambda request: None)))
+
+    @override_settings(PROFILING_SAMPLE_RATE=0.0)
+    def test_unsampled_requests_are_not_measured(self):
+        response = self.client.get(reverse('racer-list'))
+        self.assertNotIn('Server-Timing', response)
+        self.assertEqual(request_metrics.snapshot(), {})
+
+    def test_metrics_endpoint_reports_views(self):
+        for _ in range(3):
+            self.client.get(reverse('racer-list'))
+        self.client.get(reverse('team-detail', args=[self.team1.pk]))
+
+        self.authenticate_as_admin()
+        response = self.client.get(reverse('request-metrics'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.data['enabled'])
+        racer_list = response.data['views']['racer-list']
+        self.assertEqual(racer_list['sampled_requests'], 3)
+        self.assertEqual(racer_list['histogram_ms']['+Inf'], 3)
+        self.assertGreater(racer_list['queries_avg'], 0)
+        self.assertTrue(racer_list['slowest_queries'])
+        self.assertIn('team-detail', response.data['views'])
+
+    def test_metrics_endpoint_is_staff_only(self):
+        self.assertEqual(self.client.get(reverse('request-metrics')).status_code, status.HTTP_401_UNAUTHORIZED)
+        self.authenticate_as_normal_user()
+        self.assertEqual(self.client.get(reverse('request-metrics')).status_code, status.HTTP_403_FORBIDDEN)
+
+
+class QueryRecorderTests(APITestsBase):
+    def test_keeps_only_slowest_queries(self):
+        recorder = QueryRecorder(keep=2)
+        for sql in ('a', 'b', 'c'):
+            recorder(lambda *args: None, sql, None, False, {})
+        self.assertEqual(recorder.count, 3)
+        self.assertEqual(len(recorder.slowest), 2)
+        self.assertIn('db;dur=', server_timing_header(0.01, recorder))
@@ -0,0 +1,44 @@
+from django.db import connection
+from django.test import TestCase
+from race_core.models import Racer, RaceRun
+
+
+class QueryPlanTests(TestCase):
+    """Stellt sicher, dass die Hot-Path-Abfragen die Indexe aus Migration 0010 nutzen."""
+
+    @classmethod
+    def setUpTestData(cls):
+        for i in range(30):
+            racer = Racer.objects.create(
+                first_name=f"Plan{i}", last_name=f"Racer{i:02d}", soapbox_class='LRJ' if i % 2 else 'LRS',
+                start_number=f"QP{i}"
+            )
+            RaceRun.objects.create(racer=racer, run_type='PR', run_identifier=1, time_in_seconds="50.000")
+            RaceRun.objects.create(racer=racer, run_type='H1', run_identifier=1, time_in_seconds="45.000")
+            RaceRun.objects.create(racer=racer, run_type='H2', run_identifier=1, disqualified=True)
+        cls.racer = racer
+
+    def assertUsesIndex(self, queryset, index_name):
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                # Bei kleinen Testtabellen würde der Planer sonst immer sequentiell lesen
+                cursor.execute('ANALYZE')
+                cursor.execute('SET LOCAL enable_seqscan = off')
+            plan = queryset.explain()
+        self.assertIn(index_name, plan)
+
+    def test_best_time_lookup_uses_partial_index(self):
+        queryset = RaceRun.objects.filter(
+            racer=self.racer, disqualified=False, time_in_seconds__isnull=False
+        ).exclude(run_type=RaceRun.RaceRunType.PRACTICE).order_by('time_in_seconds')
+        self.assertUsesIndex(queryset, 'racerun_best_time_idx')
+
+    def test_best_time_annotation_uses_partial_index(self):
+        self.assertUsesIndex(Racer.objects.with_best_time().filter(pk=self.racer.pk), 'racerun_best_time_idx')
+
+    def test_racers_by_class_use_class_name_index(self):
+        queryset = Racer.objects.filter(soapbox_class='LRJ').order_by('last_name', 'first_name')
+        self.assertUsesIndex(queryset, 'racer_class_name_idx')
+
+    def test_race_run_cursor_order_uses_recorded_index(self):
+        self.assertUsesIndex(RaceRun.objects.order_by('recorded_at', 'id'), 'racerun_recorded_idx')
@@ -0,0 +1,68 @@
+import io
+
+from django.core.management import call_command
+from django.test import TestCase
+from race_core.loadtest import ClientTarget, build_request_plan, percentile, run_load_test
+from race_core.models import Team, Soapbox, Racer, RaceRun, Standing
+
+
+class SeedEventCommandTests(TestCase):
+    def seed(self, *args):
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('seed_event', '--no-input', *args, stdout=io.StringIO())
+
+    def test_creates_event_with_requested_size(self):
+        Racer.objects.create(first_name="Alt", last_name="Fahrer", start_number="X1")
+        self.seed('--racers', '20', '--runs-per-racer', '4')
+
+        self.assertEqual(Racer.objects.count(), 20)
+        self.assertFalse(Racer.objects.filter(start_number="X1").exists())
+        self.assertEqual(Team.objects.count(), 4)
+        self.assertEqual(Soapbox.objects.count(), 20)
+        self.assertEqual(RaceRun.objects.count(), 80)
+        self.assertEqual(set(RaceRun.objects.values_list('run_type', flat=True)), {'PR', 'H1', 'H2'})
+        self.assertEqual(RaceRun.objects.filter(run_type='PR', run_identifier=2).count(), 20)
+        self.assertEqual(Standing.objects.count(), 20)
+
+    def test_same_seed_produces_same_data(self):
+        def snapshot():
+            return list(RaceRun.objects.order_by('racer__start_number', 'run_type').values_list(
+                'racer__start_number', 'racer__last_name', 'run_type', 'time_in_seconds', 'disqualified'))
+
+        self.seed('--racers', '10', '--seed', '7')
+        first = snapshot()
+        self.seed('--racers', '10', '--seed', '7')
+        self.assertEqual(snapshot(), first)
+
+
+class LoadTestTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        from race_core.seeding import seed_event
+        seed_event(racers=10, runs_per_racer=3)
+
+    def test_request_plan_is_deterministic(self):
+        runs = [{'id': 1, 'racer_start_number': 'S0001', 'run_type': 'H1', 'run_identifier': 1}]
+        first = build_request_plan(50, 0.5, [1, 2], runs, '0', seed=3)
+        second = build_request_plan(50, 0.5, [1, 2], runs, '0', seed=3)
+        self.assertEqual([entry[:2] for entry in first], [entry[:2] for entry in second])
+        self.assertTrue(any(method != 'GET' for _, method, _, _ in first))
+
+    def test_reports_latency_and_queries_per_endpoint(self):
+        from django.contrib.auth.models import User
+        user = User.objects.create_user(username="timing", password="pw")
+
+        summary, _ = run_load_test(lambda: ClientTarget(user), requests=60, concurrency=1, write_ratio=0.2)
+
+        self.assertEqual(sum(row['requests'] for row in summary.values()), 60)
+        self.assertIn('standings-list', summary)
+        for name, row in summary.items():
+            self.assertEqual(row['errors'], 0, name)
+            self.assertLessEqual(row['p50_ms'], row['p99_ms'])
+            self.assertGreaterEqual(row['queries_max'], 1)
+
+    def test_percentile_uses_nearest_rank(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([5], 95), 5)
@@ -1,7 +1,10 @@
-from django.test import TestCase
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from decimal import Decimal
 from rest_framework.exceptions import ValidationError as DRFValidationError
 from race_core.models import Team, Racer, RaceRun
+from race_core.racer_index import invalidate_racer_index
 from race_core.serializers import TeamWriteSerializer, RacerWriteSerializer, RaceRunWriteSerializer
 
 
@@ -121,8 +124,9 @@ class RaceRunWriteSerializerValidationTests(TestCase):
     def test_validate_unique_together_on_create(self):
         data = {"racer_id": self.racer1.id, "run_type": "H1", "run_identifier": 1}
         serializer = RaceRunWriteSerializer(data=data)
+        self.assertTrue(serializer.is_valid(raise_exception=True))
         with self.assertRaises(DRFValidationError) as cm:
-            serializer.is_valid(raise_exception=True)
+            serializer.save()
         self.assertIn('unique', cm.exception.detail[0].code if isinstance(cm.exception.detail, list) else
         cm.exception.detail.get('non_field_errors', [{}])[0].code)
 
@@ -141,11 +145,40 @@ class RaceRunWriteSerializerValidationTests(TestCase):
 
         # Try to update new_run to have the same racer as existing_run (causing conflict)
         serializer = RaceRunWriteSerializer(instance=new_run, data={"racer_id": self.racer1.id}, partial=True)
+        self.assertTrue(serializer.is_valid(raise_exception=True))
         with self.assertRaises(DRFValidationError) as cm:
-            serializer.is_valid(raise_exception=True)
+            serializer.save()
         self.assertIn('unique', cm.exception.detail[0].code if isinstance(cm.exception.detail, list) else
         cm.exception.detail.get('non_field_errors', [{}])[0].code)
 
+    def test_create_by_start_number_skips_uniqueness_query(self):
+        data = {"racer_start_number": "v2", "run_type": "H1", "run_identifier": 2, "time_in_seconds": "20.000"}
+        serializer = RaceRunWriteSerializer(data=data)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertTrue(serializer.is_valid(raise_exception=True))
+            serializer.save()
+        # Ohne das Lesen der Änderungssequenz, das zu jedem Speichern gehört
+        selects = [q['sql'] for q in queries if q['sql'].startswith('SELECT') and 'race_core_dataversion' not in q['sql']]
+        self.assertEqual(len(selects), 1)
+        self.assertIn('race_core_racer', selects[0])
+
+    @override_settings(RACER_INDEX_CACHE=True)
+    def test_process_racer_index_avoids_lookup_and_is_invalidated(self):
+        invalidate_racer_index()
+        first = RaceRunWriteSerializer(data={"racer_start_number": "V2", "run_type": "H1", "run_identifier": 2})
+        self.assertTrue(first.is_valid(raise_exception=True))
+
+        second = RaceRunWriteSerializer(data={"racer_start_number": "V2", "run_type": "H1", "run_identifier": 3})
+        with self.assertNumQueries(0):
+            self.assertTrue(second.is_valid(raise_exception=True))
+
+        self.racer2.start_number = "V22"
+        self.racer2.save()
+        third = RaceRunWriteSerializer(data={"racer_start_number": "V2", "run_type": "H1", "run_identifier": 4})
+        self.assertFalse(third.is_valid())
+        self.assertIn('racer_start_number', third.errors)
+        invalidate_racer_index()
+
     def test_validate_disqualified_and_time(self):
         data_dq_with_time = {"racer_id": self.racer1.id, "run_type": "H2", "run_identifier": 1, "disqualified": True,
                              "time_in_seconds": "10.000"}
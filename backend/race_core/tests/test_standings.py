@@ -0,0 +1,116 @@
+from decimal import Decimal
+from django.urls import reverse
+from rest_framework import status
+from race_core.models import Racer, RaceRun, Standing
+from .test_api_base import APITestsBase
+
+
+class StandingUpdateTests(APITestsBase):
+    def create_racer(self, start_number, soapbox_class='LRJ'):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Racer.objects.create(
+                first_name="Standing", last_name=start_number, soapbox_class=soapbox_class, start_number=start_number
+            )
+
+    def create_run(self, racer, run_type, time_in_seconds=None, disqualified=False, run_identifier=1):
+        with self.captureOnCommitCallbacks(execute=True):
+            return RaceRun.objects.create(
+                racer=racer, run_type=run_type, run_identifier=run_identifier,
+                time_in_seconds=time_in_seconds, disqualified=disqualified
+            )
+
+    def test_new_racer_gets_unranked_standing(self):
+        racer = self.create_racer("ST1")
+        standing = Standing.objects.get(racer=racer)
+        self.assertEqual(standing.soapbox_class, 'LRJ')
+        self.assertIsNone(standing.rank)
+        self.assertIsNone(standing.best_time_seconds)
+
+    def test_race_runs_update_times_and_ranks(self):
+        fast = self.create_racer("ST1")
+        slow = self.create_racer("ST2")
+        self.create_run(slow, 'H1', "40.000")
+        self.create_run(fast, 'H1', "42.000")
+        self.create_run(fast, 'H2', "38.500")
+        self.create_run(fast, 'PR', "30.000")
+
+        fast_standing = Standing.objects.get(racer=fast)
+        self.assertEqual(fast_standing.rank, 1)
+        self.assertEqual(fast_standing.best_time_seconds, Decimal("38.500"))
+        self.assertEqual(fast_standing.heat_1_time_seconds, Decimal("42.000"))
+        self.assertEqual(fast_standing.heat_2_time_seconds, Decimal("38.500"))
+        self.assertEqual(Standing.objects.get(racer=slow).rank, 2)
+
+    def test_disqualification_and_deletion_rerank(self):
+        first = self.create_racer("ST1")
+        second = self.create_racer("ST2")
+        run = self.create_run(first, 'H1', "35.000")
+        self.create_run(second, 'H1', "36.000")
+
+        run.time_in_seconds = None
+        run.disqualified = True
+        with self.captureOnCommitCallbacks(execute=True):
+            run.save()
+        first_standing = Standing.objects.get(racer=first)
+        self.assertIsNone(first_standing.rank)
+        self.assertTrue(first_standing.heat_1_disqualified)
+        self.assertEqual(Standing.objects.get(racer=second).rank, 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            second.delete()
+        self.assertFalse(Standing.objects.filter(racer_id=second.id).exists())
+
+    def test_changed_standing_gets_new_updated_at(self):
+        racer = self.create_racer("ST1")
+        before = Standing.objects.get(racer=racer).updated_at
+        self.create_run(racer, 'H1', "41.000")
+        self.assertGreater(Standing.objects.get(racer=racer).updated_at, before)
+
+    def test_equal_times_share_rank(self):
+        racers = [self.create_racer(f"ST{i}") for i in range(3)]
+        self.create_run(racers[0], 'H1', "40.000")
+        self.create_run(racers[1], 'H1', "40.000")
+        self.create_run(racers[2], 'H1', "41.000")
+        self.assertEqual(
+            [Standing.objects.get(racer=r).rank for r in racers],
+            [1, 1, 3]
+        )
+
+    def test_class_change_moves_standing(self):
+        racer = self.create_racer("ST1")
+        self.create_run(racer, 'H1', "40.000")
+        racer.soapbox_class = 'HRS'
+        with self.captureOnCommitCallbacks(execute=True):
+            racer.save()
+        standing = Standing.objects.get(racer=racer)
+        self.assertEqual(standing.soapbox_class, 'HRS')
+        self.assertEqual(standing.rank, 1)
+
+
+class StandingAPITests(APITestsBase):
+    def setUp(self):
+        super().setUp()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.junior = Racer.objects.create(first_name="Junior", last_name="Racer", soapbox_class='LRJ', team=self.team1)
+            RaceRun.objects.create(racer=self.junior, run_type='H1', run_identifier=1, time_in_seconds="44.000")
+            Racer.objects.create(first_name="Senior", last_name="Racer", soapbox_class='LRS')
+
+    def test_list_standings_filtered_by_class(self):
+        self.unauthenticate()
+        response = self.client.get(reverse('standing-list'), {'class': 'LRJ'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 1)
+        self.assertEqual(response.data[0]['racer'], self.junior.id)
+        self.assertEqual(response.data[0]['rank'], 1)
+        self.assertEqual(response.data[0]['team_name'], self.team1.name)
+        self.assertEqual(response.data[0]['heat_1_time_seconds'], "44.000")
+
+    def test_list_standings_unknown_class_returns_400(self):
+        self.unauthenticate()
+        response = self.client.get(reverse('standing-list'), {'class': 'XXX'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_standings_are_read_only(self):
+        self.authenticate_as_admin()
+        response = self.client.post(reverse('standing-list'), {}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
@@ -1,13 +1,25 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import TeamViewSet, RacerViewSet, RaceRunViewSet, SoapboxViewSet
+from .views import (
+    TeamViewSet, RacerViewSet, RaceRunViewSet, SoapboxViewSet, StandingViewSet, race_run_live_stream,
+    export_race_runs_csv, export_results_ndjson, request_metrics_view, public_standing_list, public_racer_list,
+    public_race_run_list,
+)
 
 router = DefaultRouter()
 router.register(r'teams', TeamViewSet, basename='team')
 router.register(r'soapboxes', SoapboxViewSet, basename='soapbox')
 router.register(r'racers', RacerViewSet, basename='racer')
 router.register(r'raceruns', RaceRunViewSet, basename='racerun')
+router.register(r'standings', StandingViewSet, basename='standing')
 
 urlpatterns = [
+    path('live/raceruns/', race_run_live_stream, name='racerun-live'),
+    path('export/raceruns.csv', export_race_runs_csv, name='export-raceruns-csv'),
+    path('export/results.ndjson', export_results_ndjson, name='export-results-ndjson'),
+    path('public/standings/', public_standing_list, name='public-standing-list'),
+    path('public/racers/', public_racer_list, name='public-racer-list'),
+    path('public/raceruns/', public_race_run_list, name='public-racerun-list'),
+    path('_metrics', request_metrics_view, name='request-metrics'),
     path('', include(router.urls)),
 ]
@@ -0,0 +1,49 @@
+import hashlib
+
+from django.db import models
+from django.utils import timezone
+
+from .models import DataVersion
+from .response_cache import invalidate_response_cache, response_cache_enabled
+
+TEAMS = 'team'
+SOAPBOXES = 'soapbox'
+RACERS = 'racer'
+RACE_RUNS = 'racerun'
+STANDINGS = 'standing'
+
+
+def bump_versions(*names):
+    now = timezone.now()
+    updated = DataVersion.objects.filter(name__in=names).update(version=models.F('version') + 1, updated_at=now)
+    if updated < len(set(names)):
+        existing = set(DataVersion.objects.filter(name__in=names).values_list('name', flat=True))
+        DataVersion.objects.bulk_create(
+            [DataVersion(name=name, version=1, updated_at=now) for name in set(names) - existing],
+            ignore_conflicts=True,
+        )
+    if response_cache_enabled():
+        invalidate_response_cache(*names)
+
+
+def _collection_state(rows, variant):
+    rows = sorted(rows)
+    fingerprint = '|'.join(f'{name}:{version}' for name, version, _ in rows)
+    digest = hashlib.sha1(f'{fingerprint}|{variant}'.encode()).hexdigest()[:20]
+    last_modified = max((updated_at for _, _, updated_at in rows), default=None)
+    return f'"{digest}"', last_modified
+
+
+def get_collection_state(names, variant=''):
+    """
+    Liefert (ETag, Last-Modified-Zeitstempel) für eine Kombination von Tabellen.
+    Der ETag ändert sich, sobald eine der Tabellen geändert wurde.
+    """
+    return _collection_state(
+        DataVersion.objects.filter(name__in=names).values_list('name', 'version', 'updated_at'), variant
+    )
+
+
+async def aget_collection_state(names, variant=''):
+    rows = DataVersion.objects.filter(name__in=names).values_list('name', 'version', 'updated_at')
+    return _collection_state([row async for row in rows], variant)
@@ -1,18 +1,139 @@
-from rest_framework import viewsets, permissions
+import asyncio
+
+from asgiref.sync import sync_to_async
+from rest_framework import viewsets, permissions, status
+from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.exceptions import ValidationError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
+from django.db import IntegrityError
+from django.core.handlers.asgi import ASGIRequest
+from django.db.models import QuerySet
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, parse_http_date_safe
+from django.utils.translation import gettext_lazy as _
+from django.views.decorators.http import require_GET
+
+from .bulk import RaceRunBulkProcessor, RaceRunReplaceProcessor, summarize_bulk_results
+from .changes import race_run_changes, decode_change_token
+from .compact_serializers import CompactRacerListSerializer, CompactRaceRunListSerializer
+from .export import race_run_csv_lines, result_ndjson_lines, streaming_export_response
+from .live import race_run_events, ensure_event_listener, format_sse, RESYNC
+from .pagination import RaceRunCursorPagination, RacerCursorPagination
+from .profiling import metrics_snapshot
+from .response_cache import get_response_cache, response_cache_enabled, response_cache_key
+from .versioning import aget_collection_state, get_collection_state, TEAMS, SOAPBOXES, RACERS, RACE_RUNS, STANDINGS
 
-from .models import Team, Racer, RaceRun, Soapbox
+from .models import Team, Racer, RaceRun, Soapbox, Standing
 from .serializers import (
     TeamSerializer, RacerSerializer, RaceRunSerializer, TeamWriteSerializer, RacerWriteSerializer,
-    RaceRunWriteSerializer, SoapboxSerializer, SoapboxWriteSerializer
+    RaceRunWriteSerializer, SoapboxSerializer, SoapboxWriteSerializer, StandingSerializer, RaceRunBulkSerializer,
+    RaceRunReplaceSerializer, get_requested_fields
 )
 
 
-class TeamViewSet(viewsets.ModelViewSet):
-    queryset = Team.objects.all().prefetch_related('racers')
+class ConditionalGetMixin:
+    """
+    Beantwortet GET-Anfragen mit 304 Not Modified, solange sich keine der in
+    `version_dependencies` genannten Tabellen geändert hat (ETag/Last-Modified).
+    """
+    version_dependencies = ()
+
+    def list(self, request, *args, **kwargs):
+        return self._conditional_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._conditional_response(super().retrieve, request, *args, **kwargs)
+
+    def _conditional_response(self, handler, request, *args, **kwargs):
+        # Die Version muss vor den Daten gelesen werden, damit ein ETag nie neuer ist als der Inhalt
+        etag, last_modified = get_collection_state(self.version_dependencies, request.accepted_media_type)
+        last_modified = int(last_modified.timestamp()) if last_modified else None
+
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = handler(request, *args, **kwargs)
+        return _with_validators(response, etag, http_date(last_modified) if last_modified else None)
+
+
+def _with_validators(response, etag, last_modified):
+    if etag:
+        response['ETag'] = etag
+    if last_modified:
+        response['Last-Modified'] = last_modified
+    patch_cache_control(response, no_cache=True)
+    return response
+
+
+def _cache_entry(rendered):
+    return {
+        'content': rendered.content,
+        'content_type': rendered['Content-Type'],
+        'etag': rendered.get('ETag'),
+        'last_modified': rendered.get('Last-Modified'),
+    }
+
+
+def _cached_entry_response(request, entry):
+    last_modified = parse_http_date_safe(entry['last_modified']) if entry['last_modified'] else None
+    response = get_conditional_response(request, etag=entry['etag'], last_modified=last_modified)
+    if response is None:
+        response = HttpResponse(entry['content'], content_type=entry['content_type'])
+    return _with_validators(response, entry['etag'], entry['last_modified'])
+
+
+class CachedResponseMixin:
+    """
+    Optionaler Cache für list/retrieve (RESPONSE_CACHE_ENABLED), geschlüsselt nach Pfad inkl. Query-String.
+    Jede Änderung an einer der `version_dependencies` macht die Einträge über bump_versions ungültig,
+    Treffer werden ohne Datenbankzugriff beantwortet.
+    """
+
+    def list(self, request, *args, **kwargs):
+        return self._cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._cached_response(super().retrieve, request, *args, **kwargs)
+
+    def _cached_response(self, handler, request, *args, **kwargs):
+        # Die HTML-Ansicht der Browsable API enthält Benutzerdaten und wird nicht gecacht
+        if not response_cache_enabled() or request.accepted_renderer.format != 'json':
+            return handler(request, *args, **kwargs)
+
+        cache = get_response_cache()
+        key = response_cache_key(request, self.version_dependencies)
+        entry = cache.get(key)
+        if entry is None:
+            response = handler(request, *args, **kwargs)
+            if response.status_code == status.HTTP_200_OK:
+                response.add_post_render_callback(lambda rendered: cache.set(key, _cache_entry(rendered)))
+            return response
+        return _cached_entry_response(request, entry)
+
+
+class CompactListMixin:
+    """
+    Unpaginierte Listen (ein Queryset als Eingabe) laufen über `compact_list_serializer_class`,
+    alles andere über den normalen Serializer.
+    """
+    compact_list_serializer_class = None
+    compact_list_actions = ('list',)
+
+    def get_serializer(self, *args, **kwargs):
+        if self.action in self.compact_list_actions and kwargs.get('many') and isinstance(args[0], QuerySet):
+            return self.compact_list_serializer_class(args[0], context=self.get_serializer_context())
+        return super().get_serializer(*args, **kwargs)
+
+
+class TeamViewSet(CachedResponseMixin, ConditionalGetMixin, viewsets.ModelViewSet):
+    queryset = Team.objects.with_racer_summary()
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['name']
+    version_dependencies = (TEAMS, RACERS)
 
     def get_serializer_class(self):
         if self.action in ['create', 'update', 'partial_update']:
@@ -20,11 +141,12 @@ class TeamViewSet(viewsets.ModelViewSet):
         return TeamSerializer
 
 
-class SoapboxViewSet(viewsets.ModelViewSet):
+class SoapboxViewSet(CachedResponseMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = Soapbox.objects.all()
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['name']
+    version_dependencies = (SOAPBOXES,)
 
     def get_serializer_class(self):
         if self.action in ['create', 'update', 'partial_update']:
@@ -32,8 +154,8 @@ class SoapboxViewSet(viewsets.ModelViewSet):
         return SoapboxSerializer
 
 
-class RacerViewSet(viewsets.ModelViewSet):
-    queryset = Racer.objects.select_related('team', 'soapbox').prefetch_related('races').all()
+class RacerViewSet(CachedResponseMixin, ConditionalGetMixin, CompactListMixin, viewsets.ModelViewSet):
+    queryset = Racer.objects.select_related('team', 'soapbox')
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
     filter_backends = [DjangoFilterBackend]
     filterset_fields = {
@@ -44,6 +166,19 @@ class RacerViewSet(viewsets.ModelViewSet):
         'start_number': ['exact'],
     }
     search_fields = ['first_name', 'last_name', 'team__name', 'start_number']
+    version_dependencies = (RACERS, TEAMS, SOAPBOXES, RACE_RUNS)
+    pagination_class = RacerCursorPagination
+    compact_list_serializer_class = CompactRacerListSerializer
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        # Bestzeit und verschachtelte Läufe nur laden, wenn sie per ?fields= nicht abgewählt sind
+        requested = get_requested_fields(self.request)
+        if requested is None or 'best_time_seconds' in requested:
+            queryset = queryset.with_best_time()
+        if requested is None or 'races' in requested:
+            queryset = queryset.prefetch_related('races')
+        return queryset
 
     def get_serializer_class(self):
         if self.action in ['create', 'update', 'partial_update']:
@@ -51,7 +186,7 @@ class RacerViewSet(viewsets.ModelViewSet):
         return RacerSerializer
 
 
-class RaceRunViewSet(viewsets.ModelViewSet):
+class RaceRunViewSet(CachedResponseMixin, ConditionalGetMixin, CompactListMixin, viewsets.ModelViewSet):
     queryset = RaceRun.objects.select_related('racer', 'racer__team').all()
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
     filter_backends = [DjangoFilterBackend]
@@ -61,8 +196,200 @@ class RaceRunViewSet(viewsets.ModelViewSet):
         'run_type': ['exact'],
         'disqualified': ['exact'],
     }
+    version_dependencies = (RACE_RUNS, RACERS)
+    pagination_class = RaceRunCursorPagination
+    compact_list_serializer_class = CompactRaceRunListSerializer
+    compact_list_actions = ('list', 'changes')
 
     def get_serializer_class(self):
         if self.action in ['create', 'update', 'partial_update']:
             return RaceRunWriteSerializer
+        if self.action == 'bulk':
+            return RaceRunBulkSerializer
+        if self.action == 'replace':
+            return RaceRunReplaceSerializer
         return RaceRunSerializer
+
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        processor = RaceRunBulkProcessor(
+            upserts=serializer.validated_data['upserts'],
+            deletes=serializer.validated_data['deletes'],
+        )
+        try:
+            results = processor.process()
+        except IntegrityError as e:
+            return Response(
+                {'detail': _(f"Bulk update conflicts with existing race runs: {e}")},
+                status=status.HTTP_409_CONFLICT
+            )
+        return Response(summarize_bulk_results(results))
+
+    @action(detail=False, methods=['get'])
+    def changes(self, request):
+        since = request.query_params.get('since')
+        try:
+            since = decode_change_token(since) if since else None
+        except ValueError:
+            raise ValidationError({'since': [_("Invalid change token.")]})
+
+        token, full, runs, deleted_ids = race_run_changes(since, self.filter_queryset(self.get_queryset()))
+        return Response({
+            'token': token,
+            'full': full,
+            'results': self.get_serializer(runs, many=True).data,
+            'deleted': deleted_ids,
+        })
+
+    @action(detail=False, methods=['post'])
+    def replace(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            results = RaceRunReplaceProcessor(serializer.validated_data['runs']).process()
+        except IntegrityError as e:
+            return Response(
+                {'detail': _(f"Replace conflicts with concurrently written race runs: {e}")},
+                status=status.HTTP_409_CONFLICT
+            )
+        summary = summarize_bulk_results(results)
+        if summary['failed']:
+            return Response(summary, status=status.HTTP_400_BAD_REQUEST)
+        return Response(summary)
+
+
+class StandingViewSet(CachedResponseMixin, ConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
+    queryset = Standing.objects.select_related('racer', 'racer__team', 'racer__soapbox')
+    serializer_class = StandingSerializer
+    permission_classes = [permissions.AllowAny]
+    version_dependencies = (STANDINGS, RACERS, TEAMS, SOAPBOXES)
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        soapbox_class = self.request.query_params.get('class')
+        if soapbox_class:
+            if soapbox_class not in Racer.SoapboxClass.values:
+                raise ValidationError({'class': _(f"Unknown soapbox class '{soapbox_class}'.")})
+            queryset = queryset.filter(soapbox_class=soapbox_class)
+        return queryset
+
+
+PUBLIC_LIST_CHUNK_SIZE = 500
+
+
+async def _public_list(request, viewset_class):
+    """
+    Async-Variante von `viewset_class.list` für die öffentlichen Ergebnisseiten: gleiche Filter, ?fields=,
+    Serializer, ETags und Antwort-Cache, die Daten kommen aber über die async ORM. Unter ASGI belegen
+    langsame Clients damit keinen Worker-Thread. Ohne Pagination.
+    """
+    renderer = JSONRenderer()
+    view = viewset_class(action='list', args=(), kwargs={}, format_kwarg=None)
+    view.request = Request(request)
+    view.request.accepted_renderer = renderer
+    view.request.accepted_media_type = renderer.media_type
+
+    try:
+        # Nur der Aufbau ist synchron: Filter-Formulare können beim Validieren die Datenbank lesen
+        queryset = await sync_to_async(lambda: view.filter_queryset(view.get_queryset()))()
+
+        cache_key = None
+        if response_cache_enabled():
+            cache_key = await sync_to_async(response_cache_key)(view.request, view.version_dependencies)
+            entry = await get_response_cache().aget(cache_key)
+            if entry is not None:
+                return _cached_entry_response(request, entry)
+
+        # Die Version muss vor den Daten gelesen werden, damit ein ETag nie neuer ist als der Inhalt
+        etag, last_modified = await aget_collection_state(view.version_dependencies, renderer.media_type)
+        last_modified = int(last_modified.timestamp()) if last_modified else None
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            objects = [obj async for obj in queryset.aiterator(chunk_size=PUBLIC_LIST_CHUNK_SIZE)]
+            # Serialisieren und Rendern ist CPU-Arbeit und würde den Event-Loop für alle Clients blockieren
+            content = await sync_to_async(lambda: renderer.render(view.get_serializer(objects, many=True).data))()
+            response = HttpResponse(content, content_type=renderer.media_type)
+        response = _with_validators(response, etag, http_date(last_modified) if last_modified else None)
+        if cache_key and response.status_code == status.HTTP_200_OK:
+            await get_response_cache().aset(cache_key, _cache_entry(response))
+        return response
+    except ValidationError as e:
+        return HttpResponse(renderer.render(e.detail), status=status.HTTP_400_BAD_REQUEST,
+                            content_type=renderer.media_type)
+
+
+@require_GET
+async def public_standing_list(request):
+    return await _public_list(request, StandingViewSet)
+
+
+@require_GET
+async def public_racer_list(request):
+    return await _public_list(request, RacerViewSet)
+
+
+@require_GET
+async def public_race_run_list(request):
+    return await _public_list(request, RaceRunViewSet)
+
+
+LIVE_HEARTBEAT_SECONDS = 15
+
+
+async def _race_run_event_stream(subscription):
+    try:
+        yield 'retry: 3000\n\n'
+        for event in subscription.backlog:
+            yield format_sse(event)
+            if event is RESYNC:
+                return
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.queue.get(), timeout=LIVE_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield ': keepalive\n\n'
+                continue
+            yield format_sse(event)
+            if event is RESYNC:
+                return
+    finally:
+        race_run_events.unsubscribe(subscription)
+
+
+@require_GET
+async def race_run_live_stream(request):
+    # Unter WSGI würde der endlose Stream einen Worker blockieren; dafür gibt es den eigenen ASGI-Live-Dienst
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse({'detail': _('Live updates are only available when the server runs under ASGI.')},
+                            status=status.HTTP_503_SERVICE_UNAVAILABLE)
+
+    last_event_id = request.headers.get('Last-Event-ID') or request.GET.get('last_event_id')
+    try:
+        last_event_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        last_event_id = None
+
+    ensure_event_listener()
+    subscription = race_run_events.subscribe(last_event_id)
+    response = StreamingHttpResponse(_race_run_event_stream(subscription), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+@require_GET
+def export_race_runs_csv(request):
+    return streaming_export_response(request, race_run_csv_lines(), 'text/csv; charset=utf-8', 'raceruns.csv')
+
+
+@require_GET
+def export_results_ndjson(request):
+    return streaming_export_response(request, result_ndjson_lines(), 'application/x-ndjson', 'results.ndjson')
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAdminUser])
+def request_metrics_view(request):
+    return Response(metrics_snapshot())